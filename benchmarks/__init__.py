@@ -0,0 +1,8 @@
+# coding=utf-8
+"""
+Benchmarks do cliente contra o servidor local de `tests/server.py`, sem depender da API real.
+
+    python -m benchmarks                                   # executa todos os cenários
+    python -m benchmarks --save benchmarks/baseline.json   # armazena os resultados como referência
+    python -m benchmarks --compare benchmarks/baseline.json
+"""
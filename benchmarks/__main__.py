@@ -0,0 +1,44 @@
+# coding=utf-8
+import argparse
+import sys
+
+from unirio.api import UNIRIOAPIRequest
+from tests.server import MockAPIServer
+from . import runner
+from .scenarios import SCENARIOS
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m benchmarks',
+                                     description='Benchmarks do cliente contra um servidor local da API')
+    parser.add_argument('-k', '--filter', help='Executa somente os cenários cujo nome contém este texto')
+    parser.add_argument('--quick', action='store_true', help='Executa 10%% das operações de cada cenário')
+    parser.add_argument('--save', metavar='PATH', help='Salva os resultados como referência em PATH')
+    parser.add_argument('--compare', metavar='PATH', help='Compara os resultados com a referência em PATH')
+    parser.add_argument('--threshold', type=float, default=0.2,
+                        help='Variação relativa tolerada na comparação. Padrão: 0.2')
+    args = parser.parse_args(argv)
+
+    scenarios = [s for s in SCENARIOS if not args.filter or args.filter in s.name]
+    results = {}
+    for scenario in scenarios:
+        with MockAPIServer(rows=scenario.rows, latency=scenario.latency) as server:
+            with UNIRIOAPIRequest('benchmark', server.url, debug=False,
+                                  pool_maxsize=max(10, scenario.concurrency)) as api:
+                results[scenario.name] = scenario.measure(api, server, 0.1 if args.quick else 1.0)
+        sys.stderr.write('.')
+        sys.stderr.flush()
+    sys.stderr.write('\n')
+
+    runner.report(results)
+    if args.save:
+        runner.save(args.save, results)
+    if args.compare:
+        regressions = runner.compare(runner.load(args.compare), results, args.threshold)
+        runner.report_regressions(regressions)
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
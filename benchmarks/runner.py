@@ -0,0 +1,196 @@
+# coding=utf-8
+import gc
+import json
+import os
+import platform
+import re
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+try:
+    import tracemalloc
+except ImportError:
+    # Python < 3.4: a memória não é medida
+    tracemalloc = None
+
+_timer = getattr(time, 'perf_counter', time.time)
+
+
+def percentile(samples, q):
+    """
+    :type samples: list
+    :param samples: Amostras ordenadas
+    :type q: float
+    :param q: Percentil entre 0 e 100
+    :rtype: float
+    """
+    if not samples:
+        return None
+    index = int(round(q / 100.0 * (len(samples) - 1)))
+    return samples[index]
+
+
+class Scenario(object):
+    def __init__(self, name, setup, ops, concurrency=1, rows=25, latency=0):
+        """
+        :type name: str
+        :type setup: callable
+        :param setup: Função que recebe (api, server) e retorna a operação medida, um callable que recebe o
+                      número da operação
+        :type ops: int
+        :param ops: Quantidade de operações medidas
+        :type concurrency: int
+        :param concurrency: Quantidade de threads executando as operações
+        :type rows: int
+        :param rows: Quantidade de linhas do endpoint do servidor local
+        :type latency: float
+        :param latency: Latência simulada do servidor, em segundos
+        """
+        self.name = name
+        self.setup = setup
+        self.ops = ops
+        self.concurrency = concurrency
+        self.rows = rows
+        self.latency = latency
+
+    def _run(self, op, ops):
+        """
+        :rtype: tuple
+        :return: Tupla (tempo total, latências ordenadas)
+        """
+        def timed(i):
+            start = _timer()
+            op(i)
+            return _timer() - start
+
+        start = _timer()
+        if self.concurrency == 1:
+            latencies = [timed(i) for i in range(ops)]
+        else:
+            with ThreadPoolExecutor(max_workers=self.concurrency) as executor:
+                latencies = list(executor.map(timed, range(ops)))
+        return _timer() - start, sorted(latencies)
+
+    def measure(self, api, server, scale=1.0):
+        """
+        Executa o cenário duas vezes: uma medindo o tempo e outra, mais curta, medindo o pico de memória com
+        tracemalloc, que deixaria as operações mais lentas.
+
+        :type scale: float
+        :param scale: Fator aplicado à quantidade de operações. Ex: 0.1 para uma execução rápida
+        :rtype: dict
+        """
+        op = self.setup(api, server)
+        op(0)  # aquecimento: conexões, caches de módulos, etc.
+        ops = max(self.concurrency, int(self.ops * scale))
+
+        gc.collect()
+        elapsed, latencies = self._run(op, ops)
+        result = {
+            'ops': ops,
+            'concurrency': self.concurrency,
+            'throughput': ops / elapsed,
+            'p50': percentile(latencies, 50),
+            'p95': percentile(latencies, 95),
+            'p99': percentile(latencies, 99),
+            'mean': sum(latencies) / len(latencies),
+            'peak_memory': None,
+        }
+
+        if tracemalloc is not None:
+            gc.collect()
+            tracemalloc.start()
+            try:
+                self._run(op, self.concurrency)
+                result['peak_memory'] = tracemalloc.get_traced_memory()[1]
+            finally:
+                tracemalloc.stop()
+        return result
+
+
+def _version():
+    # setup.py executa setup() ao ser importado, então a versão é lida do texto do arquivo
+    path = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'setup.py')
+    try:
+        with open(path) as f:
+            match = re.search(r"^VERSION = '([^']+)'", f.read(), re.M)
+    except IOError:
+        return None
+    return match.group(1) if match else None
+
+
+def metadata():
+    """
+    :rtype: dict
+    """
+    return {'python': platform.python_version(),
+            'implementation': platform.python_implementation(),
+            'platform': platform.platform(),
+            'version': _version(),
+            'date': time.strftime('%Y-%m-%dT%H:%M:%S')}
+
+
+def save(path, results):
+    with open(path, 'w') as f:
+        json.dump({'meta': metadata(), 'results': results}, f, indent=2, sort_keys=True)
+
+
+def load(path):
+    with open(path) as f:
+        return json.load(f)
+
+
+# Métricas comparadas com a referência e se um valor maior é pior
+METRICS = (('throughput', False), ('p50', True), ('p95', True), ('peak_memory', True))
+
+
+def compare(baseline, results, threshold=0.2):
+    """
+    Compara os resultados com uma referência (baseline) salva anteriormente.
+
+    :type baseline: dict
+    :param baseline: Conteúdo de um arquivo salvo por `save`
+    :type results: dict
+    :type threshold: float
+    :param threshold: Variação relativa tolerada antes de uma métrica ser considerada uma regressão
+    :rtype: list
+    :return: Lista de tuplas (cenário, métrica, referência, atual, variação relativa) das regressões
+    """
+    regressions = []
+    for name, result in sorted(results.items()):
+        base = baseline['results'].get(name)
+        if base is None:
+            continue
+        for metric, higher_is_worse in METRICS:
+            before, after = base.get(metric), result.get(metric)
+            if not before or after is None:
+                continue
+            change = (after - before) / float(before)
+            if (change if higher_is_worse else -change) > threshold:
+                regressions.append((name, metric, before, after, change))
+    return regressions
+
+
+def _format(metric, value):
+    if value is None:
+        return '-'
+    if metric == 'throughput':
+        return '%.1f/s' % value
+    if metric == 'peak_memory':
+        return '%.1fKB' % (value / 1024.0)
+    return '%.2fms' % (value * 1000)
+
+
+def report(results, out=sys.stdout):
+    columns = ('throughput', 'p50', 'p95', 'p99', 'peak_memory')
+    out.write('%-48s %6s %4s ' % ('scenario', 'ops', 'c') + ' '.join('%12s' % c for c in columns) + '\n')
+    for name, result in sorted(results.items()):
+        out.write('%-48s %6d %4d ' % (name, result['ops'], result['concurrency']) +
+                  ' '.join('%12s' % _format(c, result[c]) for c in columns) + '\n')
+
+
+def report_regressions(regressions, out=sys.stdout):
+    for name, metric, before, after, change in regressions:
+        out.write('REGRESSION %s %s: %s -> %s (%+.0f%%)\n' % (name, metric, _format(metric, before),
+                                                             _format(metric, after), change * 100))
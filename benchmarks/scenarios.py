@@ -0,0 +1,112 @@
+# coding=utf-8
+from unirio.api import UNIRIOAPIRequest
+from unirio.api.jsoncodec import get_codec
+from unirio.api.result import APIResultObject
+from tests.server import ENDPOINT, PKEY
+from .runner import Scenario
+
+
+def get(rows, compact=False, columnar=False):
+    def setup(api, server):
+        params = {'LMIN': 0, 'LMAX': rows}
+        return lambda i: api.get(ENDPOINT, dict(params), compact=compact, columnar=columnar)
+    return setup
+
+
+def get_single_result(api, server):
+    rows = len(server.rows)
+    return lambda i: api.get_single_result(ENDPOINT, {PKEY: i % rows})
+
+
+def iter_all(page_size, prefetch=0):
+    def setup(api, server):
+        def op(i):
+            for _ in api.iter_all(ENDPOINT, page_size=page_size, prefetch=prefetch):
+                pass
+        return op
+    return setup
+
+
+def get_stream(api, server):
+    def op(i):
+        with api.get_stream(ENDPOINT) as rows:
+            for _ in rows:
+                pass
+    return op
+
+
+def decode(compact=False, json_codec=None):
+    """
+    Somente a decodificação de uma resposta já recebida, sem a requisição
+    """
+    def setup(api, server):
+        if json_codec is not None:
+            api = UNIRIOAPIRequest(api.api_key, api.server, debug=False, json_codec=json_codec)
+        response = api.get(ENDPOINT).response
+        return lambda i: APIResultObject(response, api, compact=compact)
+    return setup
+
+
+def post(api, server):
+    return lambda i: api.post(ENDPOINT, {'PROJNAME': 'projeto %d' % i, 'COD_OPERADOR': 1})
+
+
+def put(api, server):
+    return lambda i: api.put(ENDPOINT, {PKEY: i, 'PROJNAME': 'projeto %d' % i, 'COD_OPERADOR': 1})
+
+
+def delete(api, server):
+    return lambda i: api.delete(ENDPOINT, {PKEY: i, 'COD_OPERADOR': 1})
+
+
+def post_many(rows, max_workers):
+    def setup(api, server):
+        data = [{'PROJNAME': 'projeto %d' % i} for i in range(rows)]
+        return lambda i: api.post_many(ENDPOINT, data, {'COD_OPERADOR': 1}, max_workers=max_workers)
+    return setup
+
+
+def call_procedure(rows, chunk_size=None, max_workers=1):
+    def setup(api, server):
+        data = [{'COD_OPERADOR': 1, 'VALOR': i, 'DESCRICAO': 'linha %d' % i} for i in range(rows)]
+        return lambda i: api.call_procedure('BENCHMARK', data, chunk_size=chunk_size, max_workers=max_workers)
+    return setup
+
+
+def _installed(codec):
+    try:
+        get_codec(codec)
+    except (ImportError, ValueError):
+        return False
+    return True
+
+
+SCENARIOS = [
+    Scenario('get/rows=10', get(10), ops=500, rows=10),
+    Scenario('get/rows=1000', get(1000), ops=100, rows=1000),
+    Scenario('get/rows=10000', get(10000), ops=10, rows=10000),
+    Scenario('get/rows=10000/compact', get(10000, compact=True), ops=10, rows=10000),
+    Scenario('get/rows=10000/columnar', get(10000, columnar=True), ops=10, rows=10000),
+    Scenario('get/rows=10/latency=5ms/c=1', get(10), ops=100, rows=10, latency=0.005),
+    Scenario('get/rows=10/latency=5ms/c=8', get(10), ops=400, concurrency=8, rows=10, latency=0.005),
+    Scenario('get/rows=1000/c=8', get(1000), ops=200, concurrency=8, rows=1000),
+    Scenario('get_single_result', get_single_result, ops=500, rows=1000),
+    Scenario('iter_all/rows=10000/page=1000', iter_all(1000), ops=5, rows=10000),
+    Scenario('iter_all/rows=10000/page=1000/prefetch', iter_all(1000, prefetch=2), ops=5, rows=10000),
+    Scenario('get_stream/rows=10000', get_stream, ops=5, rows=10000),
+    Scenario('decode/rows=1000', decode(), ops=200, rows=1000),
+    Scenario('decode/rows=10000', decode(), ops=20, rows=10000),
+    Scenario('decode/rows=10000/compact', decode(compact=True), ops=20, rows=10000),
+    Scenario('post', post, ops=300),
+    Scenario('post/c=8', post, ops=800, concurrency=8),
+    Scenario('put', put, ops=300),
+    Scenario('delete', delete, ops=300),
+    Scenario('post_many/rows=200/workers=8', post_many(200, 8), ops=5),
+    Scenario('call_procedure/rows=100', call_procedure(100), ops=100),
+    Scenario('call_procedure/rows=10000', call_procedure(10000), ops=5),
+    Scenario('call_procedure/rows=10000/chunks=1000/workers=4', call_procedure(10000, 1000, 4), ops=5),
+]
+
+for _codec in ('orjson', 'ujson'):
+    if _installed(_codec):
+        SCENARIOS.append(Scenario('decode/rows=10000/%s' % _codec, decode(json_codec=_codec), ops=20, rows=10000))
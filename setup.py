@@ -16,7 +16,7 @@ with open('requirements.txt') as f:
 setup(
     name='unirio-api',
     version=VERSION,
-    packages=find_packages(exclude=['*test*']),
+    packages=find_packages(exclude=['*test*', 'benchmarks*']),
     description='Client package for the RESTful api provided by the Universidade '
                 'Federal do Estado do Rio de Janeiro (UNIRIO)',
     long_description=README,
@@ -41,7 +41,13 @@ setup(
         'Topic :: Internet :: WWW/HTTP :: Dynamic Content',
     ],
     keywords='unirio api rest sie development',
-    install_requires=required
+    install_requires=required,
+    extras_require={
+        'async': ['aiohttp>=2.0'],
+        'numpy': ['numpy'],
+        'orjson': ['orjson'],
+        'ujson': ['ujson'],
+    }
 )
 
 # todo: pre-publish -> pandoc --from=markdown --to=rst --output=README.rst README.md
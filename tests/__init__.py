@@ -6,3 +6,17 @@ from tests.get import TestGETRequest
 from tests.put import TestPUTRequest
 from tests.delete import TestDELETERequest
 from tests.procedures import TestProcedureSyncRequest
+from tests.pagination import TestPagePrefetcher
+from tests.aio import TestAsyncRequest
+from tests.cache import TestMemoryCache, TestSQLiteCache, TestCacheKey
+from tests.singleflight import TestSingleFlight
+from tests.result import TestAPIResultObject
+from tests.streaming import TestStreamingResult
+from tests.jsoncodec import TestJSONCodec
+from tests.procedures import TestProcedureAsyncRequest
+from tests.ratelimit import TestRateLimiter
+from tests.retry import TestRetryPolicy
+from tests.circuitbreaker import TestCircuitBreaker
+from tests.timeout import TestTimeout
+from tests.instrumentation import TestInstrumentation
+from tests.benchmarks import TestBenchmarks
@@ -0,0 +1,157 @@
+# coding=utf-8
+import os
+import shutil
+import tempfile
+import time
+import unittest
+
+from unirio.api.exceptions import *
+from unirio.api.result import *
+from unirio.api.cache import MemoryCache, SQLiteCache
+from tests import config
+from tests.server import MockAPIServer, ENDPOINT, PKEY, FORBIDDEN_ENDPOINTS
+
+try:
+    import asyncio
+    from unirio.api.aio import AsyncUNIRIOAPIRequest
+except (ImportError, SyntaxError):
+    AsyncUNIRIOAPIRequest = None
+
+
+@unittest.skipIf(AsyncUNIRIOAPIRequest is None, 'aiohttp não instalado')
+class TestAsyncRequest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.server = MockAPIServer(rows=25).start()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.stop()
+
+    def setUp(self):
+        self.server.latency = 0
+        self.server.hits.clear()
+        self.loop = asyncio.new_event_loop()
+        self.api = AsyncUNIRIOAPIRequest(config.KEY, self.server.url, cache=None, debug=False)
+
+    def tearDown(self):
+        self.wait(self.api.close())
+        self.loop.close()
+
+    def wait(self, coroutine):
+        return self.loop.run_until_complete(coroutine)
+
+    def gather(self, coroutines):
+        """
+        Executa as corrotinas simultaneamente no loop do teste
+
+        :rtype: list
+        :return: O retorno ou a exception de cada corrotina, na ordem de `coroutines`
+        """
+        tasks = [self.loop.create_task(c) for c in coroutines]
+        self.wait(asyncio.wait(tasks))
+        return [t.exception() or t.result() for t in tasks]
+
+    def test_get_valid_endpoint_with_permission(self):
+        result = self.wait(self.api.get(ENDPOINT))
+        self.assertIsInstance(result, APIResultObject)
+        self.assertEqual(len(result.content), 25)
+
+    def test_get_valid_endpoint_without_permission(self):
+        for path in FORBIDDEN_ENDPOINTS:
+            with self.assertRaises(ForbiddenEndpointException):
+                self.wait(self.api.get(path))
+
+    def test_get_invalid_endpoint(self):
+        for path in ('fbsdfgsdfg', 'grgsuer9gsfh8sdfh', 'daba4a0as0haf'):
+            with self.assertRaises(InvalidEndpointException):
+                self.wait(self.api.get(path))
+
+    def test_get_does_not_change_params(self):
+        params = {'LMIN': 0, 'LMAX': 1}
+        self.wait(self.api.get(ENDPOINT, params))
+        self.assertEqual(params, {'LMIN': 0, 'LMAX': 1})
+
+    def test_get_single_result_without_content_bypassing_no_content_exception(self):
+        single_result = self.wait(self.api.get_single_result(ENDPOINT, {PKEY: 99999999999999999999999999999},
+                                                             bypass_no_content_exception=True))
+        self.assertIsNone(single_result)
+
+    def test_concurrent_gets(self):
+        self.server.latency = 0.05
+        results = self.gather([self.api.get(ENDPOINT, {'LMIN': i, 'LMAX': i + 1}) for i in range(10)])
+        self.assertEqual([r.first()[PKEY] for r in results], list(range(10)))
+        self.assertEqual(self.server.hits['GET'], 10)
+
+    def test_iter_all(self):
+        rows = self.api.iter_all(ENDPOINT, {'LMIN': 0}, page_size=10)
+        collected = []
+        try:
+            while True:
+                collected.append(self.wait(rows.__anext__()))
+        except StopAsyncIteration:
+            pass
+        self.assertEqual([r[PKEY] for r in collected], list(range(25)))
+
+    def test_post_without_cod_operador(self):
+        with self.assertRaises(MissingRequiredParameterException):
+            self.wait(self.api.post(ENDPOINT, {}))
+
+    def test_post(self):
+        response = self.wait(self.api.post(ENDPOINT, {'COD_OPERADOR': 1, 'PROJNAME': 'novo'}))
+        self.assertIsInstance(response, APIPOSTResponse)
+        self.assertTrue(response.insertId)
+
+    def test_cache_stores_result(self):
+        tmp = tempfile.mkdtemp()
+        try:
+            cache = SQLiteCache(os.path.join(tmp, 'cache.sqlite'))
+            api = AsyncUNIRIOAPIRequest(config.KEY, self.server.url, cache=cache, debug=False)
+            first = self.wait(api.get(ENDPOINT, {'LMIN': 0, 'LMAX': 5}, cache_time=60))
+            second = self.wait(api.get(ENDPOINT, {'LMIN': 0, 'LMAX': 5}, cache_time=60))
+            self.wait(api.close())
+        finally:
+            shutil.rmtree(tmp)
+        self.assertIsInstance(second, APIResultObject)
+        self.assertEqual([r[PKEY] for r in second], [r[PKEY] for r in first])
+        self.assertEqual(self.server.hits['GET'], 1)
+
+    def test_cache_concurrent_misses(self):
+        self.server.latency = 0.1
+        cache = MemoryCache()
+        api = AsyncUNIRIOAPIRequest(config.KEY, self.server.url, cache=cache, debug=False)
+        results = self.gather([api.get(ENDPOINT, {'LMIN': 0, 'LMAX': 5}, cache_time=60) for _ in range(10)])
+        self.assertEqual(cache.stats, {'hits': 0, 'stale_hits': 0, 'misses': 10, 'evictions': 0})
+        self.wait(api.get(ENDPOINT, {'LMIN': 0, 'LMAX': 5}, cache_time=60))
+        self.wait(api.close())
+        self.assertTrue(all(isinstance(r, APIResultObject) for r in results))
+        self.assertEqual(self.server.hits['GET'], 1)
+        self.assertEqual(cache.stats, {'hits': 1, 'stale_hits': 0, 'misses': 10, 'evictions': 0})
+
+    def test_cache_requires_base_cache(self):
+        with self.assertRaises(TypeError):
+            AsyncUNIRIOAPIRequest(config.KEY, self.server.url, cache=lambda key, f, time_expire=300: f(), debug=False)
+
+    def test_cache_no_content(self):
+        api = AsyncUNIRIOAPIRequest(config.KEY, self.server.url, cache=MemoryCache(), debug=False,
+                                    no_content_cache_time=0.2)
+        params = {PKEY: 99999999999999999999999999999}
+        for _ in range(2):
+            with self.assertRaises(NoContentException):
+                self.wait(api.get(ENDPOINT, params, cache_time=60))
+        self.assertEqual(self.server.hits['GET'], 1)
+        time.sleep(0.2)
+        with self.assertRaises(NoContentException):
+            self.wait(api.get(ENDPOINT, params, cache_time=60))
+        self.wait(api.close())
+        self.assertEqual(self.server.hits['GET'], 2)
+
+    def test_cache_stale_while_revalidate(self):
+        api = AsyncUNIRIOAPIRequest(config.KEY, self.server.url, cache=MemoryCache(stale_while_revalidate=60),
+                                    debug=False)
+        self.wait(api.get(ENDPOINT, {'LMIN': 0, 'LMAX': 5}, cache_time=0.1))
+        time.sleep(0.15)
+        stale = self.gather([api.get(ENDPOINT, {'LMIN': 0, 'LMAX': 5}, cache_time=0.1), asyncio.sleep(0.2)])[0]
+        self.wait(api.close())
+        self.assertIsInstance(stale, APIResultObject)
+        self.assertEqual(self.server.hits['GET'], 2)
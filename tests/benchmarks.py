@@ -0,0 +1,39 @@
+# coding=utf-8
+import unittest
+
+from unirio.api import UNIRIOAPIRequest
+from benchmarks import runner
+from benchmarks.scenarios import SCENARIOS
+from tests import config
+from tests.server import MockAPIServer
+
+
+class TestBenchmarks(unittest.TestCase):
+    def test_percentile(self):
+        samples = list(range(101))
+        self.assertEqual(runner.percentile(samples, 50), 50)
+        self.assertEqual(runner.percentile(samples, 99), 99)
+        self.assertIsNone(runner.percentile([], 50))
+
+    def test_compare(self):
+        baseline = {'results': {'a': {'throughput': 100.0, 'p50': 0.010, 'p95': 0.020, 'peak_memory': 1000}}}
+        results = {'a': {'throughput': 70.0, 'p50': 0.011, 'p95': 0.030, 'peak_memory': None},
+                   'b': {'throughput': 1.0, 'p50': 1.0, 'p95': 1.0, 'peak_memory': 1}}
+        regressions = runner.compare(baseline, results, threshold=0.2)
+        self.assertEqual([(name, metric) for name, metric, _, _, _ in regressions],
+                         [('a', 'throughput'), ('a', 'p95')])
+
+    def test_compare_improvement(self):
+        baseline = {'results': {'a': {'throughput': 100.0, 'p50': 0.010}}}
+        results = {'a': {'throughput': 200.0, 'p50': 0.005}}
+        self.assertEqual(runner.compare(baseline, results), [])
+
+    def test_measure(self):
+        scenario = next(s for s in SCENARIOS if s.name == 'get/rows=10')
+        with MockAPIServer(rows=scenario.rows) as server:
+            with UNIRIOAPIRequest(config.KEY, server.url, debug=False) as api:
+                result = scenario.measure(api, server, scale=0.1)
+        self.assertEqual(result['ops'], max(1, int(scenario.ops * 0.1)))
+        self.assertGreater(result['throughput'], 0)
+        self.assertLessEqual(result['p50'], result['p95'])
+        self.assertLessEqual(result['p95'], result['p99'])
@@ -0,0 +1,316 @@
+# coding=utf-8
+import os
+import shutil
+import tempfile
+import threading
+import time
+import unittest
+
+from unirio.api import UNIRIOAPIRequest, APIServer
+from unirio.api.cache import MemoryCache, SQLiteCache
+from unirio.api.result import APIResultObject
+from tests import config
+from tests.request import mock_response
+
+
+def mock_result(rows, subset=None):
+    """
+    :rtype: APIResultObject
+    """
+    response = mock_response(payload={'content': rows, 'subset': subset or [0, len(rows)]})
+    return APIResultObject(response, UNIRIOAPIRequest(config.KEY, config.SERVER, debug=False))
+
+
+class TestMemoryCache(unittest.TestCase):
+    def setUp(self):
+        self.cache = MemoryCache()
+
+    def test_hit_and_miss(self):
+        self.assertEqual(self.cache('a', lambda: 1, time_expire=60), 1)
+        self.assertEqual(self.cache('a', lambda: 2, time_expire=60), 1)
+        self.assertEqual(self.cache.stats, {'hits': 1, 'stale_hits': 0, 'misses': 1, 'evictions': 0})
+
+    def test_expiration(self):
+        self.cache('a', lambda: 1, time_expire=60)
+        time.sleep(0.02)
+        self.assertEqual(self.cache('a', lambda: 2, time_expire=0.01), 2)
+
+    def test_delete(self):
+        self.cache('a', lambda: 1, time_expire=60)
+        self.cache('a', None)
+        self.assertEqual(self.cache('a', lambda: 2, time_expire=60), 2)
+
+    def test_lru_eviction_by_entries(self):
+        cache = MemoryCache(max_entries=2)
+        cache('a', lambda: 1, time_expire=60)
+        cache('b', lambda: 2, time_expire=60)
+        cache('a', lambda: None, time_expire=60)
+        cache('c', lambda: 3, time_expire=60)
+        self.assertEqual(cache('a', lambda: None, time_expire=60), 1)
+        self.assertIsNone(cache('b', lambda: None, time_expire=60))
+        self.assertEqual(cache.evictions, 2)
+
+    def test_eviction_by_size(self):
+        cache = MemoryCache(max_entries=None, max_bytes=3000)
+        for i in range(10):
+            cache(i, lambda: 'x' * 1000, time_expire=60)
+        self.assertLessEqual(cache.size, 3000)
+        self.assertGreater(cache.evictions, 0)
+
+    def test_value_larger_than_max_bytes_is_not_stored(self):
+        cache = MemoryCache(max_bytes=100)
+        cache('a', lambda: 'x' * 1000, time_expire=60)
+        self.assertEqual(cache.size, 0)
+        self.assertEqual(cache('a', lambda: 'y', time_expire=60), 'y')
+
+    def test_thread_safety(self):
+        cache = MemoryCache(max_entries=50)
+
+        def worker(n):
+            for i in range(200):
+                cache((n * i) % 80, lambda: i, time_expire=60)
+
+        threads = [threading.Thread(target=worker, args=(n,)) for n in range(8)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        self.assertEqual(cache.hits + cache.misses, 8 * 200)
+        self.assertLessEqual(len(cache._entries), 50)
+
+    def test_clear(self):
+        self.cache('a', lambda: 1, time_expire=60)
+        self.cache.clear()
+        self.assertEqual(self.cache('a', lambda: 2, time_expire=60), 2)
+
+    def test_concurrent_misses_are_collapsed(self):
+        calls = []
+
+        def slow():
+            calls.append(1)
+            time.sleep(0.1)
+            return 'valor'
+
+        results = []
+        threads = [threading.Thread(target=lambda: results.append(self.cache('a', slow, time_expire=60)))
+                   for i in range(10)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(results, ['valor'] * 10)
+
+    def test_concurrent_misses_share_exceptions(self):
+        def failing():
+            time.sleep(0.1)
+            raise ValueError('falhou')
+
+        errors = []
+
+        def worker():
+            try:
+                self.cache('a', failing, time_expire=60)
+            except ValueError as e:
+                errors.append(e)
+
+        threads = [threading.Thread(target=worker) for i in range(5)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        self.assertEqual(len(errors), 5)
+        self.assertEqual(self.cache('a', lambda: 1, time_expire=60), 1)
+
+    def test_stale_while_revalidate(self):
+        cache = MemoryCache(stale_while_revalidate=60)
+        cache('a', lambda: 1, time_expire=60)
+        time.sleep(0.02)
+        refreshed = threading.Event()
+
+        def refresh():
+            refreshed.set()
+            return 2
+
+        self.assertEqual(cache('a', refresh, time_expire=0.01), 1)
+        self.assertTrue(refreshed.wait(2))
+        time.sleep(0.05)
+        self.assertEqual(cache('a', lambda: 3, time_expire=60), 2)
+        self.assertEqual(cache.stale_hits, 1)
+
+    def test_lookup_and_set(self):
+        self.assertEqual(self.cache.lookup('a', 60), (None, 'miss'))
+        self.cache.set('a', 1)
+        self.assertEqual(self.cache.lookup('a', 60), (1, 'hit'))
+        self.assertEqual(self.cache.stats, {'hits': 1, 'stale_hits': 0, 'misses': 1, 'evictions': 0})
+
+    def test_load_rechecks_entry(self):
+        self.cache('a', lambda: 1, time_expire=60)
+        # Simula uma consulta feita antes que a carga anterior armazenasse o valor
+        get, misses = self.cache._get, [None]
+        self.cache._get = lambda key: misses.pop() if misses else get(key)
+        self.assertEqual(self.cache('a', lambda: 2, time_expire=60), 1)
+
+    def test_revalidation_runs_once(self):
+        cache = MemoryCache(stale_while_revalidate=60)
+        cache._set('a', 1, time.time() - 5)
+        calls = []
+
+        def slow():
+            calls.append(1)
+            time.sleep(0.1)
+            return 2
+
+        threads = [threading.Thread(target=cache, args=('a', slow, 1)) for i in range(10)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        for i in range(50):
+            if not cache._flight.in_flight('a'):
+                break
+            time.sleep(0.02)
+        # Uma thread que viu o valor expirado antes da atualização terminar não inicia outra
+        cache._revalidate('a', slow, 1)
+        time.sleep(0.05)
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(cache('a', lambda: 3, time_expire=1), 2)
+
+    def test_stale_value_expires(self):
+        cache = MemoryCache(stale_while_revalidate=0.01)
+        cache('a', lambda: 1, time_expire=0.01)
+        time.sleep(0.05)
+        self.assertEqual(cache('a', lambda: 2, time_expire=0.01), 2)
+
+
+class TestSQLiteCache(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.path = os.path.join(self.directory, 'cache.sqlite')
+        self.cache = SQLiteCache(self.path)
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_hit_and_miss(self):
+        self.assertEqual(self.cache('a', lambda: [1, 2], time_expire=60), [1, 2])
+        self.assertEqual(self.cache('a', lambda: None, time_expire=60), [1, 2])
+        self.assertEqual(self.cache.stats, {'hits': 1, 'stale_hits': 0, 'misses': 1, 'evictions': 0})
+
+    def test_expiration_and_delete(self):
+        self.cache('a', lambda: 1, time_expire=60)
+        time.sleep(0.02)
+        self.assertEqual(self.cache('a', lambda: 2, time_expire=0.01), 2)
+        self.cache('a', None)
+        self.assertEqual(self.cache('a', lambda: 3, time_expire=60), 3)
+
+    def test_survives_restart(self):
+        self.cache('a', lambda: mock_result([{'ID_UNIT_TEST': 1, 'PROJNAME': 'abc'}], [10, 20]), time_expire=60)
+        result = SQLiteCache(self.path)('a', lambda: None, time_expire=60)
+        self.assertIsInstance(result, APIResultObject)
+        self.assertEqual(result.first()['projname'], 'abc')
+        self.assertEqual((result.lmin, result.lmax), (10, 20))
+        self.assertIsNone(result.response)
+
+    def test_eviction(self):
+        cache = SQLiteCache(self.path, max_entries=3)
+        for i in range(5):
+            cache(str(i), lambda: i, time_expire=60)
+        self.assertEqual(cache.evictions, 2)
+        self.assertIsNone(cache('0', lambda: None, time_expire=60))
+        self.assertEqual(cache('4', lambda: None, time_expire=60), 4)
+
+    def test_eviction_by_size(self):
+        cache = SQLiteCache(self.path, max_bytes=3000)
+        for i in range(10):
+            cache(str(i), lambda: 'x' * 1000, time_expire=60)
+        self.assertGreater(cache.evictions, 0)
+        self.assertEqual(cache('9', lambda: None, time_expire=60), 'x' * 1000)
+
+    def accessed(self, key):
+        return self.cache._connection.execute('SELECT accessed FROM cache WHERE key = ?', (key,)).fetchone()[0]
+
+    def test_reads_touch_once_per_interval(self):
+        cache = SQLiteCache(self.path, touch_interval=0.1)
+        cache('a', lambda: 1, time_expire=60)
+        accessed = self.accessed('a')
+        cache('a', lambda: None, time_expire=60)
+        self.assertEqual(self.accessed('a'), accessed)
+        time.sleep(0.1)
+        cache('a', lambda: None, time_expire=60)
+        self.assertGreater(self.accessed('a'), accessed)
+
+    def test_totals(self):
+        cache = SQLiteCache(self.path, max_entries=3)
+        for i in range(5):
+            cache(str(i), lambda: 'x' * 100, time_expire=60)
+        cache('4', lambda: 'y' * 200, time_expire=0)
+        cache('3', None)
+        count, size = cache.totals
+        self.assertEqual(count, 2)
+        self.assertEqual(size, cache._connection.execute('SELECT SUM(size) FROM cache').fetchone()[0])
+        cache.clear()
+        self.assertEqual(cache.totals, (0, 0))
+
+    def test_totals_of_existing_file(self):
+        self.cache('a', lambda: 1, time_expire=60)
+        conn = self.cache._connection
+        with conn:
+            conn.execute('DROP TABLE cache_totals')
+        self.assertEqual(SQLiteCache(self.path).totals[0], 1)
+
+    def test_threads(self):
+        def worker(n):
+            for i in range(20):
+                self.cache(str(i % 5), lambda: n, time_expire=60)
+
+        threads = [threading.Thread(target=worker, args=(n,)) for n in range(4)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        self.assertEqual(self.cache.hits + self.cache.misses, 80)
+
+
+class TestCacheKey(unittest.TestCase):
+    def setUp(self):
+        self.api = UNIRIOAPIRequest(config.KEY, config.SERVER, debug=False)
+
+    def key(self, path='UNIT_TEST', params=None, fields=None, api=None):
+        return (api or self.api)._cache_hash(path, params, fields)
+
+    def test_deterministic(self):
+        self.assertEqual(self.key(params={'A': 1, 'B': 'x'}), self.key(params={'B': 'x', 'A': 1}))
+
+    def test_case_insensitive_params(self):
+        self.assertEqual(self.key(params={'id_unit_test': 1}), self.key(params={'ID_UNIT_TEST': 1}))
+
+    def test_value_types(self):
+        self.assertEqual(self.key(params={'ID': 1}), self.key(params={'ID': '1'}))
+
+    def test_unhashable_set_params(self):
+        self.assertEqual(self.key(params={'PROJNAME_SET': ['b', 'a']}),
+                         self.key(params={'PROJNAME_SET': ('a', 'b')}))
+
+    def test_mixed_type_params(self):
+        self.assertEqual(self.key(params={'A_SET': [1, [2, 3], 'x']}), self.key(params={'A_SET': ['x', [2, 3], 1]}))
+
+    def test_params_differing_by_case(self):
+        with self.assertRaises(ValueError):
+            self.key(params={'lmin': 0, 'LMIN': [1]})
+
+    def test_fields(self):
+        self.assertEqual(self.key(fields=['B', 'a']), self.key(fields=('A', 'b')))
+        self.assertNotEqual(self.key(fields=['A']), self.key(fields=['B']))
+
+    def test_server_and_key_scope(self):
+        other_key = UNIRIOAPIRequest(config.Keys.INVALID.value, config.SERVER, debug=False)
+        other_server = UNIRIOAPIRequest(config.KEY, APIServer.LOCAL.value, debug=False)
+        self.assertNotEqual(self.key(), self.key(api=other_key))
+        self.assertNotEqual(self.key(), self.key(api=other_server))
+
+    def test_ignores_automatic_parameters(self):
+        self.assertEqual(self.key(params={'A': 1}), self.key(params={'A': 1, 'API_KEY': config.KEY, 'FORMAT': 'JSON'}))
+
+    def test_does_not_expose_api_key(self):
+        self.assertNotIn(config.KEY, self.key())
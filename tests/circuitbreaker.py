@@ -0,0 +1,152 @@
+# coding=utf-8
+import time
+import unittest
+
+from unirio.api import UNIRIOAPIRequest, CircuitBreaker, RetryPolicy, MemoryCache, RateLimiter
+from unirio.api.exceptions import CircuitOpenException, APITimeoutException
+from tests import config
+from tests.server import MockAPIServer, ENDPOINT
+
+
+class TestCircuitBreaker(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.server = MockAPIServer().start()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.stop()
+
+    def setUp(self):
+        self.server.failures = []
+        self.server.latency = 0
+        self.server.hits.clear()
+
+    def api(self, **kwargs):
+        breaker = CircuitBreaker(**dict({'window': 4, 'min_calls': 4, 'open_time': 0.2}, **kwargs))
+        return UNIRIOAPIRequest(config.KEY, self.server.url, debug=False, cache=MemoryCache(),
+                                circuit_breaker=breaker)
+
+    def fail_calls(self, api, count):
+        self.server.fail(count, 503)
+        for _ in range(count):
+            try:
+                api.get(ENDPOINT)
+            except Exception:
+                pass
+
+    def test_opens_on_failure_rate(self):
+        api = self.api()
+        key = api._circuit_key(ENDPOINT)
+        self.fail_calls(api, 3)
+        self.assertEqual(api.circuit_breaker.state(key), 'closed')
+        self.fail_calls(api, 1)
+        self.assertEqual(api.circuit_breaker.state(key), 'open')
+
+        hits = self.server.hits['GET']
+        with self.assertRaises(CircuitOpenException) as cm:
+            api.get(ENDPOINT)
+        self.assertEqual(self.server.hits['GET'], hits)
+        self.assertEqual(cm.exception.key, key)
+        self.assertGreater(cm.exception.retry_after, 0)
+        self.assertEqual(api.circuit_breaker.stats[key]['rejected'], 1)
+
+    def test_circuits_per_endpoint(self):
+        api = self.api()
+        self.fail_calls(api, 4)
+        self.assertEqual(api.circuit_breaker.state(api._circuit_key('OUTRO_ENDPOINT')), 'closed')
+        self.assertEqual(api._circuit_key(ENDPOINT), api._circuit_key(ENDPOINT.lower()))
+
+    def test_half_open_recovers(self):
+        api = self.api()
+        key = api._circuit_key(ENDPOINT)
+        self.fail_calls(api, 4)
+        time.sleep(0.25)
+        api.get(ENDPOINT)
+        self.assertEqual(api.circuit_breaker.state(key), 'closed')
+
+    def test_half_open_fails(self):
+        api = self.api()
+        key = api._circuit_key(ENDPOINT)
+        self.fail_calls(api, 4)
+        time.sleep(0.25)
+        self.fail_calls(api, 1)
+        self.assertEqual(api.circuit_breaker.state(key), 'open')
+        self.assertEqual(api.circuit_breaker.stats[key]['opened'], 2)
+
+    def test_slow_calls(self):
+        api = self.api(slow_call_duration=0.05, slow_call_rate=0.5)
+        self.server.latency = 0.06
+        for _ in range(4):
+            api.get(ENDPOINT)
+        self.assertEqual(api.circuit_breaker.state(api._circuit_key(ENDPOINT)), 'open')
+
+    def test_serve_stale(self):
+        api = self.api(serve_stale=True)
+        result = api.get(ENDPOINT, cache_time=0.01)
+        self.fail_calls(api, 4)
+        time.sleep(0.02)
+        self.assertIs(api.get(ENDPOINT, cache_time=0.01), result)
+
+        with self.assertRaises(CircuitOpenException):
+            api.get(ENDPOINT, {'LMIN': 0, 'LMAX': 1}, cache_time=10)
+
+        api = self.api()
+        api.get(ENDPOINT, cache_time=0.01)
+        self.fail_calls(api, 4)
+        time.sleep(0.02)
+        with self.assertRaises(CircuitOpenException):
+            api.get(ENDPOINT, cache_time=0.01)
+
+    def test_expired_deadline_is_not_a_failure(self):
+        api = UNIRIOAPIRequest(config.KEY, self.server.url, debug=False, rate_limiter=RateLimiter(rate=2, burst=1),
+                               circuit_breaker=CircuitBreaker(window=1, min_calls=1, open_time=0.1))
+        key = api._circuit_key(ENDPOINT)
+        api.get(ENDPOINT)
+        # A vaga do limitador só é liberada depois que o deadline expira
+        with self.assertRaises(APITimeoutException):
+            api.get(ENDPOINT, deadline=0.1)
+        self.assertEqual(api.circuit_breaker.state(key), 'closed')
+        self.assertEqual(api.circuit_breaker.circuit(key).calls, 1)
+
+        # Meio-aberto: a chamada de teste desistida libera sua vaga
+        self.fail_calls(api, 1)
+        time.sleep(0.6)
+        api.rate_limiter.bucket.reserve()
+        with self.assertRaises(APITimeoutException):
+            api.get(ENDPOINT, deadline=0.1)
+        self.assertEqual(api.circuit_breaker.state(key), 'half_open')
+        time.sleep(0.5)
+        api.get(ENDPOINT)
+        self.assertEqual(api.circuit_breaker.state(key), 'closed')
+
+    def test_unrelated_exception_is_not_recorded(self):
+        api = self.api()
+        key = api._circuit_key(ENDPOINT)
+        self.fail_calls(api, 4)
+        time.sleep(0.25)
+        circuit = api.circuit_breaker.circuit(key)
+        calls = circuit.calls
+        for error in (ValueError, KeyboardInterrupt):
+            circuit.before_call()
+
+            def fn():
+                raise error()
+
+            with self.assertRaises(error):
+                circuit.call(fn)
+            self.assertEqual(circuit.state, 'half_open')
+            self.assertEqual(circuit.calls, calls)
+        api.get(ENDPOINT)
+        self.assertEqual(api.circuit_breaker.state(key), 'closed')
+
+    def test_not_retried(self):
+        policy = RetryPolicy(max_attempts=5, backoff=0.01)
+        api = UNIRIOAPIRequest(config.KEY, self.server.url, debug=False, retry_policy=policy,
+                               circuit_breaker=CircuitBreaker(window=2, min_calls=2, open_time=10))
+        self.server.fail(5, 503)
+        with self.assertRaises(CircuitOpenException):
+            api.get(ENDPOINT)
+        self.assertEqual(self.server.hits['GET'], 2)
+        self.assertEqual(policy.stats['retries'], 2)
+        self.server.failures = []
@@ -65,3 +65,12 @@ class TestDELETERequest(TestAPIRequest):
 
             assert isinstance(result, APIDELETEResponse)
             assert result.affectedRows == 1
+
+    def test_delete_many(self):
+        ids = [self.api.post(self.valid_endpoint, TestPOSTRequest.valid_entry()).insertId for _ in range(3)]
+        rows = [{self.valid_endpoint_pkey: _id} for _id in ids]
+        rows.append({self.valid_endpoint_pkey: self.BIG_FAKE_ID})
+        report = self.api.delete_many(self.valid_endpoint, rows, self._operador_mock)
+        self.assertEqual(len(report.succeeded), 3)
+        self.assertTrue(all(isinstance(r, APIDELETEResponse) for r in report.succeeded))
+        self.assertEqual(report.errors[0][0], 3)
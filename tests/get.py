@@ -1,10 +1,14 @@
 # coding=utf-8
 import warnings
+from itertools import islice
 
 from requests.structures import CaseInsensitiveDict
 
+from unirio.api import UNIRIOAPIRequest
+from unirio.api.cache import MemoryCache
 from unirio.api.result import *
 from unirio.api.exceptions import *
+from tests import config
 from collections import Iterable, Sized, Mapping
 from tests.request import TestAPIRequest
 
@@ -140,6 +144,69 @@ class TestGETRequest(TestAPIRequest):
         with self.assertRaises(InvalidEndpointException):
             self.api.get_single_result(self.endpoints['invalid_endpoints'][0], bypass_no_content_exception=True)
 
+    def test_next_request_for_result(self):
+        try:
+            result = self.api.get(self.valid_endpoint, {'LMIN': 0, 'LMAX': 2})
+        except NoContentException:
+            return self.__no_content_warning()
+        next_params = result.next_request_for_result()
+        if len(result) < 2:
+            self.assertIsNone(next_params)
+        else:
+            self.assertEqual((next_params['LMIN'], next_params['LMAX']), (2, 4))
+
+    def test_iter_all(self):
+        params = {'ORDERBY': self.valid_endpoint_pkey}
+        try:
+            expected = self.api.get(self.valid_endpoint, dict(params, LMIN=0, LMAX=10)).content
+        except NoContentException:
+            return self.__no_content_warning()
+        rows = list(islice(self.api.iter_all(self.valid_endpoint, params, page_size=3), 10))
+        self.assertEqual([r[self.valid_endpoint_pkey] for r in rows],
+                         [r[self.valid_endpoint_pkey] for r in expected])
+
+    def test_iter_all_without_content(self):
+        rows = list(self.api.iter_all(self.valid_endpoint, {self.valid_endpoint_pkey: 99999999999999999999999999999}))
+        self.assertEqual(rows, [])
+
+    def test_no_content_cache(self):
+        cache = MemoryCache()
+        api = UNIRIOAPIRequest(config.KEY, config.SERVER, cache=cache, debug=False, no_content_cache_time=60)
+        params = {self.valid_endpoint_pkey: 99999999999999999999999999999}
+        for i in range(3):
+            with self.assertRaises(NoContentException):
+                api.get(self.valid_endpoint, dict(params), cache_time=120)
+        result = api.get(self.valid_endpoint, dict(params), cache_time=120, bypass_no_content_exception=True)
+        self.assertEqual(len(result), 0)
+        self.assertEqual((cache.misses, cache.hits), (1, 3))
+        api.close()
+
+    def test_no_content_cache_disabled(self):
+        cache = MemoryCache()
+        params = {self.valid_endpoint_pkey: 99999999999999999999999999999}
+        self.api.cache = cache
+        for i in range(2):
+            with self.assertRaises(NoContentException):
+                self.api.get(self.valid_endpoint, dict(params), cache_time=120)
+        self.assertEqual((cache.misses, cache.hits), (2, 0))
+
+    def test_get_many(self):
+        queries = [
+            (self.valid_endpoint, {'LMIN': 0, 'LMAX': 1}),
+            (self.endpoints['invalid_endpoints'][0],),
+            (self.valid_endpoint, {self.valid_endpoint_pkey: 99999999999999999999999999999}, ['PROJNAME']),
+        ]
+        results = self.api.get_many(queries, max_workers=3)
+        self.assertEqual(len(results), 3)
+        self.assertIsInstance(results[0], (APIResultObject, NoContentException))
+        self.assertIsInstance(results[1], InvalidEndpointException)
+        self.assertIsInstance(results[2], NoContentException)
+
+    def test_get_many_fail_fast(self):
+        queries = [(path,) for path in self.endpoints['invalid_endpoints']]
+        with self.assertRaises(InvalidEndpointException):
+            self.api.get_many(queries, fail_fast=True)
+
     def test_case_insensibility(self):
         valid_entry = self.api.get_single_result(self.valid_endpoint)
 
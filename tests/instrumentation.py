@@ -0,0 +1,139 @@
+# coding=utf-8
+import threading
+import time
+import unittest
+
+from unirio.api import UNIRIOAPIRequest, MetricsAggregator, Instrumentation, RetryPolicy, MemoryCache
+from unirio.api.exceptions import InvalidEndpointException
+from unirio.api.instrumentation import LatencyHistogram
+from tests import config
+from tests.server import MockAPIServer, ENDPOINT, PKEY
+
+
+class _Recorder(Instrumentation):
+    def __init__(self):
+        self.events = []
+        self.lock = threading.Lock()
+
+    def on_request(self, event):
+        with self.lock:
+            self.events.append(event)
+
+
+class _Broken(Instrumentation):
+    def on_request(self, event):
+        raise RuntimeError
+
+
+class TestInstrumentation(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.server = MockAPIServer().start()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.stop()
+
+    def setUp(self):
+        self.server.failures = []
+        self.server.latency = 0
+        self.recorder = _Recorder()
+
+    def api(self, **kwargs):
+        return UNIRIOAPIRequest(config.KEY, self.server.url, debug=False,
+                                instrumentation=[self.recorder, _Broken()], **kwargs)
+
+    def test_get_event(self):
+        result = self.api().get(ENDPOINT, {'LMIN': 0, 'LMAX': 5})
+        event, = self.recorder.events
+        self.assertEqual((event.method, event.path, event.endpoint, event.status), ('GET', ENDPOINT, ENDPOINT, 200))
+        self.assertEqual(event.bytes_in, len(result.response.content))
+        self.assertEqual(event.bytes_out, 0)
+        self.assertEqual((event.attempts, event.retries, event.cache, event.error), (1, 0, None, None))
+        self.assertGreater(event.decode_time, 0)
+        self.assertEqual(event.decode_time, result.decode_time)
+        self.assertTrue(0 < event.ttfb <= event.total_time)
+        self.assertIsNone(event.dns_time)
+
+    def test_error_event(self):
+        with self.assertRaises(InvalidEndpointException):
+            self.api().get('INEXISTENTE')
+        event, = self.recorder.events
+        self.assertEqual((event.status, event.error), (404, 'InvalidEndpointException'))
+
+    def test_retries(self):
+        api = self.api(retry_policy=RetryPolicy(backoff=0.01))
+        self.server.fail(2, 503)
+        api.get(ENDPOINT)
+        event, = self.recorder.events
+        self.assertEqual((event.attempts, event.retries, event.status), (3, 2, 200))
+
+    def test_cache(self):
+        api = self.api(cache=MemoryCache())
+        api.get(ENDPOINT, cache_time=60)
+        api.get(ENDPOINT, cache_time=60)
+        self.assertEqual([e.cache for e in self.recorder.events], ['miss', 'hit'])
+        self.assertIsNone(self.recorder.events[1].status)
+
+    def test_cache_stale_while_revalidate(self):
+        api = self.api(cache=MemoryCache(stale_while_revalidate=60))
+        api.get(ENDPOINT, cache_time=0.1)
+        time.sleep(0.2)
+        api.get(ENDPOINT, cache_time=0.1)
+        # A atualização em segundo plano emite seu próprio evento
+        for _ in range(50):
+            if len(self.recorder.events) == 3:
+                break
+            time.sleep(0.02)
+        self.assertEqual(sorted(e.cache for e in self.recorder.events), ['miss', 'miss', 'stale'])
+
+    def test_cache_shared_load(self):
+        api = self.api(cache=MemoryCache())
+        self.server.latency = 0.2
+        threads = [threading.Thread(target=api.get, args=(ENDPOINT,), kwargs={'cache_time': 60}) for _ in range(2)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(sorted(e.cache for e in self.recorder.events), ['miss', 'shared'])
+
+    def test_write_events(self):
+        api = self.api()
+        api.post(ENDPOINT, {'PROJNAME': 'x', 'COD_OPERADOR': 1})
+        api.delete(ENDPOINT, {PKEY: 1, 'COD_OPERADOR': 1})
+        events = self.recorder.events
+        self.assertEqual([(e.method, e.status) for e in events], [('POST', 201), ('DELETE', 200)])
+        self.assertGreater(events[0].bytes_out, 0)
+
+    def test_histogram(self):
+        histogram = LatencyHistogram()
+        self.assertIsNone(histogram.percentile(50))
+        for i in range(1, 101):
+            histogram.record(i / 1000.0)
+        self.assertAlmostEqual(histogram.percentile(50), 0.05, delta=0.005)
+        self.assertAlmostEqual(histogram.percentile(99), 0.099, delta=0.01)
+        self.assertEqual(histogram.percentile(100), 0.1)
+        self.assertEqual(histogram.count, 100)
+
+    def test_aggregator(self):
+        metrics = MetricsAggregator()
+        api = UNIRIOAPIRequest(config.KEY, self.server.url, debug=False, instrumentation=metrics)
+        for _ in range(5):
+            api.get(ENDPOINT)
+        with self.assertRaises(InvalidEndpointException):
+            api.get('INEXISTENTE')
+
+        stats = metrics.stats
+        summary = stats[('GET', ENDPOINT)]
+        self.assertEqual(summary['count'], 5)
+        self.assertEqual(summary['status'], {200: 5})
+        self.assertTrue(0 < summary['p50'] <= summary['p95'] <= summary['p99'] <= summary['max'])
+        self.assertEqual(stats[('GET', 'INEXISTENTE')]['errors'], {'InvalidEndpointException': 1})
+
+        self.server.latency = 0.05
+        api.get(ENDPOINT, {'LMIN': 0, 'LMAX': 1})
+        (slowest, _), = metrics.slowest(1, 'max')
+        self.assertEqual(slowest, ('GET', ENDPOINT))
+
+        metrics.reset()
+        self.assertEqual(metrics.stats, {})
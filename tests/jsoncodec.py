@@ -0,0 +1,70 @@
+# coding=utf-8
+import unittest
+
+from requests.structures import CaseInsensitiveDict
+
+from unirio.api import UNIRIOAPIRequest
+from unirio.api.result import APIResultObject, APIProcedureSyncResponse
+from unirio.api.jsoncodec import *
+from unirio.api.jsoncodec import orjson, ujson
+from tests import config
+from tests.request import mock_response
+
+
+class TestJSONCodec(unittest.TestCase):
+    rows = [{'ID_UNIT_TEST': 1, 'PROJNAME': u'ação', 'DETALHES': {'NOTA': 7.5, 'TAGS': [{'NOME': 'x'}]}}]
+
+    def codecs(self):
+        codecs = [StdlibJSONCodec()]
+        if orjson is not None:
+            codecs.append(OrjsonCodec())
+        if ujson is not None:
+            codecs.append(UjsonCodec())
+        return codecs
+
+    def test_round_trip(self):
+        for codec in self.codecs():
+            data = codec.dumps({'content': self.rows})
+            self.assertIsInstance(data, bytes)
+            self.assertEqual(codec.loads(data), {'content': self.rows})
+
+    def test_case_insensitive(self):
+        for codec in self.codecs():
+            row = codec.loads_case_insensitive(codec.dumps(self.rows))[0]
+            self.assertIsInstance(row, CaseInsensitiveDict)
+            self.assertEqual(row['projname'], u'ação')
+            self.assertEqual(row['detalhes']['tags'][0]['nome'], 'x')
+
+    def test_invalid_json_raises_value_error(self):
+        for codec in self.codecs():
+            with self.assertRaises(ValueError):
+                codec.loads(b'{"content": [')
+
+    def test_get_codec(self):
+        self.assertIsNone(get_codec(None))
+        self.assertIsInstance(get_codec('json'), StdlibJSONCodec)
+        self.assertIsInstance(get_codec('auto'), JSONCodec)
+        codec = StdlibJSONCodec()
+        self.assertIs(get_codec(codec), codec)
+        with self.assertRaises(ValueError):
+            get_codec('inexistente')
+
+    def test_results_decoded_with_codec(self):
+        payload = {'content': self.rows, 'subset': [0, 1]}
+        for codec in self.codecs():
+            api = UNIRIOAPIRequest(config.KEY, config.SERVER, debug=False, json_codec=codec)
+            result = APIResultObject(mock_response(200, payload), api)
+            self.assertEqual(result.first()['projname'], u'ação')
+            self.assertEqual((result.lmin, result.lmax), (0, 1))
+            compact = APIResultObject(mock_response(200, payload), api, compact=True)
+            self.assertEqual(compact.first()['DETALHES']['NOTA'], 7.5)
+            procedure = APIProcedureSyncResponse(mock_response(201, self.rows), api)
+            self.assertEqual(procedure.content[0]['id_unit_test'], 1)
+
+    def test_request_body(self):
+        api = UNIRIOAPIRequest(config.KEY, config.SERVER, debug=False)
+        self.assertEqual(api._json_body({'a': 1}), {'json': {'a': 1}})
+        api = UNIRIOAPIRequest(config.KEY, config.SERVER, debug=False, json_codec='json')
+        body = api._json_body({'a': 1})
+        self.assertEqual(body['data'], b'{"a": 1}')
+        self.assertEqual(body['headers'], {'Content-Type': 'application/json'})
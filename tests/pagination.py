@@ -0,0 +1,78 @@
+# coding=utf-8
+import time
+import unittest
+
+from unirio.api.pagination import PagePrefetcher, _page_size
+
+
+class FakeResponse(object):
+    def __init__(self, size):
+        self.content = b'x' * size
+
+
+class FakePage(object):
+    def __init__(self, number, size=10, rows=0):
+        self.number = number
+        self.response = FakeResponse(size)
+        self.content = [{'ROW': i} for i in range(rows)]
+
+
+class TestPagePrefetcher(unittest.TestCase):
+    def pages(self, count, size=10, fetched=None):
+        for i in range(count):
+            if fetched is not None:
+                fetched.append(i)
+            yield FakePage(i, size)
+
+    def wait_for(self, condition, timeout=2):
+        deadline = time.time() + timeout
+        while not condition() and time.time() < deadline:
+            time.sleep(0.01)
+
+    def test_yields_every_page_in_order(self):
+        with PagePrefetcher(self.pages(10), depth=3) as prefetcher:
+            self.assertEqual([p.number for p in prefetcher], list(range(10)))
+
+    def test_depth_bounds_read_ahead(self):
+        fetched = []
+        with PagePrefetcher(self.pages(10, fetched=fetched), depth=2) as prefetcher:
+            self.wait_for(lambda: len(fetched) >= 2)
+            time.sleep(0.05)
+            self.assertEqual(len(fetched), 2)
+            next(prefetcher)
+            self.wait_for(lambda: len(fetched) >= 3)
+            time.sleep(0.05)
+            self.assertEqual(len(fetched), 3)
+
+    def test_max_bytes_bounds_read_ahead(self):
+        fetched = []
+        max_bytes = int(_page_size(FakePage(0, size=100)) * 1.5)
+        with PagePrefetcher(self.pages(10, size=100, fetched=fetched), depth=5, max_bytes=max_bytes) as prefetcher:
+            self.wait_for(lambda: len(fetched) >= 2)
+            time.sleep(0.05)
+            self.assertEqual(len(fetched), 2)
+            self.assertEqual([p.number for p in prefetcher], list(range(10)))
+
+    def test_page_size_counts_decoded_rows(self):
+        self.assertGreater(_page_size(FakePage(0, size=100, rows=100)), _page_size(FakePage(0, size=100)) + 100 * 100)
+
+    def test_errors_are_raised_to_the_consumer(self):
+        def failing_pages():
+            yield FakePage(0)
+            raise ValueError('falhou')
+
+        prefetcher = PagePrefetcher(failing_pages())
+        self.assertEqual(next(prefetcher).number, 0)
+        with self.assertRaises(ValueError):
+            next(prefetcher)
+
+    def test_close_stops_worker(self):
+        prefetcher = PagePrefetcher(self.pages(1000), depth=1)
+        next(prefetcher)
+        prefetcher.close()
+        prefetcher._thread.join(2)
+        self.assertFalse(prefetcher._thread.is_alive())
+
+    def test_invalid_depth(self):
+        with self.assertRaises(ValueError):
+            PagePrefetcher(self.pages(1), depth=0)
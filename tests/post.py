@@ -1,8 +1,17 @@
 # coding=utf-8
+import sys
 from tests import config
 from unirio.api.exceptions import *
 from unirio.api.result import *
+from unirio.api import UNIRIOAPIRequest
 from tests.request import TestAPIRequest
+from tests.server import MockAPIServer
+
+try:
+    from StringIO import StringIO
+except ImportError:
+    # Python 3.x
+    from io import StringIO
 
 
 class TestPOSTRequest(TestAPIRequest):
@@ -62,3 +71,37 @@ class TestPOSTRequest(TestAPIRequest):
             results.append(result)
 
         assert all(r == results[0] for r in results)
+
+    def test_post_many(self):
+        entries = [self.valid_entry() for _ in range(5)]
+        entries.append(self._invalid_dummy_params())
+        report = self.api.post_many(self.valid_endpoint, entries, max_workers=3, chunk_size=4)
+        self.assertEqual(len(report), 6)
+        self.assertEqual(len(report.succeeded), 5)
+        self.assertTrue(all(isinstance(r, APIPOSTResponse) for r in report[:5]))
+        self.assertEqual([i for i, e in report.errors], [5])
+        self.assertIsInstance(report.errors[0][1], InvalidParametersException)
+        self.assertFalse(report.ok)
+
+    def test_post_many_common_params(self):
+        entries = [{k: self.random_string(3) for k in config.NOT_NULL_KEYS if k != 'COD_OPERADOR'} for _ in range(3)]
+        report = self.api.post_many(self.valid_endpoint, iter(entries), self._operador_mock)
+        self.assertTrue(report.ok)
+
+    def test_post_many_without_operador(self):
+        entries = [self.valid_entry(), {'PROJNAME': 'abc'}]
+        with self.assertRaises(MissingRequiredParameterException):
+            self.api.post_many(self.valid_endpoint, entries)
+
+    def test_post_many_debug_does_not_print(self):
+        stdout = sys.stdout
+        sys.stdout = StringIO()
+        try:
+            with MockAPIServer() as server:
+                with UNIRIOAPIRequest(config.KEY, server.url, debug=True) as api:
+                    report = api.post_many(self.valid_endpoint, [self.valid_entry() for _ in range(5)])
+            output = sys.stdout.getvalue()
+        finally:
+            sys.stdout = stdout
+        self.assertTrue(report.ok)
+        self.assertEqual(output, '')
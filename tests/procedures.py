@@ -1,10 +1,23 @@
 # coding=utf-8
+import threading
+import time
+import unittest
+from concurrent.futures import TimeoutError, FIRST_EXCEPTION
 from datetime import timedelta, date
 
 from tests import config
 from unirio.api.exceptions import *
 from unirio.api.result import *
-from tests.request import TestAPIRequest
+from unirio.api import UNIRIOAPIRequest
+from unirio.api.request import _split_chunks
+from tests.request import TestAPIRequest, mock_response
+from tests.server import MockAPIServer
+
+try:
+    import asyncio
+    from unirio.api.aio import AsyncUNIRIOAPIRequest, wait_procedure
+except (ImportError, SyntaxError):
+    wait_procedure = None
 
 
 class TestProcedureSyncRequest(TestAPIRequest):
@@ -96,3 +109,159 @@ class TestProcedureSyncRequest(TestAPIRequest):
             results.append(result)
 
         assert all(r == results[0] for r in results)
+
+    def test_split_chunks(self):
+        rows = [{'ID': i} for i in range(10)]
+        self.assertEqual([len(c) for c in _split_chunks(rows, chunk_size=4)], [4, 4, 2])
+        # cada linha serializada ocupa 10 bytes, mais a vírgula
+        self.assertEqual([len(c) for c in _split_chunks(rows, chunk_bytes=25, size=lambda row: 10)], [2, 2, 2, 2, 2])
+        self.assertEqual([len(c) for c in _split_chunks(rows, 3, 25, size=lambda row: 10)], [2, 2, 2, 2, 2])
+        self.assertEqual([len(c) for c in _split_chunks(rows, chunk_bytes=5, size=lambda row: 10)], [1] * 10)
+
+    def test_chunked_procedure(self):
+        data = [self.mock_dataset for _ in range(3)]
+        result = self.api.call_procedure(self.valid_procedure, data, chunk_size=1, max_workers=2)
+        self.assertIsInstance(result, APIProcedureChunkedResponse)
+        self.assertEqual(len(result.responses), 3)
+        self.assertEqual(len(result.content), 3)
+
+    def test_chunked_procedure_with_invalid_dataset(self):
+        invalid = {self.random_string(5): self.random_string(10) for i in range(6)}
+        data = [self.mock_dataset, self.mock_dataset, invalid, self.mock_dataset]
+        with self.assertRaises(MissingRequiredFieldsException) as cm:
+            self.api.call_procedure(self.valid_procedure, data, chunk_size=2)
+        self.assertEqual(cm.exception.chunk_index, 1)
+        self.assertEqual(cm.exception.chunk_offset, 2)
+
+
+class TestProcedureAsyncRequest(unittest.TestCase):
+    procedure = 'FooProcedure'
+
+    @classmethod
+    def setUpClass(cls):
+        cls.server = MockAPIServer().start()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.stop()
+
+    def setUp(self):
+        self.server.procedure_duration = 0.2
+        self.server.latency = 0
+        self.api = UNIRIOAPIRequest(config.KEY, self.server.url, debug=False)
+
+    def tearDown(self):
+        self.api.close()
+
+    def submit(self, data=None):
+        data = data if data is not None else [{'COD_OPERADOR': 1, 'ID': i} for i in range(3)]
+        return self.api.call_procedure(self.procedure, data, async=True)
+
+    def test_accepted_and_refused(self):
+        submission = self.submit([{'COD_OPERADOR': 1}, {'ID': 2}, {'COD_OPERADOR': 1}])
+        self.assertIsInstance(submission, APIProcedureAsyncResponse)
+        self.assertEqual(submission.accepted, [0, 2])
+        self.assertEqual(submission.refused, [1])
+        self.assertFalse(submission.done())
+
+    def test_result(self):
+        submission = self.submit()
+        self.assertFalse(submission.poll())
+        content = submission.result(timeout=5, poll_interval=0.05)
+        self.assertTrue(submission.done())
+        self.assertEqual(len(content), 3)
+        self.assertEqual(content[0]['row'], 0)
+        self.assertIsNone(submission.exception())
+
+    def test_result_timeout(self):
+        self.server.procedure_duration = 5
+        with self.assertRaises(TimeoutError):
+            self.submit().result(timeout=0.1)
+
+    def test_all_refused(self):
+        submission = self.submit([{'ID': 1}])
+        self.assertTrue(submission.done())
+        self.assertIsInstance(submission.exception(), MissingRequiredFieldsException)
+
+    def test_failed_procedure(self):
+        submission = self.submit([{'COD_OPERADOR': 1, 'FALHAR': True}])
+        with self.assertRaises(MissingRequiredFieldsException):
+            submission.result(timeout=5, poll_interval=0.05)
+
+    def test_without_location(self):
+        response = mock_response(202, {'accepted': [0], 'refused': []})
+        submission = APIProcedureAsyncResponse(response, self.api, None)
+        with self.assertRaises(ProcedureException):
+            submission.poll()
+
+    def test_wait_procedures(self):
+        submissions = [self.submit() for _ in range(10)]
+        start = time.time()
+        done, not_done = self.api.wait_procedures(submissions, timeout=5, poll_interval=0.05)
+        self.assertEqual(len(done), 10)
+        self.assertEqual(not_done, set())
+        self.assertLess(time.time() - start, 2)
+        self.assertTrue(all(len(s.content) == 3 for s in done))
+
+    def test_wait_procedures_timeout(self):
+        self.server.procedure_duration = 5
+        done, not_done = self.api.wait_procedures([self.submit(), self.submit()], timeout=0.1)
+        self.assertEqual(done, set())
+        self.assertEqual(len(not_done), 2)
+
+    def test_wait_procedures_first_exception(self):
+        failed = self.submit([{'ID': 1}])
+        self.server.procedure_duration = 5
+        done, not_done = self.api.wait_procedures([failed, self.submit()], return_when=FIRST_EXCEPTION)
+        self.assertEqual(done, {failed})
+
+    def slow_server_for(self, seconds):
+        """
+        Deixa o servidor lento por `seconds`, para que as consultas de um cliente com timeout curto falhem
+        """
+        self.server.latency = 0.2
+        timer = threading.Timer(seconds, setattr, (self.server, 'latency', 0))
+        timer.start()
+        self.addCleanup(timer.cancel)
+
+    def test_poll_timeout_keeps_procedure_pending(self):
+        api = UNIRIOAPIRequest(config.KEY, self.server.url, debug=False, timeout=0.05)
+        submission = api.call_procedure(self.procedure, [{'COD_OPERADOR': 1}], async=True)
+        self.server.latency = 0.2
+        with self.assertRaises(APITimeoutException):
+            submission.poll()
+        self.assertFalse(submission.done())
+        api.close()
+
+    def test_wait_procedures_transient_errors(self):
+        api = UNIRIOAPIRequest(config.KEY, self.server.url, debug=False, timeout=0.1)
+        submissions = [api.call_procedure(self.procedure, [{'COD_OPERADOR': 1}], async=True) for _ in range(3)]
+        self.slow_server_for(0.3)
+        done, not_done = api.wait_procedures(submissions, timeout=5, poll_interval=0.05)
+        api.close()
+        self.assertEqual(len(done), 3)
+        self.assertTrue(all(s.exception() is None for s in done))
+
+    @unittest.skipIf(wait_procedure is None, 'aiohttp não instalado')
+    def test_wait_procedures_asyncio(self):
+        loop = asyncio.new_event_loop()
+        api = AsyncUNIRIOAPIRequest(config.KEY, self.server.url, debug=False)
+        data = [{'COD_OPERADOR': 1}]
+        try:
+            submissions = [loop.run_until_complete(api.call_procedure(self.procedure, data, **{'async': True}))
+                           for _ in range(5)]
+            done, not_done = loop.run_until_complete(api.wait_procedures(submissions, poll_interval=0.05))
+            loop.run_until_complete(api.close())
+        finally:
+            loop.close()
+        self.assertEqual(len(done), 5)
+        self.assertTrue(all(s.result() == [{'ROW': 0}] for s in done))
+
+    @unittest.skipIf(wait_procedure is None, 'aiohttp não instalado')
+    def test_wait_procedure_asyncio(self):
+        loop = asyncio.new_event_loop()
+        try:
+            content = loop.run_until_complete(wait_procedure(self.submit(), timeout=5, poll_interval=0.05))
+        finally:
+            loop.close()
+        self.assertEqual(len(content), 3)
@@ -0,0 +1,128 @@
+# coding=utf-8
+import threading
+import time
+import unittest
+
+from unirio.api import UNIRIOAPIRequest
+from unirio.api.ratelimit import TokenBucket, RateLimiter
+from tests import config
+from tests.server import MockAPIServer, ENDPOINT
+
+try:
+    import asyncio
+    from unirio.api.aio import AsyncUNIRIOAPIRequest, AsyncRateLimiter
+except (ImportError, SyntaxError):
+    AsyncRateLimiter = None
+
+
+class TestRateLimiter(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.server = MockAPIServer().start()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.stop()
+
+    def setUp(self):
+        self.server.latency = 0
+        self.server.max_in_flight = 0
+
+    def test_token_bucket(self):
+        bucket = TokenBucket(rate=10, burst=2)
+        self.assertEqual(bucket.reserve(), 0)
+        self.assertEqual(bucket.reserve(), 0)
+        self.assertAlmostEqual(bucket.reserve(), 0.1, places=2)
+        self.assertAlmostEqual(bucket.reserve(), 0.2, places=2)
+        with self.assertRaises(ValueError):
+            TokenBucket(rate=0)
+
+    def test_acquire_timeout(self):
+        bucket = TokenBucket(rate=10, burst=1)
+        self.assertEqual(bucket.reserve(max_wait=0), 0)
+        self.assertIsNone(bucket.reserve(max_wait=0.05))
+        self.assertAlmostEqual(bucket.reserve(max_wait=0.2), 0.1, places=2)
+
+        limiter = RateLimiter(rate=10, burst=1, max_in_flight=1)
+        self.assertTrue(limiter.acquire(timeout=0.5))
+        start = time.time()
+        self.assertFalse(limiter.acquire(timeout=0.05))
+        self.assertGreaterEqual(time.time() - start, 0.05)
+        limiter.release()
+        self.assertFalse(limiter.acquire(timeout=0.01))
+        self.assertTrue(limiter.acquire(timeout=0.5))
+        limiter.release()
+        self.assertEqual(limiter.stats['acquired'], 2)
+
+    def test_rate(self):
+        limiter = RateLimiter(rate=20, burst=1)
+        start = time.time()
+        for _ in range(6):
+            with limiter:
+                pass
+        self.assertGreaterEqual(time.time() - start, 0.24)
+        self.assertEqual(limiter.stats['acquired'], 6)
+        self.assertEqual(limiter.stats['throttled'], 5)
+
+    def test_max_in_flight(self):
+        limiter = RateLimiter(max_in_flight=2)
+        state = {'current': 0, 'max': 0}
+        lock = threading.Lock()
+
+        def work():
+            with limiter:
+                with lock:
+                    state['current'] += 1
+                    state['max'] = max(state['max'], state['current'])
+                time.sleep(0.02)
+                with lock:
+                    state['current'] -= 1
+
+        threads = [threading.Thread(target=work) for _ in range(8)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        self.assertEqual(state['max'], 2)
+
+    def test_client_rate_limit(self):
+        api = UNIRIOAPIRequest(config.KEY, self.server.url, debug=False, rate_limiter=RateLimiter(rate=20, burst=1))
+        start = time.time()
+        api.get_many([(ENDPOINT, {'LMIN': 0, 'LMAX': 1})] * 6, max_workers=6, fail_fast=True)
+        self.assertGreaterEqual(time.time() - start, 0.24)
+        api.close()
+
+    def test_client_max_in_flight(self):
+        self.server.latency = 0.05
+        api = UNIRIOAPIRequest(config.KEY, self.server.url, debug=False, rate_limiter=RateLimiter(max_in_flight=2))
+        api.get_many([(ENDPOINT, {'LMIN': 0, 'LMAX': 1})] * 8, max_workers=8, fail_fast=True)
+        self.assertEqual(self.server.max_in_flight, 2)
+        api.close()
+
+    def test_path_rate_limiters(self):
+        limiter = RateLimiter(max_in_flight=1)
+        api = UNIRIOAPIRequest(config.KEY, self.server.url, debug=False, path_rate_limiters={'unit_test': limiter})
+        api.get(ENDPOINT, {'LMIN': 0, 'LMAX': 1})
+        api.call_procedure('FooProcedure', [{'COD_OPERADOR': 1}])
+        self.assertEqual(limiter.stats['acquired'], 1)
+        api.close()
+
+    @unittest.skipIf(AsyncRateLimiter is None, 'aiohttp não instalado')
+    def test_async_client_max_in_flight(self):
+        self.server.latency = 0.05
+        loop = asyncio.new_event_loop()
+        api = AsyncUNIRIOAPIRequest(config.KEY, self.server.url, debug=False,
+                                    rate_limiter=AsyncRateLimiter(rate=100, max_in_flight=2))
+        try:
+            tasks = [loop.create_task(api.get(ENDPOINT, {'LMIN': 0, 'LMAX': 1})) for _ in range(8)]
+            loop.run_until_complete(asyncio.wait(tasks))
+            self.assertTrue(all(t.exception() is None for t in tasks))
+            loop.run_until_complete(api.close())
+        finally:
+            loop.close()
+        self.assertEqual(self.server.max_in_flight, 2)
+
+    @unittest.skipIf(AsyncRateLimiter is None, 'aiohttp não instalado')
+    def test_async_client_requires_async_limiter(self):
+        with self.assertRaises(TypeError):
+            AsyncUNIRIOAPIRequest(config.KEY, self.server.url, rate_limiter=RateLimiter(rate=1))
@@ -1,6 +1,8 @@
 # coding=utf-8
+import json
 import random
 import unittest
+from requests.models import Response
 from unirio.api import UNIRIOAPIRequest
 from unirio.api.exceptions import *
 from tests import config
@@ -12,6 +14,20 @@ except ImportError:
     from string import ascii_lowercase as lowercase
 
 
+def mock_response(status_code=200, payload=None, headers=None):
+    """
+    Resposta HTTP montada localmente, para testes que não dependem do servidor
+
+    :type payload: dict
+    :rtype: requests.models.Response
+    """
+    response = Response()
+    response.status_code = status_code
+    response.headers.update(headers or {})
+    response._content = json.dumps(payload).encode('utf-8') if payload is not None else b''
+    return response
+
+
 class TestAPIRequest(unittest.TestCase):
     valid_endpoint = 'UNIT_TEST'
     valid_endpoint_pkey = 'ID_UNIT_TEST'
@@ -45,6 +61,9 @@ class TestAPIRequest(unittest.TestCase):
     def setUp(self):
         self.api = UNIRIOAPIRequest(config.KEY, config.SERVER, cache=None, debug=False)
 
+    def tearDown(self):
+        self.api.close()
+
     @staticmethod
     def random_string(length):
         return ''.join(random.choice(lowercase) for i in range(length))
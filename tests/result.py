@@ -0,0 +1,111 @@
+# coding=utf-8
+import math
+import pickle
+import unittest
+from datetime import date, datetime
+
+from requests.structures import CaseInsensitiveDict
+
+from unirio.api import UNIRIOAPIRequest
+from unirio.api.exceptions import *
+from unirio.api.result import *
+from unirio.api.rows import CompactRow
+from unirio.api.columns import numpy
+from tests import config
+from tests.request import mock_response
+
+
+class TestAPIResultObject(unittest.TestCase):
+    rows = [{'ID_UNIT_TEST': 1, 'PROJNAME': 'abc'}, {'ID_UNIT_TEST': 2, 'PROJNAME': 'def'}]
+    typed_rows = [
+        {'ID': 1, 'NOTA': 7.5, 'FALTAS': 2, 'DT_NASC': '1990-01-31', 'DT_ALT': '2016-05-01 10:00:00', 'NOME': 'a'},
+        {'ID': 2, 'NOTA': 8, 'FALTAS': None, 'DT_NASC': None, 'DT_ALT': '2016-05-02 11:30:00', 'NOME': 'b'},
+    ]
+
+    def setUp(self):
+        self.api = UNIRIOAPIRequest(config.KEY, config.SERVER, debug=False)
+
+    def result(self, status_code=200, headers=None, cached=None, compact=False):
+        response = mock_response(status_code, {'content': self.rows, 'subset': [0, 2]} if status_code == 200 else None,
+                                 headers)
+        return APIResultObject(response, self.api, cached, compact)
+
+    def test_validators(self):
+        result = self.result(headers={'ETag': '"v1"', 'Last-Modified': 'Wed, 21 Oct 2015 07:28:00 GMT'})
+        self.assertEqual(result.validators, {'If-None-Match': '"v1"',
+                                             'If-Modified-Since': 'Wed, 21 Oct 2015 07:28:00 GMT'})
+        self.assertEqual(self.result().validators, {})
+
+    def test_not_modified_renews_cached_result(self):
+        cached = self.result(headers={'ETag': '"v1"'})
+        renewed = self.result(304, cached=cached)
+        self.assertEqual(renewed.content, cached.content)
+        self.assertEqual((renewed.lmin, renewed.lmax), (0, 2))
+        self.assertEqual(renewed.etag, '"v1"')
+
+    def test_not_modified_without_cached_result(self):
+        with self.assertRaises(UnhandledAPIException):
+            self.result(304)
+
+    def test_compact_rows(self):
+        result = self.result(compact=True)
+        row = result.first()
+        self.assertIsInstance(row, CompactRow)
+        self.assertEqual(row['id_unit_test'], 1)
+        self.assertEqual(row['PROJNAME'], 'abc')
+        self.assertIn('Projname', row)
+        self.assertEqual(set(result.fields), {'ID_UNIT_TEST', 'PROJNAME'})
+        with self.assertRaises(KeyError):
+            row['INEXISTENTE']
+
+    def test_compact_rows_share_field_index(self):
+        result = self.result(compact=True)
+        self.assertIs(result[0]._index, result[1]._index)
+
+    def test_compact_rows_equal_case_insensitive_dicts(self):
+        self.assertEqual(self.result(compact=True).content, self.result().content)
+        self.assertEqual(self.result(compact=True).first(), CaseInsensitiveDict({'projname': 'abc', 'id_unit_test': 1}))
+
+    def test_compact_rows_are_picklable(self):
+        result = pickle.loads(pickle.dumps(self.result(compact=True), pickle.HIGHEST_PROTOCOL))
+        self.assertEqual(result.first()['projname'], 'abc')
+        self.assertEqual(dict(result[1]), {'ID_UNIT_TEST': 2, 'PROJNAME': 'def'})
+
+    def typed_result(self, compact=False):
+        response = mock_response(200, {'content': self.typed_rows, 'subset': [0, 2]})
+        return APIResultObject(response, self.api, compact=compact)
+
+    def test_to_columns(self):
+        for compact in (False, True):
+            columns = self.typed_result(compact).to_columns(use_numpy=False)
+            self.assertEqual(columns.num_rows, 2)
+            self.assertEqual(columns['id'].typecode in ('q', 'l'), True)
+            self.assertEqual(list(columns['ID']), [1, 2])
+            self.assertEqual(columns['NOTA'].typecode, 'd')
+            self.assertEqual(list(columns['NOTA']), [7.5, 8.0])
+            self.assertEqual(columns['FALTAS'][0], 2.0)
+            self.assertTrue(math.isnan(columns['FALTAS'][1]))
+            self.assertEqual(columns['DT_NASC'], [date(1990, 1, 31), None])
+            self.assertEqual(columns['DT_ALT'][1], datetime(2016, 5, 2, 11, 30))
+            self.assertEqual(columns['NOME'], ['a', 'b'])
+
+    @unittest.skipIf(numpy is None, 'NumPy não instalado')
+    def test_to_columns_numpy(self):
+        columns = self.typed_result(compact=True).to_columns(use_numpy=True)
+        self.assertEqual(columns['ID'].dtype, numpy.int64)
+        self.assertEqual(columns['NOTA'].sum(), 15.5)
+        self.assertTrue(numpy.isnan(columns['FALTAS'][1]))
+        self.assertEqual(str(columns['DT_NASC'].dtype), 'datetime64[D]')
+
+    def big_int_result(self):
+        response = mock_response(200, {'content': [{'ID': 1}, {'ID': 2 ** 63 + 1}], 'subset': [0, 2]})
+        return APIResultObject(response, self.api, compact=True)
+
+    def test_to_columns_int_overflow(self):
+        self.assertEqual(list(self.big_int_result().to_columns(use_numpy=False)['ID']), [1, 2 ** 63 + 1])
+
+    @unittest.skipIf(numpy is None, 'NumPy não instalado')
+    def test_to_columns_numpy_int_overflow(self):
+        column = self.big_int_result().to_columns(use_numpy=True)['ID']
+        self.assertEqual(column.dtype, object)
+        self.assertEqual(list(column), [1, 2 ** 63 + 1])
@@ -0,0 +1,138 @@
+# coding=utf-8
+import time
+import unittest
+
+from requests.exceptions import ConnectionError
+from unirio.api import UNIRIOAPIRequest, RetryPolicy
+from unirio.api.exceptions import UnhandledAPIException, APITimeoutException
+from tests import config
+from tests.server import MockAPIServer, ENDPOINT, PKEY
+
+
+class TestRetryPolicy(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.server = MockAPIServer().start()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.stop()
+
+    def setUp(self):
+        self.server.failures = []
+        self.server.hits.clear()
+
+    def api(self, **policy):
+        policy.setdefault('backoff', 0.01)
+        return UNIRIOAPIRequest(config.KEY, self.server.url, debug=False, retry_policy=RetryPolicy(**policy))
+
+    def test_delay(self):
+        policy = RetryPolicy(backoff=0.1, multiplier=2, max_backoff=0.3, jitter=False)
+        self.assertEqual([policy.delay(i) for i in (1, 2, 3, 4)], [0.1, 0.2, 0.3, 0.3])
+
+        policy = RetryPolicy(backoff=0.1, multiplier=2)
+        for _ in range(20):
+            self.assertTrue(0 <= policy.delay(2) <= 0.2)
+
+        with self.assertRaises(ValueError):
+            RetryPolicy(max_attempts=0)
+
+    def test_get_recovers(self):
+        api = self.api()
+        self.server.fail(2, 503)
+        result = api.get(ENDPOINT, {'LMIN': 0, 'LMAX': 5})
+        self.assertEqual(len(result.content), 5)
+        self.assertEqual(self.server.hits['GET'], 3)
+        self.assertEqual(api.retry_policy.stats, {'calls': 1, 'retries': 2, 'recovered': 1, 'exhausted': 0})
+
+    def test_get_single_result_recovers(self):
+        api = self.api()
+        self.server.fail(1, 500)
+        result = api.get_single_result(ENDPOINT, {PKEY: 3})
+        self.assertEqual(result[PKEY], 3)
+        self.assertEqual(api.retry_policy.stats['recovered'], 1)
+
+    def test_exhausted(self):
+        api = self.api(max_attempts=3)
+        self.server.fail(5, 500)
+        with self.assertRaises(UnhandledAPIException):
+            api.get(ENDPOINT)
+        self.assertEqual(self.server.hits['GET'], 3)
+        self.assertEqual(api.retry_policy.stats['exhausted'], 1)
+
+    def test_status_not_retried(self):
+        api = self.api()
+        self.server.fail(1, 404)
+        with self.assertRaises(Exception):
+            api.get(ENDPOINT)
+        self.assertEqual(self.server.hits['GET'], 1)
+        self.assertEqual(api.retry_policy.stats['retries'], 0)
+
+    def test_retry_after(self):
+        api = self.api(backoff=0)
+        self.server.fail(1, 503, {'Retry-After': 0.2})
+        start = time.time()
+        api.get(ENDPOINT)
+        self.assertGreaterEqual(time.time() - start, 0.2)
+
+    def test_retry_after_is_capped(self):
+        api = self.api(backoff=0, max_retry_after=0.1)
+        self.server.fail(1, 503, {'Retry-After': 3600})
+        start = time.time()
+        api.get(ENDPOINT)
+        self.assertLess(time.time() - start, 1)
+        self.assertEqual(self.server.hits['GET'], 2)
+
+    def test_deadline(self):
+        api = self.api(max_attempts=10, backoff=0.1, multiplier=1, jitter=False, deadline=0.25)
+        self.server.fail(10, 500)
+        start = time.time()
+        with self.assertRaises(APITimeoutException) as cm:
+            api.get(ENDPOINT)
+        self.assertLess(time.time() - start, 0.25)
+        self.assertLess(self.server.hits['GET'], 4)
+        self.assertEqual(cm.exception.response.status_code, 500)
+        self.assertEqual(api.retry_policy.stats['exhausted'], 1)
+
+    def test_connection_error(self):
+        server = MockAPIServer()
+        url = server.url
+        server.server_close()
+        policy = RetryPolicy(max_attempts=2, backoff=0.01)
+        api = UNIRIOAPIRequest(config.KEY, url, debug=False, retry_policy=policy)
+        with self.assertRaises(ConnectionError):
+            api.get(ENDPOINT)
+        self.assertEqual(policy.stats['retries'], 1)
+
+    def test_deadline_after_connection_error(self):
+        server = MockAPIServer()
+        url = server.url
+        server.server_close()
+        policy = RetryPolicy(max_attempts=10, backoff=0.2, jitter=False, deadline=0.1)
+        api = UNIRIOAPIRequest(config.KEY, url, debug=False, retry_policy=policy)
+        with self.assertRaises(APITimeoutException) as cm:
+            api.get(ENDPOINT)
+        self.assertIsInstance(cm.exception.__cause__, ConnectionError)
+
+    def test_methods_opt_in(self):
+        api = self.api()
+        self.server.fail(1, 503)
+        with self.assertRaises(Exception):
+            api.put(ENDPOINT, {PKEY: 1, 'COD_OPERADOR': 1})
+        self.assertEqual(self.server.hits['PUT'], 1)
+
+        api = self.api(methods=('GET', 'PUT', 'DELETE'))
+        self.server.fail(1, 503)
+        api.put(ENDPOINT, {PKEY: 1, 'COD_OPERADOR': 1})
+        self.server.fail(1, 503)
+        api.delete(ENDPOINT, {PKEY: 1, 'COD_OPERADOR': 1})
+        self.assertEqual(self.server.hits['PUT'], 3)
+        self.assertEqual(self.server.hits['DELETE'], 2)
+        self.assertEqual(api.retry_policy.stats['recovered'], 2)
+
+    def test_post_not_retried(self):
+        api = self.api(methods=('GET', 'PUT', 'DELETE'))
+        self.server.fail(1, 503)
+        with self.assertRaises(Exception):
+            api.post(ENDPOINT, {'PROJNAME': 'x', 'COD_OPERADOR': 1})
+        self.assertEqual(self.server.hits['POST'], 1)
@@ -0,0 +1,272 @@
+# coding=utf-8
+"""
+Servidor HTTP local que simula a API, para testes e benchmarks que não dependem do servidor real.
+
+    with MockAPIServer(rows=100) as server:
+        api = UNIRIOAPIRequest(config.KEY, server.url, debug=False)
+        api.get('UNIT_TEST', {'LMIN': 0, 'LMAX': 10})
+"""
+import hashlib
+import itertools
+import json
+import threading
+import time
+from collections import Counter
+
+try:
+    from http.server import BaseHTTPRequestHandler, HTTPServer
+    from socketserver import ThreadingMixIn
+    from urllib.parse import urlparse, parse_qs
+except ImportError:
+    from BaseHTTPServer import BaseHTTPRequestHandler, HTTPServer
+    from SocketServer import ThreadingMixIn
+    from urlparse import urlparse, parse_qs
+
+
+ENDPOINT = 'UNIT_TEST'
+PKEY = 'ID_UNIT_TEST'
+BIG_FAKE_ID = 2749873460397
+# Endpoints existentes para os quais a chave de teste não tem permissão
+FORBIDDEN_ENDPOINTS = ('PROJETOS', 'ALUNOS', 'PESSOAS')
+
+
+def mock_rows(count):
+    """
+    :rtype: list
+    """
+    return [{PKEY: i, 'PROJNAME': 'projeto %d' % i, 'NOTA': i * 1.5, 'DT_INICIAL': '2016-01-%02d' % (i % 28 + 1)}
+            for i in range(count)]
+
+
+class _Job(object):
+    def __init__(self, rows, duration):
+        self.rows = rows
+        self.finishes = time.time() + duration
+
+    @property
+    def done(self):
+        return time.time() >= self.finishes
+
+
+class MockAPIServer(ThreadingMixIn, HTTPServer):
+    daemon_threads = True
+    request_queue_size = 128
+
+    def __init__(self, rows=25, latency=0, procedure_duration=0):
+        """
+        :type rows: int or list
+        :param rows: Linhas do endpoint UNIT_TEST, ou a quantidade de linhas geradas por `mock_rows`
+        :type latency: float
+        :param latency: Tempo, em segundos, que o servidor aguarda antes de responder cada requisição
+        :type procedure_duration: float
+        :param procedure_duration: Duração, em segundos, da execução de uma procedure assíncrona
+        """
+        HTTPServer.__init__(self, ('127.0.0.1', 0), _Handler)
+        self.rows = mock_rows(rows) if isinstance(rows, int) else rows
+        self.latency = latency
+        # Intervalo, em segundos, entre os blocos de 256 bytes do corpo das respostas. 0 envia o corpo de uma vez
+        self.trickle = 0
+        self.procedure_duration = procedure_duration
+        self.hits = Counter()
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.procedure_calls = []
+        self.jobs = {}
+        self.failures = []
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+        self._thread = None
+
+    @property
+    def url(self):
+        return 'http://127.0.0.1:%d/api' % self.server_address[1]
+
+    def start(self):
+        self._thread = threading.Thread(target=self.serve_forever, name='mock-api-server')
+        self._thread.daemon = True
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.shutdown()
+        self.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.stop()
+
+    def fail(self, count=1, status=500, headers=None):
+        """
+        Faz com que as próximas `count` requisições falhem com `status`, independente do endpoint
+
+        :type headers: dict
+        :param headers: Cabeçalhos das respostas com falha. Ex: {'Retry-After': 0.1}
+        """
+        with self._lock:
+            self.failures.extend([(status, headers)] * count)
+
+    def next_failure(self):
+        with self._lock:
+            return self.failures.pop(0) if self.failures else None
+
+    def next_id(self):
+        with self._lock:
+            return next(self._ids)
+
+    def begin(self, method):
+        with self._lock:
+            self.hits[method] += 1
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+
+    def end(self):
+        with self._lock:
+            self.in_flight -= 1
+
+
+def _invalid_procedure_row(row):
+    # Os datasets de uma procedure precisam de COD_OPERADOR
+    return not any(k.upper() == 'COD_OPERADOR' for k in row)
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    # Cabeçalhos e corpo são enviados em escritas separadas: com o algoritmo de Nagle, a segunda escrita
+    # aguarda o ACK atrasado do cliente (~40ms) e distorce as medições de latência
+    disable_nagle_algorithm = True
+
+    def log_message(self, format, *args):
+        pass
+
+    @property
+    def path_parts(self):
+        return urlparse(self.path).path.split('/')[2:]
+
+    @property
+    def query(self):
+        return {k.upper(): v[-1] for k, v in parse_qs(urlparse(self.path).query).items()}
+
+    def body(self):
+        raw = self.rfile.read(int(self.headers.get('Content-Length') or 0)).decode('utf-8')
+        if self.headers.get('Content-Type', '').startswith('application/json'):
+            return json.loads(raw)
+        return {k.upper(): v[-1] for k, v in parse_qs(raw).items()}
+
+    def reply(self, status, body=None, headers=None):
+        if body is not None and not isinstance(body, bytes):
+            body = json.dumps(body).encode('utf-8')
+        self.send_response(status)
+        for k, v in (headers or {}).items():
+            self.send_header(k, str(v))
+        if status not in (204, 304):
+            self.send_header('Content-Length', str(len(body or b'')))
+        self.end_headers()
+        if body and status not in (204, 304):
+            if not self.server.trickle:
+                self.wfile.write(body)
+                return
+            for i in range(0, len(body), 256):
+                self.wfile.write(body[i:i + 256])
+                self.wfile.flush()
+                time.sleep(self.server.trickle)
+
+    def handle_method(self, method):
+        self.server.begin(method)
+        try:
+            self.dispatch(method)
+        finally:
+            self.server.end()
+
+    def dispatch(self, method):
+        if self.server.latency:
+            time.sleep(self.server.latency)
+        failure = self.server.next_failure()
+        if failure is not None:
+            self.body()
+            return self.reply(failure[0], b'', failure[1])
+        parts = self.path_parts
+        if parts[:1] == ['procedure']:
+            return getattr(self, 'procedure_' + method.lower())(parts[1:])
+        if parts != [ENDPOINT]:
+            # Consome o corpo, para que a conexão possa ser reaproveitada
+            self.body()
+            return self.reply(403 if parts[0] in FORBIDDEN_ENDPOINTS else 404, b'')
+        return getattr(self, 'table_' + method.lower())()
+
+    def do_GET(self):
+        self.handle_method('GET')
+
+    def do_POST(self):
+        self.handle_method('POST')
+
+    def do_PUT(self):
+        self.handle_method('PUT')
+
+    def do_DELETE(self):
+        self.handle_method('DELETE')
+
+    def table_get(self):
+        query = self.query
+        lmin = int(query.pop('LMIN', 0))
+        lmax = int(query.pop('LMAX', len(self.server.rows)))
+        fields = [f for f in query.pop('FIELDS', '').split(',') if f]
+        filters = {k: v for k, v in query.items() if k not in ('API_KEY', 'FORMAT')}
+        rows = [r for r in self.server.rows if all(str(r.get(k)) == v for k, v in filters.items())][lmin:lmax]
+        if fields:
+            rows = [{f: r.get(f) for f in fields} for r in rows]
+        if not rows:
+            return self.reply(200, b'')
+
+        body = json.dumps({'content': rows, 'subset': [lmin, lmax]}).encode('utf-8')
+        etag = '"%s"' % hashlib.sha1(body).hexdigest()
+        if self.headers.get('If-None-Match') == etag:
+            return self.reply(304, headers={'ETag': etag})
+        self.reply(200, body, {'ETag': etag})
+
+    def table_post(self):
+        params = self.body()
+        invalid = [k for k in params if k.startswith('INVALID_FIELD')]
+        if invalid:
+            return self.reply(400, b'', {'InvalidParameters': json.dumps(invalid)})
+        _id = self.server.next_id()
+        self.reply(201, b'', {'id': _id, 'Location': '%s/%s?%s=%d' % (self.server.url, ENDPOINT, PKEY, _id)})
+
+    def table_put(self):
+        self.body()
+        self.reply(200, b'', {'Affected': 1})
+
+    def table_delete(self):
+        params = self.body()
+        if params.get(PKEY) == str(BIG_FAKE_ID):
+            return self.reply(204)
+        self.reply(200, b'', {'Affected': 1})
+
+    def procedure_post(self, parts):
+        body = self.body()
+        data = body.get('data') or []
+        self.server.procedure_calls.append(len(data))
+        if not body.get('async'):
+            if any(_invalid_procedure_row(row) for row in data):
+                return self.reply(400, b'Missing required fields')
+            return self.reply(201, [{'ROW': i} for i in range(len(data))])
+
+        accepted = [i for i, row in enumerate(data) if not _invalid_procedure_row(row)]
+        refused = [i for i, row in enumerate(data) if _invalid_procedure_row(row)]
+        _id = self.server.next_id()
+        headers = {'id': _id}
+        if accepted:
+            self.server.jobs[_id] = _Job([data[i] for i in accepted], self.server.procedure_duration)
+            headers['Location'] = '%s/procedure/status/%d' % (self.server.url, _id)
+        self.reply(202, {'id': _id, 'accepted': accepted, 'refused': refused}, headers)
+
+    def procedure_get(self, parts):
+        job = self.server.jobs.get(int(parts[1])) if parts[:1] == ['status'] else None
+        if job is None:
+            return self.reply(404, b'')
+        if not job.done:
+            return self.reply(202, b'', {'Retry-After': max(0.01, round(job.finishes - time.time(), 2))})
+        if any('FALHAR' in row for row in job.rows):
+            return self.reply(400, b'Missing required fields')
+        self.reply(200, [{'ROW': i} for i in range(len(job.rows))])
@@ -0,0 +1,71 @@
+# coding=utf-8
+import threading
+import time
+import unittest
+
+from unirio.api.singleflight import SingleFlight
+
+
+class TestSingleFlight(unittest.TestCase):
+    def setUp(self):
+        self.flight = SingleFlight()
+
+    def run_concurrently(self, target, count=10):
+        threads = [threading.Thread(target=target) for i in range(count)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+    def test_identical_calls_are_shared(self):
+        calls = []
+        results = []
+
+        def slow():
+            calls.append(1)
+            time.sleep(0.1)
+            return 'resultado'
+
+        self.run_concurrently(lambda: results.append(self.flight.do('a', slow)))
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(results, ['resultado'] * 10)
+        self.assertEqual(self.flight.stats, {'executed': 1, 'shared': 9})
+
+    def test_exceptions_are_shared(self):
+        errors = []
+
+        def failing():
+            time.sleep(0.1)
+            raise ValueError('falhou')
+
+        def worker():
+            try:
+                self.flight.do('a', failing)
+            except ValueError as e:
+                errors.append(e)
+
+        self.run_concurrently(worker, 5)
+        self.assertEqual(len(errors), 5)
+        self.assertFalse(self.flight.in_flight('a'))
+
+    def test_different_keys_are_not_shared(self):
+        self.assertEqual(self.flight.do('a', lambda: 1), 1)
+        self.assertEqual(self.flight.do('b', lambda: 2), 2)
+        self.assertEqual(self.flight.stats, {'executed': 2, 'shared': 0})
+
+    def test_sequential_calls_are_executed(self):
+        self.flight.do('a', lambda: 1)
+        self.assertEqual(self.flight.do('a', lambda: 2), 2)
+
+    def test_try_begin(self):
+        self.assertTrue(self.flight.try_begin('a'))
+        self.assertFalse(self.flight.try_begin('a'))
+        results = []
+        thread = threading.Thread(target=lambda: results.append(self.flight.do('a', lambda: 2)))
+        thread.start()
+        time.sleep(0.05)
+        self.flight.end('a', 1)
+        thread.join()
+        self.assertEqual(results, [1])
+        self.assertFalse(self.flight.in_flight('a'))
+        self.assertEqual(self.flight.stats, {'executed': 1, 'shared': 1})
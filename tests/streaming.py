@@ -0,0 +1,85 @@
+# coding=utf-8
+import io
+import json
+import unittest
+
+from requests.models import Response
+
+from unirio.api import UNIRIOAPIRequest
+from unirio.api.exceptions import *
+from unirio.api.rows import CompactRow
+from unirio.api.streaming import APIStreamingResultObject
+from tests import config
+from tests.server import MockAPIServer
+
+
+def stream_response(body):
+    """
+    Resposta cujo corpo é lido do socket aos poucos, como uma requisição com stream=True
+
+    :type body: bytes
+    :rtype: requests.models.Response
+    """
+    response = Response()
+    response.status_code = 200
+    response.raw = io.BytesIO(body)
+    return response
+
+
+class TestStreamingResult(unittest.TestCase):
+    valid_endpoint = 'UNIT_TEST'
+    rows = [{'ID_UNIT_TEST': i, 'PROJNAME': u'projeto ação %d' % i, 'NOTA': i * 1.5} for i in range(50)]
+
+    def setUp(self):
+        self.api = UNIRIOAPIRequest(config.KEY, config.SERVER, debug=False)
+
+    def result(self, payload, chunk_size=7, compact=False):
+        body = payload if isinstance(payload, bytes) else json.dumps(payload, indent=1).encode('utf-8')
+        return APIStreamingResultObject(stream_response(body), self.api, compact, chunk_size)
+
+    def test_rows_across_chunk_boundaries(self):
+        result = self.result({'content': self.rows, 'subset': [0, 50]})
+        self.assertEqual(list(result), self.rows)
+        self.assertEqual((result.lmin, result.lmax), (0, 50))
+        self.assertEqual(set(result.fields), {'ID_UNIT_TEST', 'PROJNAME', 'NOTA'})
+
+    def test_subset_before_content(self):
+        body = b'{"subset": [10, 12], "content": [{"ID": 10}, {"ID": 11}]}'
+        result = self.result(body)
+        rows = iter(result)
+        self.assertEqual(next(rows)['id'], 10)
+        self.assertEqual((result.lmin, result.lmax), (10, 12))
+        self.assertEqual(next(rows)['ID'], 11)
+
+    def test_compact_rows(self):
+        rows = list(self.result({'content': self.rows, 'subset': [0, 50]}, compact=True))
+        self.assertIsInstance(rows[0], CompactRow)
+        self.assertIs(rows[0]._index, rows[-1]._index)
+        self.assertEqual(rows[3]['projname'], self.rows[3]['PROJNAME'])
+
+    def test_empty_content(self):
+        self.assertEqual(list(self.result({'content': [], 'subset': [0, 0]})), [])
+
+    def test_empty_body(self):
+        with self.assertRaises(NoContentException):
+            self.result(b'')
+
+    def test_invalid_body(self):
+        with self.assertRaises(NoContentException):
+            list(self.result(b'{"content": [{"ID": 1}, {"ID": '))
+
+    def test_single_iteration(self):
+        result = self.result({'content': self.rows, 'subset': [0, 50]})
+        list(result)
+        with self.assertRaises(RuntimeError):
+            list(result)
+
+    def test_get_stream(self):
+        with MockAPIServer(rows=self.rows) as server:
+            api = UNIRIOAPIRequest(config.KEY, server.url, debug=False)
+            with api.get_stream(self.valid_endpoint, {'LMIN': 0, 'LMAX': 10}) as result:
+                rows = list(result)
+            api.close()
+        self.assertEqual([r['ID_UNIT_TEST'] for r in rows], list(range(10)))
+        self.assertEqual(rows[1]['PROJNAME'], self.rows[1]['PROJNAME'])
+        self.assertEqual((result.lmin, result.lmax), (0, 10))
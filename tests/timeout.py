@@ -0,0 +1,165 @@
+# coding=utf-8
+import threading
+import time
+import unittest
+
+import requests
+from unirio.api import UNIRIOAPIRequest, RetryPolicy, RateLimiter, MemoryCache, CircuitBreaker
+from unirio.api.deadline import Deadline
+from unirio.api.exceptions import APITimeoutException
+from tests import config
+from tests.server import MockAPIServer, ENDPOINT
+
+
+class TestTimeout(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.server = MockAPIServer(rows=25).start()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.stop()
+
+    def setUp(self):
+        self.server.latency = 0
+        self.server.trickle = 0
+        self.server.failures = []
+        self.server.hits.clear()
+
+    def api(self, **kwargs):
+        return UNIRIOAPIRequest(config.KEY, self.server.url, debug=False, **kwargs)
+
+    def test_deadline(self):
+        deadline = Deadline(0.05)
+        self.assertIs(Deadline.of(deadline), deadline)
+        self.assertIsNone(Deadline.of(None))
+        connect, read = deadline.cap((10, 0.01))
+        self.assertTrue(0 < connect <= 0.05)
+        self.assertEqual(read, 0.01)
+        with self.assertRaises(TypeError):
+            Deadline.of('10')
+        time.sleep(0.06)
+        self.assertTrue(deadline.expired)
+        with self.assertRaises(APITimeoutException):
+            deadline.cap(10)
+
+    def test_client_timeout(self):
+        api = self.api(timeout=0.1)
+        self.server.latency = 0.3
+        with self.assertRaises(APITimeoutException) as cm:
+            api.get(ENDPOINT)
+        self.assertIsInstance(cm.exception, requests.exceptions.Timeout)
+
+    def test_call_timeout(self):
+        api = self.api(timeout=0.1)
+        self.server.latency = 0.2
+        self.assertEqual(len(api.get(ENDPOINT, timeout=1).content), 25)
+
+        api = self.api()
+        with self.assertRaises(APITimeoutException):
+            api.get(ENDPOINT, timeout=(1, 0.1))
+
+    def test_call_deadline(self):
+        api = self.api()
+        self.server.latency = 0.3
+        start = time.time()
+        with self.assertRaises(APITimeoutException):
+            api.get(ENDPOINT, deadline=0.1)
+        self.assertLess(time.time() - start, 0.25)
+
+    def test_deadline_covers_body(self):
+        api = self.api(circuit_breaker=CircuitBreaker(window=1, min_calls=1))
+        # Cada bloco chega dentro do timeout de leitura, mas o corpo inteiro leva mais que o deadline
+        self.server.trickle = 0.05
+        with self.assertRaises(APITimeoutException):
+            api.get(ENDPOINT, deadline=0.2)
+        self.assertEqual(api.circuit_breaker.state(api._circuit_key(ENDPOINT)), 'closed')
+        self.assertEqual(len(api.get(ENDPOINT, deadline=5).content), 25)
+
+    def test_capped_timeout_is_not_a_circuit_failure(self):
+        api = self.api(circuit_breaker=CircuitBreaker(window=1, min_calls=1))
+        self.server.latency = 0.3
+        with self.assertRaises(APITimeoutException):
+            api.get(ENDPOINT, deadline=0.1)
+        circuit = api.circuit_breaker.circuit(api._circuit_key(ENDPOINT))
+        self.assertEqual((circuit.state, circuit.calls), ('closed', 0))
+
+        # Um timeout do próprio cliente, sem relação com o deadline, continua sendo uma falha
+        with self.assertRaises(APITimeoutException):
+            api.get(ENDPOINT, timeout=0.1, deadline=5)
+        self.assertEqual(circuit.state, 'open')
+
+    def test_deadline_with_retries(self):
+        policy = RetryPolicy(max_attempts=10, backoff=0.05, multiplier=1, jitter=False)
+        api = self.api(retry_policy=policy)
+        self.server.fail(10, 500)
+        start = time.time()
+        with self.assertRaises(APITimeoutException) as cm:
+            api.get(ENDPOINT, deadline=0.2)
+        self.assertLess(time.time() - start, 0.3)
+        self.assertLess(self.server.hits['GET'], 5)
+        self.assertEqual(cm.exception.response.status_code, 500)
+        self.server.failures = []
+
+    def test_deadline_pagination(self):
+        api = self.api()
+        self.server.latency = 0.05
+        start = time.time()
+        with self.assertRaises(APITimeoutException):
+            list(api.iter_all(ENDPOINT, page_size=2, deadline=0.2))
+        self.assertLess(time.time() - start, 0.35)
+        self.assertLess(self.server.hits['GET'], 6)
+
+    def test_deadline_fan_out(self):
+        api = self.api()
+        self.server.latency = 0.1
+        results = api.get_many([(ENDPOINT, {'LMIN': i, 'LMAX': i + 1}) for i in range(6)], max_workers=2,
+                               deadline=0.15)
+        errors = [r for r in results if isinstance(r, APITimeoutException)]
+        self.assertTrue(errors)
+        self.assertLess(self.server.hits['GET'], 6)
+
+    def assertTimesOut(self, call, seconds=0.1):
+        start = time.time()
+        with self.assertRaises(APITimeoutException):
+            call(deadline=seconds)
+        self.assertLess(time.time() - start, seconds + 0.15)
+
+    def in_background(self, call):
+        """
+        Inicia `call` numa thread e aguarda até que a requisição chegue ao servidor
+        """
+        thread = threading.Thread(target=call)
+        thread.start()
+        self.addCleanup(thread.join)
+        while not self.server.in_flight:
+            time.sleep(0.005)
+
+    def test_deadline_throttled(self):
+        limiter = RateLimiter(rate=1, burst=1)
+        api = self.api(rate_limiter=limiter)
+        api.get(ENDPOINT)
+        self.assertTimesOut(lambda deadline: api.get(ENDPOINT, deadline=deadline))
+        self.assertEqual(limiter.stats['acquired'], 1)
+        self.assertEqual(self.server.hits['GET'], 1)
+
+    def test_deadline_max_in_flight(self):
+        api = self.api(rate_limiter=RateLimiter(max_in_flight=1))
+        self.server.latency = 0.5
+        self.in_background(lambda: api.get(ENDPOINT))
+        self.assertTimesOut(lambda deadline: api.get(ENDPOINT, {'LMIN': 0, 'LMAX': 1}, deadline=deadline))
+        self.assertEqual(self.server.hits['GET'], 1)
+
+    def test_deadline_single_flight_follower(self):
+        api = self.api(single_flight=True)
+        self.server.latency = 0.5
+        self.in_background(lambda: api.get(ENDPOINT))
+        self.assertTimesOut(lambda deadline: api.get(ENDPOINT, deadline=deadline))
+        self.assertEqual(self.server.hits['GET'], 1)
+
+    def test_deadline_cache_follower(self):
+        api = self.api(cache=MemoryCache())
+        self.server.latency = 0.5
+        self.in_background(lambda: api.get(ENDPOINT, cache_time=60))
+        self.assertTimesOut(lambda deadline: api.get(ENDPOINT, cache_time=60, deadline=deadline))
+        self.assertEqual(self.server.hits['GET'], 1)
@@ -1,3 +1,21 @@
 from .request import UNIRIOAPIRequest, APIServer
 from .result import *
 from .exceptions import *
+from .pagination import PagePrefetcher
+from .cache import MemoryCache, SQLiteCache
+from .singleflight import SingleFlight
+from .rows import CompactRow
+from .columns import ColumnarResult
+from .streaming import APIStreamingResultObject
+from .jsoncodec import JSONCodec
+from .ratelimit import RateLimiter
+from .retry import RetryPolicy
+from .circuitbreaker import CircuitBreaker
+from .deadline import Deadline
+from .instrumentation import Instrumentation, MetricsAggregator, RequestEvent
+
+try:
+    from .aio import AsyncUNIRIOAPIRequest, AsyncRateLimiter, wait_procedure
+except (ImportError, SyntaxError):
+    # aiohttp não instalado ou versão do Python sem suporte a async/await
+    pass
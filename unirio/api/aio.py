@@ -0,0 +1,534 @@
+# -*- coding: utf-8 -*-
+"""
+Cliente asyncio da API. Depende do aiohttp, instalado com `pip install unirio-api[async]`.
+"""
+import asyncio
+import json
+import logging
+import ssl
+import time
+
+import aiohttp
+
+from .exceptions import *
+from .result import *
+from .result import _TRANSIENT_POLL_ERRORS
+from .request import BaseAPIRequest, APIServer, requires, _NoContent
+from .pagination import _first_page_params
+from .cache import BaseCache
+from .ratelimit import RateLimiter, _clock
+
+
+__all__ = ('AsyncUNIRIOAPIRequest', 'AsyncRateLimiter', 'wait_procedure')
+
+
+def _encode_fields(params):
+    """
+    Converte um dicionário de parâmetros numa lista de pares (chave, valor) com valores str, expandindo
+    listas e tuplas em chaves repetidas, como o `requests` faz para os parâmetros _SET.
+
+    :type params: dict
+    :rtype: list
+    """
+    encoded = []
+    for k, v in params.items():
+        values = v if isinstance(v, (list, tuple, set, frozenset)) else (v,)
+        for value in values:
+            encoded.append((k, str(value)))
+    return encoded
+
+
+class AsyncResponse(object):
+    def __init__(self, response, content):
+        """
+        Adapta uma resposta já lida do aiohttp à interface de `requests.models.Response` utilizada
+        pelas classes de `unirio.api.result`
+
+        :type response: aiohttp.ClientResponse
+        :type content: bytes
+        """
+        self.status_code = response.status
+        self.headers = response.headers
+        self.url = str(response.url)
+        self.content = content
+        self.encoding = response.charset or 'utf-8'
+
+    @property
+    def text(self):
+        return self.content.decode(self.encoding, 'replace')
+
+    def json(self, **kwargs):
+        return json.loads(self.text, **kwargs)
+
+
+class AsyncRateLimiter(RateLimiter):
+    def __init__(self, rate=None, burst=None, max_in_flight=None):
+        """
+        Versão asyncio de RateLimiter, para AsyncUNIRIOAPIRequest: a espera por uma vaga ou por uma ficha não
+        bloqueia o event loop. Deve ser utilizada num único event loop.
+
+            async with limiter:
+                ...
+
+        :type rate: float
+        :type burst: int
+        :type max_in_flight: int
+        """
+        super(AsyncRateLimiter, self).__init__(rate, burst)
+        self.max_in_flight = max_in_flight
+        self._async_semaphore = None
+
+    @property
+    def semaphore(self):
+        """
+        Criado somente quando utilizado, já que um asyncio.Semaphore fica associado ao event loop
+
+        :rtype: asyncio.Semaphore
+        """
+        if self._async_semaphore is None and self.max_in_flight:
+            self._async_semaphore = asyncio.Semaphore(self.max_in_flight)
+        return self._async_semaphore
+
+    def acquire(self):
+        raise TypeError('AsyncRateLimiter must be acquired with "await limiter.acquire_async()" or "async with".')
+
+    async def acquire_async(self):
+        start = _clock()
+        throttled = False
+        semaphore = self.semaphore
+        if semaphore is not None:
+            throttled = semaphore.locked()
+            await semaphore.acquire()
+        if self.bucket is not None:
+            delay = self.bucket.reserve()
+            if delay > 0:
+                throttled = True
+                await asyncio.sleep(delay)
+        self._record(_clock() - start if throttled else None)
+
+    def release(self):
+        if self._async_semaphore is not None:
+            self._async_semaphore.release()
+
+    async def __aenter__(self):
+        await self.acquire_async()
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        self.release()
+
+
+async def wait_procedure(procedure, timeout=None, poll_interval=None):
+    """
+    Aguarda o término de uma procedure assíncrona sem bloquear o event loop. Submissões feitas com
+    UNIRIOAPIRequest são consultadas num executor, já que utilizam `requests`. `await procedure` equivale
+    a `await wait_procedure(procedure)`.
+
+    :type procedure: APIProcedureAsyncResponse
+    :type timeout: float
+    :param timeout: Tempo máximo de espera, em segundos. None aguarda indefinidamente
+    :type poll_interval: float
+    :param poll_interval: Intervalo entre consultas, caso o servidor não informe Retry-After
+    :return: O resultado da procedure
+    :raises asyncio.TimeoutError: Caso a procedure não termine dentro de `timeout`
+    """
+    loop = asyncio.get_event_loop()
+    deadline = loop.time() + timeout if timeout is not None else None
+    while not procedure.done():
+        try:
+            if isinstance(procedure.request, AsyncUNIRIOAPIRequest):
+                await procedure.request._poll_procedure(procedure)
+            else:
+                await loop.run_in_executor(None, procedure.poll)
+        except _TRANSIENT_POLL_ERRORS + (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            # Uma falha de conexão não encerra a procedure, que continua em execução no servidor
+            logging.warning('Falha ao consultar a procedure %s: %r', procedure.id, e)
+        if procedure.done():
+            break
+        interval = procedure.next_poll_interval(poll_interval)
+        if deadline is not None:
+            remaining = deadline - loop.time()
+            if remaining <= 0:
+                raise asyncio.TimeoutError()
+            interval = min(interval, remaining)
+        await asyncio.sleep(interval)
+    return procedure.result()
+
+
+class AsyncPageIterator(object):
+    def __init__(self, request, path, page_params, fields, cache_time):
+        """
+        Iterador assíncrono sobre as páginas LMIN/LMAX de um endpoint
+
+        :type request: AsyncUNIRIOAPIRequest
+        """
+        self.request = request
+        self.path = path
+        self.fields = fields
+        self.cache_time = cache_time
+        self._page_params = page_params
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        if self._page_params is None:
+            raise StopAsyncIteration
+        try:
+            page = await self.request.get(self.path, self._page_params, self.fields, self.cache_time)
+        except NoContentException:
+            self._page_params = None
+            raise StopAsyncIteration
+        self._page_params = page.next_request_for_result()
+        return page
+
+
+class AsyncRowIterator(object):
+    def __init__(self, pages):
+        """
+        Iterador assíncrono sobre as linhas de cada página de um `AsyncPageIterator`
+
+        :type pages: AsyncPageIterator
+        """
+        self.pages = pages
+        self._rows = iter(())
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        while True:
+            try:
+                return next(self._rows)
+            except StopIteration:
+                page = await self.pages.__anext__()
+                self._rows = iter(page)
+
+
+class AsyncUNIRIOAPIRequest(BaseAPIRequest):
+    """
+    Versão asyncio de UNIRIOAPIRequest. Os métodos retornam os mesmos objetos de `unirio.api.result` e
+    levantam as mesmas exceptions, mas devem ser aguardados com `await`.
+    """
+    is_async = True
+
+    def __init__(self, api_key, server=APIServer.LOCAL, debug=True, cache=None, cert=False,
+                 max_concurrency=100, limit_per_host=0, keepalive_timeout=15, json_codec=None, rate_limiter=None,
+                 path_rate_limiters=None, no_content_cache_time=0):
+        """
+
+        :type server: str
+        :param api_key: The 'API Key' that will the used to perform the requests
+        :param server: The server that will used.
+        :type cache: BaseCache
+        :param cache: MemoryCache, SQLiteCache ou outra subclasse de BaseCache. O resultado já obtido é armazenado;
+                      requisições simultâneas para uma mesma chave ausente do cache são agrupadas numa só
+        :type max_concurrency: int
+        :param max_concurrency: Número máximo de requisições simultâneas em andamento
+        :type limit_per_host: int
+        :param limit_per_host: Número máximo de conexões simultâneas por host. 0 não impõe limite
+        :type keepalive_timeout: float
+        :param keepalive_timeout: Tempo, em segundos, que uma conexão ociosa é mantida aberta
+        :param json_codec: Ver BaseAPIRequest
+        :type rate_limiter: AsyncRateLimiter
+        :param rate_limiter: Ver BaseAPIRequest
+        :param path_rate_limiters: Dicionário {endpoint: AsyncRateLimiter}. Ver BaseAPIRequest
+        :type no_content_cache_time: int
+        :param no_content_cache_time: Ver UNIRIOAPIRequest
+        """
+        super(AsyncUNIRIOAPIRequest, self).__init__(api_key, server, debug, cache, cert, json_codec, rate_limiter,
+                                                    path_rate_limiters)
+        limiters = [rate_limiter] if rate_limiter is not None else []
+        limiters.extend(self.path_rate_limiters.values())
+        if not all(isinstance(limiter, AsyncRateLimiter) for limiter in limiters):
+            raise TypeError('AsyncUNIRIOAPIRequest requires AsyncRateLimiter instances.')
+        if cache is not None and not isinstance(cache, BaseCache):
+            raise TypeError('AsyncUNIRIOAPIRequest requires a BaseCache, such as MemoryCache or SQLiteCache.')
+        self.max_concurrency = max_concurrency
+        self.limit_per_host = limit_per_host
+        self.keepalive_timeout = keepalive_timeout
+        self.no_content_cache_time = no_content_cache_time
+        self._semaphore = None
+        self._session = None
+        # Futures das requisições em andamento para chaves ausentes do cache
+        self._pending = {}
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        await self.close()
+
+    @property
+    def session(self):
+        """
+        Sessão aiohttp criada sob demanda, dentro do event loop em execução
+
+        :rtype: aiohttp.ClientSession
+        """
+        if self._session is None or self._session.closed:
+            connector = aiohttp.TCPConnector(limit=self.max_concurrency,
+                                             limit_per_host=self.limit_per_host,
+                                             keepalive_timeout=self.keepalive_timeout)
+            self._session = aiohttp.ClientSession(connector=connector)
+        return self._session
+
+    @property
+    def semaphore(self):
+        """
+        :rtype: asyncio.Semaphore
+        """
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        return self._semaphore
+
+    async def close(self):
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+
+    @property
+    def _ssl(self):
+        if not self.cert:
+            return False
+        if isinstance(self.cert, str):
+            return ssl.create_default_context(cafile=self.cert)
+        return None
+
+    async def _request(self, method, path, **kwargs):
+        """
+        Ponto único por onde passam todas as requisições HTTP do cliente
+
+        :rtype: AsyncResponse
+        """
+        url = self._url_with_path(path)
+        limiters = self._rate_limiters(path)
+        for limiter in limiters:
+            await limiter.acquire_async()
+        try:
+            async with self.semaphore:
+                async with self.session.request(method, url, ssl=self._ssl, **kwargs) as response:
+                    content = await response.read()
+        finally:
+            for limiter in reversed(limiters):
+                limiter.release()
+        return AsyncResponse(response, content)
+
+    async def get(self, path, params=None, fields=None, cache_time=0, bypass_no_content_exception=False,
+                  no_content_cache_time=None):
+        """
+        Método para realizar uma requisição GET.
+
+        :type path: str
+        :param path: string with an API ENDPOINT
+        :type params: dict
+        :param params: dictionary with URL parameters
+        :type fields: list or tuple
+        :param fields: list with de desired return fields. Empty list or None will return all Fields
+        :type cache_time: int
+        :param cache_time int for cached expiration time. 0 means no cached is applied
+        :type bypass_no_content_exception: bool
+        :param bypass_no_content_exception: optional argument to indicate to return a empty list instead of raising a NoContentException
+        :type no_content_cache_time: int
+        :param no_content_cache_time: Ver UNIRIOAPIRequest.get
+        :rtype : APIResultObject
+        """
+        if no_content_cache_time is None:
+            no_content_cache_time = self.no_content_cache_time
+
+        async def _get():
+            query = dict(params or {})
+            payload = self._url_query_data(dict(query), fields)
+
+            r = await self._request('GET', path, params=_encode_fields(payload))
+            if self.debug:
+                logging.debug(r.url)
+                self.last_request = self._url_with_path(path)
+            result_object = APIResultObject(r, self)
+            result_object.path = path
+            result_object.params = query
+            return result_object
+
+        try:
+            if self.cache and cache_time:
+                unique_hash = self._cache_hash(path, params, fields)
+                cached_content = await self._cached(unique_hash, _get, cache_time, no_content_cache_time)
+                if isinstance(cached_content, _NoContent) and \
+                        time.time() - cached_content.created >= no_content_cache_time:
+                    self.cache(unique_hash, None)
+                    cached_content = await self._cached(unique_hash, _get, cache_time, no_content_cache_time)
+                if isinstance(cached_content, _NoContent):
+                    raise NoContentException(None, msg="Resultado vazio obtido do cache")
+                return cached_content
+            return await _get()
+        except NoContentException:
+            if bypass_no_content_exception:
+                return []
+            raise
+
+    async def _cached(self, key, fetch, cache_time, no_content_cache_time):
+        """
+        Valor de `key` no cache ou, caso esteja ausente, o retorno de `fetch`, que é então armazenado. A requisição
+        é feita uma única vez para todas as corrotinas que aguardam a mesma chave. Um valor expirado há menos de
+        `stale_while_revalidate` segundos é retornado enquanto é atualizado numa task em segundo plano.
+
+        :type key: str
+        :param fetch: Corrotina que realiza a requisição
+        :rtype: APIResultObject or _NoContent
+        """
+        value, state = self.cache.lookup(key, cache_time)
+        if state == 'hit':
+            return value
+
+        future = self._pending.get(key)
+        if future is None:
+            async def load_and_store():
+                try:
+                    try:
+                        result = await fetch()
+                    except NoContentException:
+                        if not no_content_cache_time:
+                            raise
+                        result = _NoContent(time.time())
+                    self.cache.set(key, result)
+                    return result
+                finally:
+                    del self._pending[key]
+
+            def refreshed(task):
+                if not task.cancelled() and task.exception() is not None:
+                    logging.error('Falha ao atualizar o cache de %s', key, exc_info=task.exception())
+
+            future = self._pending[key] = asyncio.ensure_future(load_and_store())
+            if state == 'stale':
+                future.add_done_callback(refreshed)
+        if state == 'stale':
+            return value
+        # O cancelamento de uma das corrotinas não cancela a requisição compartilhada com as demais
+        return await asyncio.shield(future)
+
+    async def get_single_result(self, path, params=None, fields=None, cache_time=0,
+                                bypass_no_content_exception=False):
+        """
+        Wrapper para pegar apenas um resultado.
+
+        :rtype: dict
+        """
+        try:
+            if not params:
+                params = {}
+
+            params.update({
+                "LMIN": 0,
+                "LMAX": 1
+            })
+
+            res = await self.get(path, params, fields, cache_time)
+            return res.first()
+        except NoContentException as e:
+            if bypass_no_content_exception:
+                return None
+            raise e
+
+    def iter_pages(self, path, params=None, fields=None, page_size=1000, cache_time=0):
+        """
+        Iterador assíncrono (`async for`) sobre as páginas LMIN/LMAX de um endpoint.
+
+        :rtype: AsyncPageIterator
+        """
+        return AsyncPageIterator(self, path, _first_page_params(params, page_size), fields, cache_time)
+
+    def iter_all(self, path, params=None, fields=None, page_size=1000, cache_time=0):
+        """
+        Iterador assíncrono (`async for`) sobre todas as linhas de um endpoint, mantendo somente uma página
+        em memória por vez.
+
+        :rtype: AsyncRowIterator
+        """
+        return AsyncRowIterator(self.iter_pages(path, params, fields, page_size, cache_time))
+
+    @requires('COD_OPERADOR')
+    async def post(self, path, params):
+        """
+
+        :rtype : APIPOSTResponse
+        """
+        params.update(self._payload)
+
+        response = await self._request('POST', path, data=_encode_fields(params))
+        return APIPOSTResponse(response, self)
+
+    @requires('COD_OPERADOR')
+    async def delete(self, path, params):
+        """
+        :rtype : APIDELETEResponse
+        """
+        payload = self._url_query_data(dict(params))
+        response = await self._request('DELETE', path, data=_encode_fields(payload))
+        return APIDELETEResponse(response, self)
+
+    @requires('COD_OPERADOR')
+    async def put(self, path, params):
+        """
+        :rtype APIPUTResponse
+        """
+        params.update(self._payload)
+
+        response = await self._request('PUT', path, data=_encode_fields(params))
+        return APIPUTResponse(response, self)
+
+    async def call_procedure(self, name, data, fields=None, ws_group=None, **kwargs):
+        """
+        Mesma interface de UNIRIOAPIRequest.call_procedure. `async` é recebido como keyword
+        (`**{'async': True}`), já que é uma palavra reservada dentro de corrotinas.
+
+        :param name: Procedure name to be called
+        :type data: list or tuple
+        :type fields: tuple or list
+        :type ws_group: str
+        """
+        is_async = kwargs.pop('async', False)
+        _data = dict(data=data,
+                     fields=fields or [],
+                     **self._payload)
+        _data['async'] = is_async
+        response = await self._request('POST', "procedure/" + name, **self._json_body(_data))
+
+        if is_async:
+            return APIProcedureAsyncResponse(response, self, ws_group)
+
+        return APIProcedureSyncResponse(response, self)
+
+    async def _poll_procedure(self, procedure):
+        """
+        Consulta, uma vez, o estado de uma procedure assíncrona. Ver APIProcedureAsyncResponse.poll
+
+        :type procedure: APIProcedureAsyncResponse
+        """
+        procedure._check_pollable()
+        try:
+            response = await self._request('GET', procedure.location, params=self._payload)
+            status = APIProcedureStatusResponse(response, self)
+        except APIException as e:
+            status = e
+        procedure._update(status)
+
+    async def wait_procedures(self, procedures, timeout=None, poll_interval=1.0, return_when=asyncio.ALL_COMPLETED):
+        """
+        Aguarda várias procedures assíncronas, como UNIRIOAPIRequest.wait_procedures, sem bloquear o event loop
+
+        :type procedures: list[APIProcedureAsyncResponse]
+        :rtype: tuple
+        :return: Tupla (done, not_done) de sets de APIProcedureAsyncResponse
+        """
+        procedures = set(procedures)
+        if not procedures:
+            return set(), set()
+        tasks = {asyncio.ensure_future(wait_procedure(p, poll_interval=poll_interval)): p for p in procedures}
+        done, pending = await asyncio.wait(tasks, timeout=timeout, return_when=return_when)
+        for task in pending:
+            task.cancel()
+        for task in done:
+            # A exception permanece disponível em procedure.exception()
+            task.exception()
+        return set(tasks[t] for t in done), set(tasks[t] for t in pending)
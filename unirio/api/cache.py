@@ -0,0 +1,409 @@
+# -*- coding: utf-8 -*-
+import logging
+import pickle
+import sqlite3
+import sys
+import threading
+import time
+from collections import OrderedDict, Mapping
+from .singleflight import SingleFlight
+from .rows import CompactRow
+
+
+__all__ = ('BaseCache', 'MemoryCache', 'SQLiteCache')
+
+
+def approximate_size(value):
+    """
+    Estimativa, em bytes, da memória ocupada por `value`, percorrendo listas, tuplas e dicionários.
+    Para objetos de resultado da API, somente o corpo da resposta e o conteúdo decodificado são considerados.
+
+    :rtype: int
+    """
+    size = 0
+    response = getattr(value, 'response', None)
+    if response is not None:
+        size += len(getattr(response, 'content', None) or b'')
+    content = getattr(value, 'content', None)
+    if isinstance(content, (list, tuple)):
+        value = content
+
+    stack = [value]
+    while stack:
+        obj = stack.pop()
+        size += sys.getsizeof(obj)
+        if isinstance(obj, CompactRow):
+            # O índice de campos é compartilhado por todas as linhas
+            stack.append(obj._values)
+        elif isinstance(obj, Mapping):
+            stack.extend(obj.keys())
+            stack.extend(obj.values())
+        elif isinstance(obj, (list, tuple, set, frozenset)):
+            stack.extend(obj)
+    return size
+
+
+class BaseCache(object):
+    """
+    Cache com a mesma interface de gluon.cache.CacheInRam, utilizada por UNIRIOAPIRequest.get:
+    `cache(key, f, time_expire)` retorna o valor armazenado em `key` caso ele tenha menos de `time_expire`
+    segundos, ou armazena e retorna o valor de `f()`. `cache(key, None)` remove a chave.
+
+    Chamadas simultâneas de `f` para uma mesma chave são agrupadas numa só, evitando que todos os clientes
+    consultem a API ao mesmo tempo quando um valor expira. Com `stale_while_revalidate`, um valor expirado
+    há menos desse tempo continua sendo retornado enquanto uma única thread o atualiza em segundo plano.
+
+    Subclasses implementam o armazenamento através de `_get`, `_set`, `_delete` e `_clear`.
+    """
+
+    def __init__(self, stale_while_revalidate=0):
+        """
+        :type stale_while_revalidate: float
+        :param stale_while_revalidate: Tempo, em segundos, após a expiração em que o valor antigo ainda é
+                                       retornado enquanto é atualizado em segundo plano. 0 desabilita
+        """
+        self.stale_while_revalidate = stale_while_revalidate
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._stats_lock = threading.Lock()
+        self._flight = SingleFlight()
+        self._outcomes = threading.local()
+
+    def __call__(self, key, f, time_expire=300, timeout=None):
+        """
+        :type key: str
+        :type f: callable
+        :type time_expire: int
+        :param time_expire: Idade máxima, em segundos, de um valor armazenado. None não expira
+        :type timeout: float
+        :param timeout: Tempo máximo, em segundos, de espera por outra thread que já está carregando `key`.
+                        None aguarda indefinidamente
+        :raises APITimeoutException: Caso a carga em andamento não termine dentro de `timeout`
+        """
+        if f is None:
+            self._delete(key)
+            return None
+
+        value, state = self.lookup(key, time_expire)
+        if state == 'hit':
+            return value
+        if state == 'stale':
+            self._revalidate(key, f, time_expire)
+            return value
+
+        # Substituído por 'miss' em _load, caso esta thread carregue o valor em vez de aguardar outra
+        self._outcomes.last = 'shared'
+        return self._flight.do(key, lambda: self._load(key, f, time_expire), timeout)
+
+    def lookup(self, key, time_expire=300):
+        """
+        Consulta `key` sem carregá-la, contabilizando as estatísticas como `cache(key, f, time_expire)`. Utilizado
+        por quem precisa carregar o valor por conta própria, como AsyncUNIRIOAPIRequest, que o armazena com `set`.
+
+        :type key: str
+        :type time_expire: int
+        :param time_expire: Idade máxima, em segundos, de um valor armazenado. None não expira
+        :rtype: tuple
+        :return: Tupla (valor, estado). O estado é 'hit', 'stale' (expirado há menos de `stale_while_revalidate`
+                 segundos, devendo ser atualizado) ou 'miss', caso em que o valor é None
+        """
+        entry = self._get(key)
+        if entry is not None:
+            value, created = entry
+            age = time.time() - created
+            if time_expire is None or age < time_expire:
+                self._count('hits')
+                self._outcomes.last = 'hit'
+                return value, 'hit'
+            if age < time_expire + self.stale_while_revalidate:
+                self._count('stale_hits')
+                self._outcomes.last = 'stale'
+                return value, 'stale'
+
+        self._count('misses')
+        self._outcomes.last = 'miss'
+        return None, 'miss'
+
+    def set(self, key, value):
+        """
+        Armazena `value` em `key`, substituindo o valor anterior, caso exista
+        """
+        self._set(key, value, time.time())
+
+    def _load(self, key, f, time_expire):
+        # Outra thread pode ter armazenado o valor entre a consulta de __call__ e o início desta carga
+        entry = self._get(key)
+        if entry is not None:
+            value, created = entry
+            if time_expire is None or time.time() - created < time_expire:
+                return value
+
+        self._outcomes.last = 'miss'
+        value = f()
+        self._set(key, value, time.time())
+        return value
+
+    def _revalidate(self, key, f, time_expire):
+        """
+        Atualiza `key` numa thread separada, caso ainda não haja uma atualização em andamento
+        """
+        if not self._flight.try_begin(key):
+            return
+
+        def refresh():
+            value, error = None, None
+            try:
+                value = self._load(key, f, time_expire)
+            except Exception as e:
+                error = e
+                logging.exception('Falha ao atualizar o cache de %s', key)
+            finally:
+                self._flight.end(key, value, error)
+
+        thread = threading.Thread(target=refresh, name='unirio-api-revalidate')
+        thread.daemon = True
+        thread.start()
+
+    def _count(self, counter, amount=1):
+        with self._stats_lock:
+            setattr(self, counter, getattr(self, counter) + amount)
+
+    @property
+    def last_outcome(self):
+        """
+        Resultado da última chamada feita pela thread atual: 'hit', 'stale' (valor expirado retornado enquanto
+        é atualizado em segundo plano), 'miss' (o valor foi carregado por esta thread) ou 'shared' (o valor foi
+        carregado por outra thread, que já o carregava). None caso a thread ainda não tenha consultado o cache
+
+        :rtype: str
+        """
+        return getattr(self._outcomes, 'last', None)
+
+    @property
+    def stats(self):
+        """
+        :rtype: dict
+        """
+        with self._stats_lock:
+            return {'hits': self.hits, 'stale_hits': self.stale_hits, 'misses': self.misses,
+                    'evictions': self.evictions}
+
+    def peek(self, key):
+        """
+        Retorna o valor armazenado em `key`, mesmo que expirado, sem alterar as estatísticas. Utilizado para
+        revalidar um valor expirado através de uma requisição condicional.
+
+        :return: O valor armazenado ou None
+        """
+        entry = self._get(key)
+        return entry[0] if entry is not None else None
+
+    def clear(self):
+        self._clear()
+
+    def _get(self, key):
+        """
+        :rtype: tuple
+        :return: Tupla (valor, timestamp de criação) ou None caso a chave não exista
+        """
+        raise NotImplementedError
+
+    def _set(self, key, value, created):
+        raise NotImplementedError
+
+    def _delete(self, key):
+        raise NotImplementedError
+
+    def _clear(self):
+        raise NotImplementedError
+
+
+class MemoryCache(BaseCache):
+    def __init__(self, max_entries=1024, max_bytes=None, stale_while_revalidate=0):
+        """
+        Cache em memória, thread-safe, com expiração por tempo e descarte LRU (o valor usado há mais tempo
+        é descartado primeiro) quando algum dos limites é atingido.
+
+        :type max_entries: int
+        :param max_entries: Quantidade máxima de chaves armazenadas. None não impõe limite
+        :type max_bytes: int
+        :param max_bytes: Limite aproximado da memória ocupada pelos valores. None não impõe limite
+        :type stale_while_revalidate: float
+        :param stale_while_revalidate: Ver BaseCache
+        """
+        super(MemoryCache, self).__init__(stale_while_revalidate)
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.size = 0
+        self._entries = OrderedDict()
+        self._lock = threading.RLock()
+
+    def _get(self, key):
+        with self._lock:
+            try:
+                value, created, size = self._entries.pop(key)
+            except KeyError:
+                return None
+            self._entries[key] = (value, created, size)
+            return value, created
+
+    def _set(self, key, value, created):
+        size = approximate_size(value) if self.max_bytes is not None else 0
+        with self._lock:
+            self._delete(key)
+            if self.max_bytes is not None and size > self.max_bytes:
+                return
+            self._entries[key] = (value, created, size)
+            self.size += size
+            while self._over_limit():
+                _, (_, _, evicted_size) = self._entries.popitem(last=False)
+                self.size -= evicted_size
+                self._count('evictions')
+
+    def _over_limit(self):
+        if self.max_entries is not None and len(self._entries) > self.max_entries:
+            return True
+        return self.max_bytes is not None and self.size > self.max_bytes
+
+    def _delete(self, key):
+        with self._lock:
+            entry = self._entries.pop(key, None)
+            if entry is not None:
+                self.size -= entry[2]
+
+    def _clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.size = 0
+
+
+class SQLiteCache(BaseCache):
+    def __init__(self, path, max_entries=None, max_bytes=None, timeout=30, stale_while_revalidate=0,
+                 touch_interval=60):
+        """
+        Cache persistente num arquivo SQLite, que sobrevive ao reinício do processo e pode ser compartilhado
+        por vários processos do mesmo host. Os valores são serializados com pickle; no caso de um
+        APIResultObject, somente o conteúdo decodificado e o subset (lmin/lmax) são armazenados.
+
+        Quando algum dos limites é atingido, as chaves acessadas há mais tempo são descartadas primeiro.
+
+        :type path: str
+        :param path: Caminho do arquivo do banco de dados
+        :type max_entries: int
+        :param max_entries: Quantidade máxima de chaves armazenadas. None não impõe limite
+        :type max_bytes: int
+        :param max_bytes: Tamanho máximo, em bytes, dos valores serializados. None não impõe limite
+        :type timeout: float
+        :param timeout: Tempo, em segundos, de espera por um lock mantido por outro processo
+        :type stale_while_revalidate: float
+        :param stale_while_revalidate: Ver BaseCache
+        :type touch_interval: float
+        :param touch_interval: Precisão, em segundos, do horário de acesso usado no descarte. Uma leitura só
+                               escreve no arquivo quando o acesso registrado é mais antigo que isso, de forma que
+                               leituras frequentes de vários processos não disputam o lock de escrita
+        """
+        super(SQLiteCache, self).__init__(stale_while_revalidate)
+        self.path = path
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.timeout = timeout
+        self.touch_interval = touch_interval
+        self._local = threading.local()
+        with self._connection as conn:
+            conn.execute('CREATE TABLE IF NOT EXISTS cache ('
+                         'key TEXT PRIMARY KEY, value BLOB NOT NULL, size INTEGER NOT NULL, '
+                         'created REAL NOT NULL, accessed REAL NOT NULL)')
+            conn.execute('CREATE INDEX IF NOT EXISTS cache_accessed ON cache (accessed)')
+            # Quantidade e tamanho total das chaves, mantidos pelos triggers para que o descarte não percorra
+            # a tabela inteira a cada escrita
+            conn.execute('CREATE TABLE IF NOT EXISTS cache_totals ('
+                         'id INTEGER PRIMARY KEY CHECK (id = 0), count INTEGER NOT NULL, size INTEGER NOT NULL)')
+            conn.execute('INSERT OR IGNORE INTO cache_totals (id, count, size) '
+                         'SELECT 0, COUNT(*), COALESCE(SUM(size), 0) FROM cache')
+            conn.execute('CREATE TRIGGER IF NOT EXISTS cache_insert AFTER INSERT ON cache BEGIN '
+                         'UPDATE cache_totals SET count = count + 1, size = size + NEW.size; END')
+            conn.execute('CREATE TRIGGER IF NOT EXISTS cache_delete AFTER DELETE ON cache BEGIN '
+                         'UPDATE cache_totals SET count = count - 1, size = size - OLD.size; END')
+
+    @property
+    def _connection(self):
+        """
+        Conexões sqlite3 não podem ser compartilhadas entre threads, então cada thread possui a sua
+
+        :rtype: sqlite3.Connection
+        """
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=self.timeout)
+            conn.execute('PRAGMA journal_mode=WAL')
+            self._local.conn = conn
+        return conn
+
+    def _get(self, key):
+        conn = self._connection
+        row = conn.execute('SELECT value, created, accessed FROM cache WHERE key = ?', (key,)).fetchone()
+        if row is None:
+            return None
+        now = time.time()
+        if now - row[2] >= self.touch_interval:
+            with conn:
+                conn.execute('UPDATE cache SET accessed = ? WHERE key = ?', (now, key))
+        return pickle.loads(bytes(row[0])), row[1]
+
+    def _set(self, key, value, created):
+        data = pickle.dumps(value, pickle.HIGHEST_PROTOCOL)
+        if self.max_bytes is not None and len(data) > self.max_bytes:
+            self._delete(key)
+            return
+        with self._connection as conn:
+            # DELETE seguido de INSERT, ao invés de INSERT OR REPLACE, que não dispara o trigger de remoção
+            conn.execute('DELETE FROM cache WHERE key = ?', (key,))
+            conn.execute('INSERT INTO cache (key, value, size, created, accessed) VALUES (?, ?, ?, ?, ?)',
+                         (key, sqlite3.Binary(data), len(data), created, time.time()))
+            self._evict(conn)
+
+    def _evict(self, conn):
+        if self.max_entries is None and self.max_bytes is None:
+            return
+        count, size = conn.execute('SELECT count, size FROM cache_totals').fetchone()
+        over_entries = count - self.max_entries if self.max_entries is not None else 0
+        over_bytes = size - self.max_bytes if self.max_bytes is not None else 0
+        if over_entries <= 0 and over_bytes <= 0:
+            return
+
+        evicted = []
+        for key, entry_size in conn.execute('SELECT key, size FROM cache ORDER BY accessed'):
+            if over_entries <= 0 and over_bytes <= 0:
+                break
+            evicted.append((key,))
+            over_entries -= 1
+            over_bytes -= entry_size
+        conn.executemany('DELETE FROM cache WHERE key = ?', evicted)
+        self._count('evictions', len(evicted))
+
+    @property
+    def totals(self):
+        """
+        :rtype: tuple
+        :return: Tupla (quantidade de chaves, tamanho total dos valores serializados)
+        """
+        return tuple(self._connection.execute('SELECT count, size FROM cache_totals').fetchone())
+
+    def _delete(self, key):
+        with self._connection as conn:
+            conn.execute('DELETE FROM cache WHERE key = ?', (key,))
+
+    def _clear(self):
+        with self._connection as conn:
+            conn.execute('DELETE FROM cache')
+
+    def purge(self, max_age):
+        """
+        Remove do arquivo os valores com mais de `max_age` segundos
+
+        :type max_age: float
+        """
+        with self._connection as conn:
+            conn.execute('DELETE FROM cache WHERE created < ?', (time.time() - max_age,))
@@ -0,0 +1,231 @@
+# -*- coding: utf-8 -*-
+import threading
+from collections import deque
+
+from requests.exceptions import ConnectionError, Timeout
+from .exceptions import CircuitOpenException
+from .ratelimit import _clock
+
+
+__all__ = ('CircuitBreaker', 'Circuit')
+
+
+CLOSED = 'closed'
+OPEN = 'open'
+HALF_OPEN = 'half_open'
+
+
+class Circuit(object):
+    def __init__(self, breaker, key):
+        """
+        Estado do circuito de um endpoint. Criado e mantido por CircuitBreaker.
+
+        :type breaker: CircuitBreaker
+        :type key: tuple
+        """
+        self.breaker = breaker
+        self.key = key
+        self.state = CLOSED
+        self.opened_at = None
+        self.calls = 0
+        self.failures = 0
+        self.slow_calls = 0
+        self.rejected = 0
+        self.opened = 0
+        self._window = deque(maxlen=breaker.window)
+        self._probes = 0
+        self._lock = threading.Lock()
+
+    def _retry_after(self, now):
+        return max(0.0, self.opened_at + self.breaker.open_time - now)
+
+    def before_call(self):
+        """
+        Autoriza uma chamada ou levanta CircuitOpenException. Toda chamada autorizada deve ser executada com
+        `call` (ou registrada com `record`), ou desistida com `cancel`.
+
+        :raises CircuitOpenException: Caso o circuito esteja aberto, ou meio-aberto com o número máximo de
+                                      chamadas de teste em andamento
+        """
+        with self._lock:
+            now = _clock()
+            if self.state == OPEN:
+                if self._retry_after(now) > 0:
+                    self.rejected += 1
+                    raise CircuitOpenException(self.key, self._retry_after(now))
+                self.state = HALF_OPEN
+                self._probes = 0
+            if self.state == HALF_OPEN:
+                if self._probes >= self.breaker.half_open_calls:
+                    self.rejected += 1
+                    raise CircuitOpenException(self.key, 0.0)
+                self._probes += 1
+
+    def cancel(self):
+        """
+        Desiste de uma chamada autorizada por `before_call` que não chegou a ser enviada (ex: o deadline expirou
+        enquanto aguardava uma vaga). Nada é registrado, mas a vaga de chamada de teste é liberada.
+        """
+        with self._lock:
+            if self.state == HALF_OPEN:
+                self._probes -= 1
+
+    def call(self, fn, deadline=None):
+        """
+        Executa `fn`, já autorizada por `before_call`, e registra o resultado. O tempo de espera por uma vaga
+        (RateLimiter) antes da chamada não é considerado na latência. Exceptions que não indicam uma falha do
+        servidor (ex: KeyboardInterrupt ou um erro em `fn`) não são registradas, e a chamada é desistida com `cancel`.
+
+        :type fn: callable
+        :param fn: Callable sem argumentos que retorna um requests.models.Response
+        :type deadline: Deadline
+        :param deadline: Tempo limite da chamada. Uma falha ocorrida depois que ele expirou é atribuída ao tempo
+                         restante, e não ao servidor, e também não é registrada
+        :rtype: requests.models.Response
+        """
+        breaker = self.breaker
+        start = _clock()
+        try:
+            response = fn()
+        except breaker.failure_exceptions:
+            if deadline is not None and deadline.expired:
+                self.cancel()
+            else:
+                self.record(True, _clock() - start)
+            raise
+        except BaseException:
+            self.cancel()
+            raise
+        self.record(response.status_code in breaker.failure_status_codes, _clock() - start)
+        return response
+
+    def record(self, failed, duration):
+        """
+        :type failed: bool
+        :param failed: Se a chamada falhou (erro de conexão, timeout ou erro do servidor)
+        :type duration: float
+        :param duration: Duração da chamada, em segundos
+        """
+        breaker = self.breaker
+        slow = breaker.slow_call_duration is not None and duration >= breaker.slow_call_duration
+        with self._lock:
+            self.calls += 1
+            self.failures += failed
+            self.slow_calls += slow
+            if self.state == HALF_OPEN:
+                self._probes -= 1
+                if failed or slow:
+                    self._open()
+                else:
+                    self.state = CLOSED
+                    self._window.clear()
+                return
+            if self.state == OPEN:
+                # Chamada autorizada antes da abertura do circuito
+                return
+
+            self._window.append((failed, slow))
+            calls = len(self._window)
+            if calls < breaker.min_calls:
+                return
+            failure_rate = sum(f for f, _ in self._window) / float(calls)
+            slow_rate = sum(s for _, s in self._window) / float(calls)
+            if failure_rate >= breaker.failure_rate or slow_rate >= breaker.slow_call_rate:
+                self._open()
+
+    def _open(self):
+        self.state = OPEN
+        self.opened_at = _clock()
+        self.opened += 1
+        self._window.clear()
+
+    @property
+    def stats(self):
+        """
+        :rtype: dict
+        """
+        with self._lock:
+            return {'state': self.state, 'calls': self.calls, 'failures': self.failures,
+                    'slow_calls': self.slow_calls, 'rejected': self.rejected, 'opened': self.opened}
+
+
+class CircuitBreaker(object):
+    def __init__(self, failure_rate=0.5, slow_call_duration=None, slow_call_rate=1.0, window=20, min_calls=10,
+                 open_time=30.0, half_open_calls=1, serve_stale=False,
+                 failure_exceptions=(ConnectionError, Timeout), failure_status_codes=(500, 502, 503, 504)):
+        """
+        Disjuntor (circuit breaker) por servidor e endpoint. Quando as últimas `window` chamadas a um endpoint
+        ultrapassam a taxa de falhas `failure_rate` (ou a taxa de chamadas lentas `slow_call_rate`), o circuito
+        abre e as próximas chamadas falham imediatamente com CircuitOpenException, sem ocupar uma conexão nem
+        aguardar o servidor. Após `open_time` segundos, o circuito fica meio-aberto: até `half_open_calls`
+        chamadas de teste são enviadas, e o circuito fecha caso tenham sucesso ou volta a abrir caso falhem.
+
+        Uma mesma instância pode ser compartilhada por vários clientes e threads.
+
+        :type failure_rate: float
+        :param failure_rate: Fração de chamadas com falha, entre 0 e 1, que abre o circuito
+        :type slow_call_duration: float
+        :param slow_call_duration: Duração, em segundos, a partir da qual uma chamada é considerada lenta.
+                                   None desconsidera a latência
+        :type slow_call_rate: float
+        :param slow_call_rate: Fração de chamadas lentas, entre 0 e 1, que abre o circuito
+        :type window: int
+        :param window: Quantidade de chamadas recentes consideradas no cálculo das taxas
+        :type min_calls: int
+        :param min_calls: Quantidade mínima de chamadas na janela antes que o circuito possa abrir
+        :type open_time: float
+        :param open_time: Tempo, em segundos, que o circuito permanece aberto antes das chamadas de teste
+        :type half_open_calls: int
+        :param half_open_calls: Quantidade de chamadas de teste simultâneas com o circuito meio-aberto
+        :type serve_stale: bool
+        :param serve_stale: Se True, um GET com cache_time cujo circuito esteja aberto retorna o valor em cache,
+                            mesmo que expirado, ao invés de levantar CircuitOpenException
+        :type failure_exceptions: tuple
+        :param failure_exceptions: Exceptions consideradas falhas
+        :type failure_status_codes: tuple
+        :param failure_status_codes: Códigos HTTP considerados falhas
+        """
+        if not 0 < failure_rate <= 1 or not 0 < slow_call_rate <= 1:
+            raise ValueError('failure_rate and slow_call_rate must be between 0 and 1.')
+        self.failure_rate = failure_rate
+        self.slow_call_duration = slow_call_duration
+        self.slow_call_rate = slow_call_rate
+        self.window = window
+        self.min_calls = min(min_calls, window)
+        self.open_time = open_time
+        self.half_open_calls = half_open_calls
+        self.serve_stale = serve_stale
+        self.failure_exceptions = tuple(failure_exceptions)
+        self.failure_status_codes = frozenset(failure_status_codes)
+        self._circuits = {}
+        self._lock = threading.Lock()
+
+    def circuit(self, key):
+        """
+        :type key: tuple
+        :param key: Tupla (servidor, endpoint)
+        :rtype: Circuit
+        """
+        try:
+            return self._circuits[key]
+        except KeyError:
+            with self._lock:
+                return self._circuits.setdefault(key, Circuit(self, key))
+
+    def state(self, key):
+        """
+        :rtype: str
+        :return: 'closed', 'open' ou 'half_open'
+        """
+        circuit = self._circuits.get(key)
+        return circuit.state if circuit is not None else CLOSED
+
+    @property
+    def stats(self):
+        """
+        :rtype: dict
+        :return: Dicionário {chave: estatísticas do circuito}
+        """
+        with self._lock:
+            circuits = list(self._circuits.values())
+        return {c.key: c.stats for c in circuits}
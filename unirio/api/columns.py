@@ -0,0 +1,173 @@
+# -*- coding: utf-8 -*-
+import re
+from array import array
+from collections import Mapping
+from datetime import datetime
+from .rows import CompactRow, FieldIndex
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+
+__all__ = ('ColumnarResult', 'to_columns')
+
+try:
+    array('q')
+    _INT_TYPECODE = 'q'
+except ValueError:
+    # Python 2 não possui o typecode 'q'
+    _INT_TYPECODE = 'l'
+
+try:
+    _INT_TYPES = (int, long)
+except NameError:
+    _INT_TYPES = (int,)
+_STRING_TYPES = (str, type(u''))
+
+_DATE = re.compile(r'^\d{4}-\d{2}-\d{2}$')
+_DATETIME = re.compile(r'^\d{4}-\d{2}-\d{2}[ T]\d{2}:\d{2}:\d{2}$')
+_NAN = float('nan')
+
+
+def _column_type(values):
+    """
+    Infere o tipo de uma coluna a partir dos seus valores não nulos
+
+    :rtype: str
+    :return: 'int', 'float', 'date', 'datetime' ou 'object'
+    """
+    kinds = set()
+    for value in values:
+        if value is None:
+            continue
+        if isinstance(value, bool):
+            return 'object'
+        elif isinstance(value, _INT_TYPES):
+            kinds.add('int')
+        elif isinstance(value, float):
+            kinds.add('float')
+        elif isinstance(value, _STRING_TYPES) and _DATE.match(value):
+            kinds.add('date')
+        elif isinstance(value, _STRING_TYPES) and _DATETIME.match(value):
+            kinds.add('datetime')
+        else:
+            return 'object'
+        if len(kinds) > 1 and kinds != {'int', 'float'}:
+            return 'object'
+    if not kinds:
+        return 'object'
+    if kinds == {'int', 'float'}:
+        return 'float'
+    return kinds.pop()
+
+
+def _parse_date(value):
+    return datetime.strptime(value, '%Y-%m-%d').date() if value is not None else None
+
+
+def _parse_datetime(value):
+    return datetime.strptime(value.replace('T', ' '), '%Y-%m-%d %H:%M:%S') if value is not None else None
+
+
+def _numpy_column(kind, values):
+    if kind == 'int' and None not in values:
+        try:
+            return numpy.array(values, dtype=numpy.int64)
+        except OverflowError:
+            kind = 'object'
+    if kind in ('int', 'float'):
+        return numpy.array([_NAN if v is None else v for v in values], dtype=numpy.float64)
+    if kind == 'date':
+        return numpy.array(['NaT' if v is None else v for v in values], dtype='datetime64[D]')
+    if kind == 'datetime':
+        return numpy.array(['NaT' if v is None else v.replace(' ', 'T') for v in values], dtype='datetime64[s]')
+    column = numpy.empty(len(values), dtype=object)
+    column[:] = values
+    return column
+
+
+def _array_column(kind, values):
+    if kind == 'int' and None not in values:
+        try:
+            return array(_INT_TYPECODE, values)
+        except OverflowError:
+            return list(values)
+    if kind in ('int', 'float'):
+        return array('d', [_NAN if v is None else v for v in values])
+    if kind == 'date':
+        return [_parse_date(v) for v in values]
+    if kind == 'datetime':
+        return [_parse_datetime(v) for v in values]
+    return list(values)
+
+
+def to_columns(rows, fields, use_numpy=None):
+    """
+    Transpõe as linhas de um resultado em colunas tipadas: inteiros e números de ponto flutuante em `array.array`
+    (ou arrays NumPy), datas em `datetime.date`/`datetime.datetime` (ou datetime64) e os demais valores em listas.
+    Inteiros com valores nulos são convertidos em ponto flutuante, com NaN no lugar de None.
+
+    :type rows: list
+    :type fields: tuple
+    :type use_numpy: bool
+    :param use_numpy: None utiliza NumPy somente se estiver instalado
+    :rtype: list
+    :return: Uma coluna para cada campo, na ordem de `fields`
+    """
+    if use_numpy is None:
+        use_numpy = numpy is not None
+    elif use_numpy and numpy is None:
+        raise ImportError('NumPy is not installed.')
+
+    if rows and isinstance(rows[0], CompactRow) and rows[0]._index.fields == tuple(fields):
+        transposed = list(zip(*(row._values for row in rows)))
+    else:
+        transposed = [tuple(row.get(field) for row in rows) for field in fields]
+
+    build = _numpy_column if use_numpy else _array_column
+    return [build(_column_type(values), values) for values in transposed]
+
+
+class ColumnarResult(Mapping):
+    def __init__(self, fields, columns, lmin=0, lmax=0):
+        """
+        Resultado organizado em colunas. `result['id_aluno']` retorna a coluna inteira, sem diferenciar
+        maiúsculas de minúsculas.
+
+        :type fields: tuple
+        :type columns: list
+        """
+        self.fields = tuple(fields)
+        self.columns = columns
+        self.lmin = lmin
+        self.lmax = lmax
+        self._index = FieldIndex(self.fields)
+
+    @classmethod
+    def from_result(cls, result, use_numpy=None):
+        """
+        :type result: unirio.api.result.APIResultObject
+        :rtype: ColumnarResult
+        """
+        return cls(result.fields, to_columns(result.content, result.fields, use_numpy), result.lmin, result.lmax)
+
+    @property
+    def num_rows(self):
+        return len(self.columns[0]) if self.columns else 0
+
+    def __getitem__(self, field):
+        try:
+            return self.columns[self._index.position(field)]
+        except KeyError:
+            raise KeyError(field)
+
+    def __contains__(self, field):
+        return field in self._index
+
+    def __iter__(self):
+        return iter(self.fields)
+
+    def __len__(self):
+        return len(self.fields)
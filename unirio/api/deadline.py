@@ -0,0 +1,76 @@
+# -*- coding: utf-8 -*-
+from numbers import Number
+
+from .exceptions import APITimeoutException
+from .ratelimit import _clock
+
+
+__all__ = ('Deadline',)
+
+
+class Deadline(object):
+    def __init__(self, seconds):
+        """
+        Tempo limite de uma chamada, contado a partir da criação do objeto. Um mesmo Deadline é repassado a todas
+        as requisições de uma chamada (páginas, novas tentativas, chamadas paralelas), de forma que o tempo total
+        não ultrapasse `seconds`.
+
+        :type seconds: float
+        """
+        self.seconds = seconds
+        self.expires = _clock() + seconds
+
+    @classmethod
+    def of(cls, deadline):
+        """
+        :type deadline: float or Deadline
+        :param deadline: Tempo limite em segundos, um Deadline já iniciado ou None
+        :rtype: Deadline
+        """
+        if deadline is None or isinstance(deadline, Deadline):
+            return deadline
+        if isinstance(deadline, Number):
+            return cls(deadline)
+        raise TypeError('deadline must be a number of seconds or a Deadline.')
+
+    def remaining(self):
+        """
+        :rtype: float
+        :return: Tempo restante, em segundos. 0 caso tenha expirado
+        """
+        return max(0.0, self.expires - _clock())
+
+    @property
+    def expired(self):
+        return _clock() >= self.expires
+
+    def exceeded(self):
+        """
+        :rtype: APITimeoutException
+        :return: A exception que indica que o deadline expirou
+        """
+        return APITimeoutException(None, 'Deadline of %ss exceeded' % self.seconds)
+
+    def check(self):
+        """
+        :raises APITimeoutException: Caso tenha expirado
+        """
+        if self.expired:
+            raise self.exceeded()
+
+    def cap(self, timeout):
+        """
+        Limita os timeouts de conexão e leitura de uma requisição ao tempo restante. O timeout de leitura limita
+        cada espera por dados, e não o recebimento do corpo inteiro, que é verificado à parte por quem o lê
+
+        :type timeout: float or tuple
+        :param timeout: Timeout no formato aceito por `requests`: segundos, tupla (conexão, leitura) ou None
+        :rtype: tuple
+        :raises APITimeoutException: Caso tenha expirado
+        """
+        remaining = self.expires - _clock()
+        if remaining <= 0:
+            raise self.exceeded()
+        if not isinstance(timeout, tuple):
+            timeout = (timeout, timeout)
+        return tuple(remaining if t is None else min(t, remaining) for t in timeout)
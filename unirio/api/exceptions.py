@@ -1,6 +1,8 @@
 # coding=utf-8
 __author__ = 'diogomartins'
 
+from requests.exceptions import Timeout
+
 
 class APIException(Exception):
     def __init__(self, response, msg=None):
@@ -70,6 +72,14 @@ class UnhandledAPIException(APIException):
     pass
 
 
+class APITimeoutException(APIException, Timeout):
+    """
+    A requisição excedeu o timeout de conexão ou de leitura, ou o tempo limite (deadline) da chamada expirou.
+    Também é um `requests.exceptions.Timeout`
+    """
+    pass
+
+
 class MissingPrimaryKeyException(APIException):
     pass
 
@@ -85,7 +95,10 @@ class MissingRequiredParameterException(Exception):
 
 
 class ProcedureException(APIException):
-    pass
+    # Em chamadas divididas em blocos (call_procedure com chunk_size/chunk_bytes), o índice do bloco que falhou
+    # e a posição, em `data`, da sua primeira linha. Os blocos anteriores já foram executados pelo servidor
+    chunk_index = None
+    chunk_offset = None
 
 
 class MissingRequiredFieldsException(ProcedureException):
@@ -96,3 +109,18 @@ class MissingRequiredFieldsException(ProcedureException):
         """
         super(MissingRequiredFieldsException, self).__init__(response, msg)
         self.fields = fields
+
+
+class CircuitOpenException(APIException):
+    def __init__(self, key, retry_after=None):
+        """
+        O circuito do endpoint está aberto (ver CircuitBreaker) e a requisição não foi enviada ao servidor
+
+        :type key: tuple
+        :param key: Tupla (servidor, endpoint) do circuito
+        :type retry_after: float
+        :param retry_after: Tempo, em segundos, até que o circuito aceite uma chamada de teste
+        """
+        super(CircuitOpenException, self).__init__(None, 'Circuit open for %s %s' % key)
+        self.key = key
+        self.retry_after = retry_after
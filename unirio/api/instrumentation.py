@@ -0,0 +1,247 @@
+# -*- coding: utf-8 -*-
+import bisect
+import logging
+import threading
+import time
+from collections import defaultdict
+
+
+__all__ = ('RequestEvent', 'Instrumentation', 'LatencyHistogram', 'MetricsAggregator')
+
+_timer = getattr(time, 'perf_counter', time.time)
+
+
+def endpoint_name(path):
+    """
+    Nome pelo qual as chamadas para `path` são agrupadas. URLs absolutas (ex: o Location de uma procedure
+    assíncrona) são agrupadas pela URL sem o último segmento, que costuma ser um identificador
+
+    :type path: str
+    :rtype: str
+    """
+    if '://' in path:
+        return path.split('?', 1)[0].rsplit('/', 1)[0]
+    return path.upper()
+
+
+class RequestEvent(object):
+    __slots__ = ('method', 'path', 'status', 'bytes_out', 'bytes_in', 'dns_time', 'connect_time', 'ttfb',
+                 'total_time', 'decode_time', 'cache', 'attempts', 'error', 'timestamp', '_start')
+
+    def __init__(self, method, path):
+        """
+        Uma chamada do cliente, emitida para a instrumentação ao terminar. Uma chamada pode envolver mais de uma
+        requisição HTTP (novas tentativas) ou nenhuma (resultado obtido do cache).
+
+        Tempos em segundos. Campos sem valor são None: `status`, `ttfb` e os bytes quando nenhuma requisição foi
+        feita; `dns_time` e `connect_time` sempre, pois `requests` não expõe essas medições.
+
+        :type method: str
+        :type path: str
+        """
+        self.method = method
+        self.path = path
+        self.status = None
+        self.bytes_out = None
+        self.bytes_in = None
+        self.dns_time = None
+        self.connect_time = None
+        self.ttfb = None
+        self.total_time = None
+        self.decode_time = None
+        self.cache = None
+        self.attempts = 0
+        self.error = None
+        self.timestamp = time.time()
+        self._start = _timer()
+
+    @property
+    def endpoint(self):
+        return endpoint_name(self.path)
+
+    @property
+    def retries(self):
+        return max(0, self.attempts - 1)
+
+    def _record_response(self, response):
+        """
+        :type response: requests.models.Response
+        """
+        self.status = response.status_code
+        self.ttfb = response.elapsed.total_seconds()
+        body = response.request.body if response.request is not None else None
+        self.bytes_out = len(body) if body else 0
+        if response.raw is None or getattr(response, '_content_consumed', True):
+            self.bytes_in = len(response.content or b'')
+        else:
+            # Resposta em streaming: o corpo ainda não foi lido
+            length = response.headers.get('Content-Length')
+            self.bytes_in = int(length) if length and length.isdigit() else None
+
+    def _finish(self, error=None):
+        self.total_time = _timer() - self._start
+        if error is not None:
+            self.error = type(error).__name__
+
+    def as_dict(self):
+        """
+        :rtype: dict
+        """
+        return {k: getattr(self, k) for k in self.__slots__ if not k.startswith('_')}
+
+    def __repr__(self):
+        return '<RequestEvent %s %s status=%s total_time=%.4f>' % (self.method, self.path, self.status,
+                                                                  self.total_time or 0)
+
+
+class Instrumentation(object):
+    """
+    Interface de instrumentação de UNIRIOAPIRequest. `on_request` é chamado, na thread da chamada, ao fim de
+    cada chamada do cliente. Implementações devem ser rápidas e thread-safe; exceptions levantadas por elas são
+    registradas no log e não interrompem a chamada.
+    """
+
+    def on_request(self, event):
+        """
+        :type event: RequestEvent
+        """
+        pass
+
+
+def _emit(instruments, event):
+    for instrument in instruments:
+        try:
+            instrument.on_request(event)
+        except Exception:
+            logging.exception('Falha na instrumentação %r', instrument)
+
+
+# Limites dos intervalos de LatencyHistogram, em segundos, em progressão geométrica de 0,5ms a ~10min. Um
+# percentil é estimado com erro relativo de no máximo 10%
+_BOUNDS = tuple(0.0005 * 1.1 ** i for i in range(148))
+
+
+class LatencyHistogram(object):
+    BOUNDS = _BOUNDS
+
+    def __init__(self):
+        """
+        Histograma de latências com intervalos fixos: ocupa memória constante, independente da quantidade de
+        amostras. Não é thread-safe; MetricsAggregator sincroniza o acesso.
+        """
+        self.counts = [0] * (len(self.BOUNDS) + 1)
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+
+    def record(self, seconds):
+        self.counts[bisect.bisect_left(self.BOUNDS, seconds)] += 1
+        self.count += 1
+        self.sum += seconds
+        self.max = max(self.max, seconds)
+
+    def percentile(self, q):
+        """
+        :type q: float
+        :param q: Percentil entre 0 e 100
+        :rtype: float
+        :return: Limite superior do intervalo que contém o percentil, ou None caso não haja amostras
+        """
+        if not self.count:
+            return None
+        rank = q / 100.0 * self.count
+        seen = 0
+        for i, count in enumerate(self.counts):
+            seen += count
+            if count and seen >= rank:
+                return min(self.BOUNDS[i], self.max) if i < len(self.BOUNDS) else self.max
+        return self.max
+
+    @property
+    def mean(self):
+        return self.sum / self.count if self.count else None
+
+
+class _EndpointMetrics(object):
+    def __init__(self):
+        self.latency = LatencyHistogram()
+        self.errors = defaultdict(int)
+        self.status = defaultdict(int)
+        self.cache_hits = 0
+        self.retries = 0
+        self.bytes_in = 0
+        self.bytes_out = 0
+        self.decode_time = 0.0
+
+    def record(self, event):
+        self.latency.record(event.total_time or 0.0)
+        if event.error is not None:
+            self.errors[event.error] += 1
+        if event.status is not None:
+            self.status[event.status] += 1
+        if event.cache == 'hit':
+            self.cache_hits += 1
+        self.retries += event.retries
+        self.bytes_in += event.bytes_in or 0
+        self.bytes_out += event.bytes_out or 0
+        self.decode_time += event.decode_time or 0.0
+
+    def summary(self):
+        latency = self.latency
+        return {'count': latency.count,
+                'p50': latency.percentile(50),
+                'p95': latency.percentile(95),
+                'p99': latency.percentile(99),
+                'mean': latency.mean,
+                'max': latency.max,
+                'errors': dict(self.errors),
+                'status': dict(self.status),
+                'cache_hits': self.cache_hits,
+                'retries': self.retries,
+                'bytes_in': self.bytes_in,
+                'bytes_out': self.bytes_out,
+                'decode_time': self.decode_time}
+
+
+class MetricsAggregator(Instrumentation):
+    def __init__(self):
+        """
+        Agrega, em memória, as chamadas por verbo e endpoint: histograma de latência total (p50/p95/p99),
+        erros, códigos HTTP, acertos de cache, novas tentativas, bytes trafegados e tempo de decodificação.
+
+            metrics = MetricsAggregator()
+            api = UNIRIOAPIRequest(api_key, APIServer.PRODUCTION, instrumentation=metrics)
+            ...
+            for (method, endpoint), summary in metrics.slowest(5):
+                print(method, endpoint, summary['p95'])
+        """
+        self._metrics = defaultdict(_EndpointMetrics)
+        self._lock = threading.Lock()
+
+    def on_request(self, event):
+        with self._lock:
+            self._metrics[(event.method, event.endpoint)].record(event)
+
+    @property
+    def stats(self):
+        """
+        :rtype: dict
+        :return: Dicionário {(verbo, endpoint): resumo}
+        """
+        with self._lock:
+            return {key: metrics.summary() for key, metrics in self._metrics.items()}
+
+    def slowest(self, n=10, percentile='p95'):
+        """
+        :type n: int
+        :type percentile: str
+        :param percentile: 'p50', 'p95', 'p99', 'mean' ou 'max'
+        :rtype: list
+        :return: Lista de tuplas ((verbo, endpoint), resumo) dos `n` endpoints mais lentos
+        """
+        stats = sorted(self.stats.items(), key=lambda item: item[1][percentile] or 0, reverse=True)
+        return stats[:n]
+
+    def reset(self):
+        with self._lock:
+            self._metrics.clear()
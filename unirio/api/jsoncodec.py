@@ -0,0 +1,128 @@
+# -*- coding: utf-8 -*-
+import json
+from requests.structures import CaseInsensitiveDict
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import ujson
+except ImportError:
+    ujson = None
+
+
+__all__ = ('JSONCodec', 'StdlibJSONCodec', 'OrjsonCodec', 'UjsonCodec', 'get_codec', 'case_insensitive')
+
+
+def case_insensitive(value):
+    """
+    Converte, recursivamente, os dicionários de um documento JSON já decodificado em CaseInsensitiveDict.
+    Equivale a decodificar com `object_hook=CaseInsensitiveDict`, para decoders que não suportam object_hook.
+
+    :rtype: CaseInsensitiveDict or list
+    """
+    if isinstance(value, dict):
+        return CaseInsensitiveDict((k, case_insensitive(v) if isinstance(v, (dict, list)) else v)
+                                   for k, v in value.items())
+    if isinstance(value, list):
+        return [case_insensitive(v) if isinstance(v, (dict, list)) else v for v in value]
+    return value
+
+
+class JSONCodec(object):
+    """
+    Serialização JSON utilizada pelo cliente para decodificar respostas e codificar o corpo das requisições.
+    Subclasses implementam `loads` e `dumps`; erros de decodificação devem ser ValueError (ou subclasses).
+    """
+    name = None
+
+    def loads(self, data):
+        """
+        :type data: bytes
+        """
+        raise NotImplementedError
+
+    def dumps(self, obj):
+        """
+        :rtype: bytes
+        """
+        raise NotImplementedError
+
+    def loads_case_insensitive(self, data):
+        """
+        :type data: bytes
+        :return: O documento decodificado, com os dicionários convertidos em CaseInsensitiveDict
+        """
+        return case_insensitive(self.loads(data))
+
+
+class StdlibJSONCodec(JSONCodec):
+    name = 'json'
+
+    def loads(self, data):
+        if isinstance(data, bytes):
+            data = data.decode('utf-8')
+        return json.loads(data)
+
+    def dumps(self, obj):
+        return json.dumps(obj).encode('utf-8')
+
+    def loads_case_insensitive(self, data):
+        if isinstance(data, bytes):
+            data = data.decode('utf-8')
+        return json.loads(data, object_hook=CaseInsensitiveDict)
+
+
+class OrjsonCodec(JSONCodec):
+    name = 'orjson'
+
+    def __init__(self):
+        if orjson is None:
+            raise ImportError('orjson is not installed.')
+
+    def loads(self, data):
+        return orjson.loads(data)
+
+    def dumps(self, obj):
+        return orjson.dumps(obj)
+
+
+class UjsonCodec(JSONCodec):
+    name = 'ujson'
+
+    def __init__(self):
+        if ujson is None:
+            raise ImportError('ujson is not installed.')
+
+    def loads(self, data):
+        return ujson.loads(data)
+
+    def dumps(self, obj):
+        return ujson.dumps(obj, ensure_ascii=False).encode('utf-8')
+
+
+_CODECS = (OrjsonCodec, UjsonCodec, StdlibJSONCodec)
+
+
+def get_codec(codec):
+    """
+    :param codec: Uma instância de JSONCodec (ou qualquer objeto com `loads` e `dumps`), o nome de um codec
+                  ('orjson', 'ujson' ou 'json'), 'auto' para o mais rápido instalado ou None
+    :rtype: JSONCodec
+    :return: O codec correspondente, ou None para o json da biblioteca padrão através de `requests`
+    :raises ImportError: Caso o codec informado não esteja instalado
+    """
+    if codec is None or hasattr(codec, 'loads'):
+        return codec
+    if codec == 'auto':
+        for cls in _CODECS:
+            try:
+                return cls()
+            except ImportError:
+                continue
+    for cls in _CODECS:
+        if cls.name == codec:
+            return cls()
+    raise ValueError('Unknown JSON codec: %r' % (codec,))
@@ -0,0 +1,139 @@
+# -*- coding: utf-8 -*-
+import threading
+from collections import deque
+from .result import _replace_params
+from .cache import approximate_size
+
+
+__all__ = ('PagePrefetcher',)
+
+
+def _first_page_params(params, page_size):
+    """
+    Parâmetros da primeira janela LMIN/LMAX de uma paginação. A janela começa no LMIN de `params`,
+    caso informado.
+
+    :type params: dict
+    :type page_size: int
+    :rtype: dict
+    """
+    if page_size < 1:
+        raise ValueError('page_size must be a positive integer.')
+    lmin = 0
+    for k, v in (params or {}).items():
+        if k.lower() == 'lmin':
+            lmin = int(v)
+    return _replace_params(params, LMIN=lmin, LMAX=lmin + page_size)
+
+
+def _page_size(page):
+    """
+    Memória aproximada, em bytes, ocupada por uma página já baixada: o corpo da resposta e as linhas
+    decodificadas, que costumam ocupar algumas vezes mais que o corpo.
+
+    :type page: unirio.api.result.APIResultObject
+    :rtype: int
+    """
+    return approximate_size(page)
+
+
+class PagePrefetcher(object):
+    def __init__(self, pages, depth=1, max_bytes=None):
+        """
+        Iterador que consome `pages` numa thread separada, mantendo até `depth` páginas baixadas à frente
+        da página que está sendo processada. Assim, a requisição da página N+1 acontece enquanto
+        quem chamou ainda processa a página N.
+
+        Exceptions levantadas durante o download são repassadas ao consumidor na ordem em que ocorreram.
+        Caso a iteração seja interrompida antes do fim, `close` deve ser chamado (ou o objeto usado
+        como context manager) para liberar a thread.
+
+        :type pages: collections.Iterable[unirio.api.result.APIResultObject]
+        :type depth: int
+        :param depth: Quantidade máxima de páginas mantidas no buffer
+        :type max_bytes: int
+        :param max_bytes: Limite aproximado da memória ocupada pelas páginas do buffer (corpo da resposta e linhas
+                          decodificadas). Uma nova página só é requisitada enquanto o buffer estiver abaixo do
+                          limite. None desabilita o limite
+        """
+        if depth < 1:
+            raise ValueError('depth must be a positive integer.')
+        self.depth = depth
+        self.max_bytes = max_bytes
+        self._pages = iter(pages)
+        self._buffer = deque()
+        self._buffered_bytes = 0
+        self._condition = threading.Condition()
+        self._closed = False
+        self._finished = False
+        self._error = None
+        self._thread = threading.Thread(target=self._run, name='unirio-api-prefetch')
+        self._thread.daemon = True
+        self._thread.start()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def _has_room(self):
+        if len(self._buffer) >= self.depth:
+            return False
+        if self.max_bytes is not None and self._buffer and self._buffered_bytes >= self.max_bytes:
+            return False
+        return True
+
+    def _run(self):
+        try:
+            while True:
+                with self._condition:
+                    while not self._closed and not self._has_room():
+                        self._condition.wait()
+                    if self._closed:
+                        return
+                try:
+                    page = next(self._pages)
+                except StopIteration:
+                    return
+                size = _page_size(page)
+                with self._condition:
+                    self._buffer.append((page, size))
+                    self._buffered_bytes += size
+                    self._condition.notify_all()
+        except Exception as e:
+            with self._condition:
+                self._error = e
+        finally:
+            with self._condition:
+                self._finished = True
+                self._condition.notify_all()
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        with self._condition:
+            while not self._buffer and not self._finished:
+                self._condition.wait()
+            if self._buffer:
+                page, size = self._buffer.popleft()
+                self._buffered_bytes -= size
+                self._condition.notify_all()
+                return page
+            if self._error is not None:
+                error, self._error = self._error, None
+                raise error
+            raise StopIteration
+
+    next = __next__
+
+    def close(self):
+        """
+        Interrompe a leitura antecipada e descarta as páginas ainda não consumidas.
+        """
+        with self._condition:
+            self._closed = True
+            self._buffer.clear()
+            self._buffered_bytes = 0
+            self._condition.notify_all()
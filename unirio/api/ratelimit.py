@@ -0,0 +1,157 @@
+# -*- coding: utf-8 -*-
+import threading
+import time
+
+
+__all__ = ('TokenBucket', 'RateLimiter')
+
+_clock = getattr(time, 'monotonic', time.time)
+
+
+class TokenBucket(object):
+    def __init__(self, rate, burst=None):
+        """
+        Balde de fichas, thread-safe: `rate` fichas são repostas por segundo, até o limite de `burst`.
+        Cada requisição consome uma ficha; sem fichas disponíveis, a requisição aguarda a próxima reposição.
+
+        :type rate: float
+        :param rate: Quantidade média de requisições por segundo
+        :type burst: int
+        :param burst: Quantidade de requisições que podem ser feitas de uma só vez após um período ocioso.
+                      Por padrão, o equivalente a um segundo de requisições
+        """
+        if rate <= 0:
+            raise ValueError('rate must be greater than 0.')
+        self.rate = float(rate)
+        self.burst = float(burst if burst is not None else max(1.0, rate))
+        self._tokens = self.burst
+        self._updated = _clock()
+        self._lock = threading.Lock()
+
+    def reserve(self, tokens=1, max_wait=None):
+        """
+        Reserva `tokens` fichas, mesmo que ainda não estejam disponíveis. Não bloqueia: quem reserva deve aguardar
+        o tempo retornado (com time.sleep ou asyncio.sleep) antes de fazer a requisição.
+
+        :type max_wait: float
+        :param max_wait: Espera máxima aceita. Caso a reserva exija uma espera maior, nenhuma ficha é reservada
+        :rtype: float
+        :return: Tempo, em segundos, até que as fichas reservadas estejam disponíveis, ou None caso ultrapasse
+                 `max_wait`
+        """
+        with self._lock:
+            now = _clock()
+            self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            wait = (tokens - self._tokens) / self.rate if self._tokens < tokens else 0.0
+            if max_wait is not None and wait > max_wait:
+                return None
+            self._tokens -= tokens
+            return wait
+
+
+def _acquire(semaphore, timeout=None):
+    """
+    `semaphore.acquire` com timeout, que o Python 2 não aceita
+
+    :rtype: bool
+    """
+    if timeout is None:
+        return semaphore.acquire()
+    try:
+        return semaphore.acquire(True, max(0.0, timeout))
+    except TypeError:
+        # Python 2.7
+        expires = _clock() + timeout
+        while not semaphore.acquire(False):
+            if _clock() >= expires:
+                return False
+            time.sleep(0.005)
+        return True
+
+
+class RateLimiter(object):
+    def __init__(self, rate=None, burst=None, max_in_flight=None):
+        """
+        Limita a taxa de requisições (balde de fichas) e/ou a quantidade de requisições simultâneas. Uma mesma
+        instância pode ser compartilhada por várias threads e por vários UNIRIOAPIRequest, para que o limite
+        valha para todos eles. Para AsyncUNIRIOAPIRequest, utilize `unirio.api.aio.AsyncRateLimiter`.
+
+            limiter = RateLimiter(rate=50, max_in_flight=10)
+            with limiter:
+                ...
+
+        :type rate: float
+        :param rate: Quantidade média de requisições por segundo. None não limita a taxa
+        :type burst: int
+        :param burst: Ver TokenBucket
+        :type max_in_flight: int
+        :param max_in_flight: Quantidade máxima de requisições em andamento. None não limita
+        """
+        self.bucket = TokenBucket(rate, burst) if rate else None
+        self.max_in_flight = max_in_flight
+        self._semaphore = threading.BoundedSemaphore(max_in_flight) if max_in_flight else None
+        self.acquired = 0
+        self.throttled = 0
+        self.wait_time = 0.0
+        self._stats_lock = threading.Lock()
+
+    def _record(self, waited):
+        """
+        :type waited: float
+        :param waited: Tempo de espera da requisição liberada, ou None caso não tenha aguardado
+        """
+        with self._stats_lock:
+            self.acquired += 1
+            if waited is not None:
+                self.throttled += 1
+                self.wait_time += waited
+
+    def acquire(self, timeout=None):
+        """
+        Bloqueia até que haja uma vaga para uma nova requisição e a taxa permita enviá-la
+
+        :type timeout: float
+        :param timeout: Tempo máximo de espera, em segundos. None aguarda indefinidamente
+        :rtype: bool
+        :return: False caso a requisição não possa ser liberada dentro de `timeout`. Nesse caso, nem a vaga nem a
+                 ficha são consumidas, e `release` não deve ser chamado
+        """
+        start = _clock()
+        throttled = False
+        if self._semaphore is not None and not self._semaphore.acquire(False):
+            throttled = True
+            if not _acquire(self._semaphore, timeout):
+                return False
+        if self.bucket is not None:
+            max_wait = timeout - (_clock() - start) if timeout is not None else None
+            delay = self.bucket.reserve(max_wait=max_wait)
+            if delay is None:
+                self.release()
+                return False
+            if delay > 0:
+                throttled = True
+                time.sleep(delay)
+        self._record(_clock() - start if throttled else None)
+        return True
+
+    def release(self):
+        if self._semaphore is not None:
+            self._semaphore.release()
+
+    def __enter__(self):
+        self.acquire()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.release()
+
+    @property
+    def stats(self):
+        """
+        :rtype: dict
+        :return: `acquired` é a quantidade de requisições liberadas, `throttled` a das que precisaram aguardar e
+                 `wait_time` o tempo total, em segundos, dessa espera
+        """
+        with self._stats_lock:
+            return {'acquired': self.acquired, 'throttled': self.throttled, 'wait_time': self.wait_time}
@@ -1,34 +1,105 @@
 # -*- coding: utf-8 -*-
 import requests
+import hashlib
+import json
 import logging
+import threading
+import time
 from enum import Enum
 from .exceptions import *
 from .result import *
+from .result import _TRANSIENT_POLL_ERRORS
+from .pagination import PagePrefetcher, _first_page_params
+from .singleflight import SingleFlight
+from .cache import BaseCache
+from .streaming import APIStreamingResultObject
+from .jsoncodec import get_codec
+from .deadline import Deadline
+from .instrumentation import RequestEvent, _emit
 from collections import Iterable
+from itertools import islice
+from concurrent.futures import ThreadPoolExecutor, as_completed, ALL_COMPLETED, FIRST_COMPLETED, FIRST_EXCEPTION
+from requests.adapters import HTTPAdapter
 from requests.packages.urllib3.exceptions import InsecureRequestWarning
 
 requests.packages.urllib3.disable_warnings(InsecureRequestWarning)
 
 
+def _check_required(request, params, required):
+    """
+    :type params: dict
+    :type required: str or collections.Iterable
+    :raises MissingRequiredParameterException: Caso algum parâmetro de `required` não esteja em `params`
+    """
+    if isinstance(required, str):
+        required = (required,)
+    elif not isinstance(required, Iterable):
+        raise TypeError('params must be str or Iterable.')
+    lower_args = tuple(k.lower() for k in params.keys())
+    for param in required:
+        if param.lower() not in lower_args:
+            raise MissingRequiredParameterException(request, param)
+
+
+def _split_chunks(rows, chunk_size=None, chunk_bytes=None, size=len):
+    """
+    Divide `rows` em listas consecutivas com no máximo `chunk_size` linhas e, aproximadamente, `chunk_bytes` bytes
+
+    :type rows: collections.Iterable
+    :type size: callable
+    :param size: Função que retorna o tamanho, em bytes, de uma linha serializada
+    :rtype: collections.Iterator[list]
+    """
+    chunk = []
+    chunk_size_bytes = 0
+    for row in rows:
+        row_bytes = size(row) + 1 if chunk_bytes else 0  # +1 da vírgula que separa as linhas
+        if chunk and ((chunk_size and len(chunk) >= chunk_size) or
+                      (chunk_bytes and chunk_size_bytes + row_bytes > chunk_bytes)):
+            yield chunk
+            chunk = []
+            chunk_size_bytes = 0
+        chunk.append(row)
+        chunk_size_bytes += row_bytes
+    if chunk:
+        yield chunk
+
+
 def requires(params):
     def decorator(fn):
         def checker(*args, **kwargs):
-            def validate(param):
-                lower_args = tuple(k.lower() for k in args[2].keys())
-                if param.lower() not in lower_args:
-                    raise MissingRequiredParameterException(args[0], param)
-            if isinstance(params, str):
-                validate(params)
-            elif isinstance(params, Iterable):
-                for param in params:
-                    validate(param)
-            else:
-                raise TypeError('params must be str or Iterable.')
+            _check_required(args[0], args[2], params)
             return fn(*args, **kwargs)
         return checker
     return decorator
 
 
+def _read_body(response, deadline, chunk_size=8 * 1024):
+    """
+    Lê o corpo de uma resposta obtida com stream=True, verificando `deadline` entre os blocos. Assim, um corpo
+    recebido aos poucos, sempre dentro do timeout de leitura, não ultrapassa o deadline em mais que um bloco.
+
+    :type response: requests.models.Response
+    :type deadline: Deadline
+    :raises APITimeoutException: Caso o deadline expire antes que o corpo seja lido
+    """
+    chunks = []
+    try:
+        for chunk in response.iter_content(chunk_size):
+            chunks.append(chunk)
+            deadline.check()
+    except BaseException:
+        response.close()
+        raise
+    # Equivalente ao que `response.content` faz ao ler o corpo de uma vez
+    response._content = b''.join(chunks)
+    response._content_consumed = True
+
+
+# Timeouts padrão, em segundos, de conexão e de leitura (intervalo máximo sem receber dados do servidor)
+DEFAULT_TIMEOUT = (10, 120)
+
+
 class APIServer(Enum):
     PRODUCTION = "https://sistemas.unirio.br/api"
     DEVELOPMENT = "https://teste.sistemas.unirio.br/api"
@@ -36,18 +107,38 @@ class APIServer(Enum):
     PRODUCTION_DEVELOPMENT = "https://sistemas.unirio.br/api_teste"
 
 
-class UNIRIOAPIRequest(object):
+class _NoContent(object):
+    def __init__(self, created):
+        """
+        Marcador armazenado no cache no lugar de um resultado vazio (NoContentException)
+
+        :type created: float
+        """
+        self.created = created
+
+
+class BaseAPIRequest(object):
     """
-    UNIRIOAPIRequest is the main class for
+    Comportamento comum aos clientes da API, independente da biblioteca HTTP utilizada
     """
 
-    def __init__(self, api_key, server=APIServer.LOCAL, debug=True, cache=None, cert=False):
+    def __init__(self, api_key, server=APIServer.LOCAL, debug=True, cache=None, cert=False, json_codec=None,
+                 rate_limiter=None, path_rate_limiters=None):
         """
 
         :type server: str
         :type cache: gluon.cache.CacheInRam
         :param api_key: The 'API Key' that will the used to perform the requests
         :param server: The server that will used.
+        :type json_codec: str or unirio.api.jsoncodec.JSONCodec
+        :param json_codec: Codec JSON das respostas e do corpo das requisições: 'orjson', 'ujson', 'json', 'auto'
+                           (o mais rápido instalado) ou um objeto com `loads` e `dumps`. None utiliza o json
+                           da biblioteca padrão através de `requests`
+        :type rate_limiter: unirio.api.ratelimit.RateLimiter
+        :param rate_limiter: Limite de taxa e de requisições simultâneas aplicado a todas as requisições do cliente
+        :type path_rate_limiters: dict
+        :param path_rate_limiters: Dicionário {endpoint: RateLimiter} de limites adicionais por endpoint, sem
+                                   diferenciar maiúsculas de minúsculas. Ex: {'ALUNOS': RateLimiter(rate=5)}
         """
         self.api_key = api_key
         self.server = server
@@ -56,6 +147,9 @@ class UNIRIOAPIRequest(object):
         self.cache = cache
         self.last_request = ""
         self.cert = cert
+        self.json_codec = get_codec(json_codec)
+        self.rate_limiter = rate_limiter
+        self.path_rate_limiters = {k.upper(): v for k, v in (path_rate_limiters or {}).items()}
 
     def _url_query_parameters_with_dictionary(self, params={}):
         """
@@ -97,9 +191,12 @@ class UNIRIOAPIRequest(object):
         The method construct the base URL to be used for requests.
 
         :rtype : str
-        :param path: The API endpoint to use for the request, for example "/ALUNOS"
+        :param path: The API endpoint to use for the request, for example "/ALUNOS". Absolute URLs (e.g. the
+                     Location of an async procedure) are returned unchanged
         :return: Base URL with the provided endpoint
         """
+        if '://' in path:
+            return path
         request_url = self.server + "/" + path
         return request_url
 
@@ -120,6 +217,46 @@ class UNIRIOAPIRequest(object):
             parameters.update(return_fields)
         return parameters
 
+    def _rate_limiters(self, path):
+        """
+        :rtype: list
+        :return: Os limites aplicados a uma requisição para `path`, na ordem em que devem ser adquiridos
+        """
+        limiters = [self.rate_limiter] if self.rate_limiter is not None else []
+        path_limiter = self.path_rate_limiters.get(path.upper()) if self.path_rate_limiters else None
+        if path_limiter is not None:
+            limiters.append(path_limiter)
+        return limiters
+
+    def _circuit_key(self, path):
+        """
+        :rtype: tuple
+        :return: Chave (servidor, endpoint) do circuito de uma requisição para `path`. URLs absolutas (ex: o
+                 Location de uma procedure assíncrona) são agrupadas pela URL sem o último segmento
+        """
+        if '://' in path:
+            return path.split('?', 1)[0].rsplit('/', 1)[0], '*'
+        return self.server, path.upper()
+
+    def _json_body(self, obj):
+        """
+        Argumentos de uma requisição cujo corpo é `obj` serializado em JSON, com o codec do cliente
+
+        :rtype: dict
+        """
+        if self.json_codec is None:
+            return {'json': obj}
+        return {'data': self.json_codec.dumps(obj), 'headers': {'Content-Type': 'application/json'}}
+
+    def _json_size(self, obj):
+        """
+        :rtype: int
+        :return: Tamanho, em bytes, de `obj` serializado em JSON com o codec do cliente
+        """
+        if self.json_codec is None:
+            return len(json.dumps(obj))
+        return len(self.json_codec.dumps(obj))
+
     @property
     def _payload(self):
         """
@@ -132,20 +269,264 @@ class UNIRIOAPIRequest(object):
         """
         return {"API_KEY": self.api_key}
 
-    def __cache_hash(self, path, params):
+    def _cache_hash(self, path, params, fields=None, compact=False):
         """
-        Método utilizado para gerar um hash único para ser utilizado como chave de um cache
+        Método utilizado para gerar um hash único para ser utilizado como chave de um cache. A chave é
+        determinística (não depende do `hash` do Python, que varia entre processos) e considera tudo o que
+        altera a resposta: servidor, API Key, endpoint, parâmetros (sem diferenciar maiúsculas de minúsculas)
+        e campos retornados. Assim, a chave pode ser compartilhada por caches fora do processo.
 
         :param path: String correspondente a um endpoint
         :param params: Dicionário de parâmetros
+        :param fields: Lista de campos retornados
+        :param compact: Se o resultado utiliza CompactRow, já que a representação armazenada é diferente
         :return: String a ser utilizada como chave de um cache
+        :raises ValueError: Caso dois parâmetros difiram apenas por maiúsculas e minúsculas
+        """
+        def normalize(value):
+            if isinstance(value, (list, tuple, set, frozenset)):
+                # Os itens podem ter tipos diferentes, que não são comparáveis entre si no Python 3
+                return sorted((normalize(v) for v in value), key=lambda v: json.dumps(v, sort_keys=True))
+            return value if isinstance(value, (str, type(u''))) else str(value)
+
+        ignored = ('API_KEY', 'FORMAT', 'FIELDS')
+        normalized = {}
+        for k, v in (params or {}).items():
+            if k.upper() in ignored:
+                continue
+            if k.upper() in normalized:
+                raise ValueError('Parameters differing only by case are ambiguous: %s' % k.upper())
+            normalized[k.upper()] = normalize(v)
+        request = {
+            'server': getattr(self.server, 'value', self.server),
+            'key': hashlib.sha1(self.api_key.encode('utf-8')).hexdigest(),
+            'params': sorted([k, v] for k, v in normalized.items()),
+            'fields': sorted(f.upper() for f in fields or ()),
+        }
+        if compact:
+            request['compact'] = True
+        digest = hashlib.sha1(json.dumps(request, sort_keys=True).encode('utf-8')).hexdigest()
+        return '%s:%s' % (path, digest)
+
+
+class UNIRIOAPIRequest(BaseAPIRequest):
+    """
+    UNIRIOAPIRequest is the main class for
+    """
+
+    def __init__(self, api_key, server=APIServer.LOCAL, debug=True, cache=None, cert=False,
+                 pool_connections=10, pool_maxsize=10, pool_block=False, keep_alive=True, single_flight=False,
+                 no_content_cache_time=0, json_codec=None, rate_limiter=None, path_rate_limiters=None,
+                 retry_policy=None, circuit_breaker=None, timeout=DEFAULT_TIMEOUT, instrumentation=None):
+        """
+
+        :type server: str
+        :type cache: gluon.cache.CacheInRam
+        :param api_key: The 'API Key' that will the used to perform the requests
+        :param server: The server that will used.
+        :type pool_connections: int
+        :param pool_connections: Quantidade de pools de conexão (um por host) mantidos pela sessão
+        :type pool_maxsize: int
+        :param pool_maxsize: Número máximo de conexões reaproveitáveis por host
+        :type pool_block: bool
+        :param pool_block: Se True, bloqueia quando o pool se esgota ao invés de abrir conexões descartáveis
+        :type keep_alive: bool
+        :param keep_alive: Se False, envia 'Connection: close' e cada requisição usa uma nova conexão
+        :type single_flight: bool
+        :param single_flight: Se True, GETs idênticos simultâneos são agrupados numa só requisição, cujo
+                              resultado (ou exception) é compartilhado. Contadores em `single_flight.stats`
+        :type no_content_cache_time: int
+        :param no_content_cache_time: Tempo, em segundos, que um resultado vazio (NoContentException) de um GET
+                                      com cache_time permanece em cache. 0 não armazena resultados vazios
+        :type json_codec: str or unirio.api.jsoncodec.JSONCodec
+        :param json_codec: Ver BaseAPIRequest
+        :param rate_limiter: Ver BaseAPIRequest
+        :param path_rate_limiters: Ver BaseAPIRequest
+        :type retry_policy: unirio.api.retry.RetryPolicy
+        :param retry_policy: Novas tentativas, com backoff exponencial, para falhas transitórias das requisições cujo
+                             verbo é permitido pela política (por padrão, somente GET). Contadores em
+                             `retry_policy.stats`
+        :type circuit_breaker: unirio.api.circuitbreaker.CircuitBreaker
+        :param circuit_breaker: Disjuntor por servidor e endpoint: enquanto o circuito de um endpoint estiver
+                                aberto, as requisições falham imediatamente com CircuitOpenException
+        :type timeout: float or tuple
+        :param timeout: Timeout padrão das requisições, em segundos, ou uma tupla (conexão, leitura). Pode ser
+                        alterado por chamada. None aguarda indefinidamente
+        :type instrumentation: unirio.api.instrumentation.Instrumentation or list
+        :param instrumentation: Uma ou mais instrumentações, notificadas com um RequestEvent ao fim de cada
+                                chamada. Ex: MetricsAggregator
+        """
+        super(UNIRIOAPIRequest, self).__init__(api_key, server, debug, cache, cert, json_codec, rate_limiter,
+                                               path_rate_limiters)
+        self.retry_policy = retry_policy
+        self.circuit_breaker = circuit_breaker
+        self.timeout = timeout
+        if instrumentation is not None and not isinstance(instrumentation, (list, tuple)):
+            instrumentation = [instrumentation]
+        self._instruments = tuple(instrumentation or ())
+        self.single_flight = SingleFlight() if single_flight else None
+        self.no_content_cache_time = no_content_cache_time
+        self.pool_connections = pool_connections
+        self.pool_maxsize = pool_maxsize
+        self.pool_block = pool_block
+        self.keep_alive = keep_alive
+        self._session = None
+        self._session_lock = threading.Lock()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    @property
+    def session(self):
+        """
+        Sessão HTTP compartilhada por todas as requisições desta instância. As conexões ficam num pool
+        (thread-safe) e são reaproveitadas entre chamadas, evitando um novo handshake TCP/TLS a cada requisição.
+
+        :rtype: requests.Session
+        """
+        if self._session is None:
+            with self._session_lock:
+                if self._session is None:
+                    self._session = self._new_session()
+        return self._session
+
+    def _new_session(self):
+        """
+        :rtype: requests.Session
+        """
+        session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=self.pool_connections,
+                              pool_maxsize=self.pool_maxsize,
+                              pool_block=self.pool_block)
+        session.mount('http://', adapter)
+        session.mount('https://', adapter)
+        if not self.keep_alive:
+            session.headers['Connection'] = 'close'
+        return session
+
+    def close(self):
+        """
+        Fecha as conexões abertas do pool. A instância continua utilizável: uma nova sessão é criada
+        na próxima requisição.
+        """
+        with self._session_lock:
+            if self._session is not None:
+                self._session.close()
+                self._session = None
+
+    @property
+    def instrumentation(self):
+        """
+        :rtype: tuple
+        """
+        return self._instruments
+
+    def _emit(self, event, error=None):
+        event._finish(error)
+        _emit(self._instruments, event)
+
+    def _instrumented(self, event, fn):
         """
-        if params:
-            return path + str(hash(frozenset(params.items())))
+        Executa `fn` e emite `event` ao final, com a exception levantada, caso haja
+        """
+        try:
+            result = fn()
+        except Exception as e:
+            self._emit(event, e)
+            raise
+        self._emit(event)
+        return result
+
+    def _request(self, method, path, timeout=None, deadline=None, event=None, **kwargs):
+        """
+        Ponto único por onde passam todas as requisições HTTP do cliente.
+
+        :type method: str
+        :param method: Verbo HTTP
+        :type path: str
+        :param path: The API endpoint to use for the request, for example "ALUNOS", or an absolute URL
+        :type timeout: float or tuple
+        :param timeout: Timeout da requisição. None utiliza o do cliente
+        :type deadline: Deadline
+        :param deadline: Tempo limite da chamada. Cada tentativa tem seus timeouts limitados ao tempo restante
+        :type event: RequestEvent
+        :param event: Evento da chamada, preenchido com os dados da requisição e emitido por quem o criou. Caso
+                      não seja informado e o cliente tenha instrumentação, um evento é criado e emitido aqui
+        :rtype: requests.models.Response
+        :raises APITimeoutException: Caso um timeout seja excedido ou o deadline expire
+        """
+        if event is None and self._instruments:
+            event = RequestEvent(method, path)
+            return self._instrumented(event, lambda: self._request(method, path, timeout, deadline, event, **kwargs))
+
+        url = self._url_with_path(path)
+        kwargs.setdefault('verify', self.cert)
+        if timeout is None:
+            timeout = self.timeout
+        limiters = self._rate_limiters(path)
+        circuit = self.circuit_breaker.circuit(self._circuit_key(path)) if self.circuit_breaker else None
+
+        def session_request(request_timeout):
+            try:
+                if deadline is None or kwargs.get('stream'):
+                    return self.session.request(method, url, timeout=request_timeout, **kwargs)
+                # O corpo é lido aos poucos, para que o deadline limite também o seu recebimento
+                response = self.session.request(method, url, timeout=request_timeout, stream=True, **kwargs)
+                _read_body(response, deadline)
+                return response
+            except (requests.exceptions.Timeout, requests.exceptions.ConnectionError) as e:
+                # Os timeouts de leitura são limitados ao tempo restante. Um timeout durante a leitura do corpo é
+                # levantado pelo `requests` como ConnectionError
+                if deadline is not None and deadline.expired:
+                    raise deadline.exceeded()
+                if isinstance(e, requests.exceptions.Timeout):
+                    raise APITimeoutException(getattr(e, 'response', None), str(e))
+                raise
+
+        def send():
+            if event is not None:
+                event.attempts += 1
+            if deadline is not None:
+                deadline.check()
+            if circuit is not None:
+                # Um circuito aberto rejeita a requisição antes que ela aguarde uma vaga nos limitadores
+                circuit.before_call()
+            acquired = []
+            try:
+                for limiter in limiters:
+                    if not limiter.acquire(deadline.remaining() if deadline is not None else None):
+                        raise deadline.exceeded()
+                    acquired.append(limiter)
+                # Calculado fora do circuito: um deadline que expira antes do envio não é uma falha do servidor
+                request_timeout = deadline.cap(timeout) if deadline is not None else timeout
+            except BaseException:
+                if circuit is not None:
+                    circuit.cancel()
+                for limiter in reversed(acquired):
+                    limiter.release()
+                raise
+            try:
+                if circuit is not None:
+                    return circuit.call(lambda: session_request(request_timeout), deadline)
+                return session_request(request_timeout)
+            finally:
+                for limiter in reversed(acquired):
+                    limiter.release()
+
+        if self.retry_policy is not None and self.retry_policy.allows(method):
+            # Cada tentativa passa novamente pelos limitadores; a espera entre tentativas não ocupa uma vaga
+            response = self.retry_policy.call(send, deadline.expires if deadline is not None else None)
         else:
-            return path
+            response = send()
+        if event is not None:
+            event._record_response(response)
+        return response
 
-    def get(self, path, params=None, fields=None, cache_time=0, bypass_no_content_exception=False):
+    def get(self, path, params=None, fields=None, cache_time=0, bypass_no_content_exception=False,
+            no_content_cache_time=None, compact=False, columnar=False, timeout=None, deadline=None):
         """
         Método para realizar uma requisição GET. O método utiliza a API Key fornecida ao instanciar 'UNIRIOAPIRequest'
         e uma chave inválida resulta em um erro HTTP
@@ -160,39 +541,328 @@ class UNIRIOAPIRequest(object):
         :param cache_time int for cached expiration time. 0 means no cached is applied
         :type bypass_no_content_exception: bool
         :param bypass_no_content_exception: optional argument to indicate to return a empty list instead of raising a NoContentException
+        :type no_content_cache_time: int
+        :param no_content_cache_time: Tempo de cache de um resultado vazio, normalmente menor que cache_time.
+                                      None utiliza o valor informado ao instanciar UNIRIOAPIRequest
+        :type compact: bool
+        :param compact: Se True, as linhas são CompactRow (tuplas com um índice de campos compartilhado),
+                        que ocupam menos memória e são decodificadas mais rapidamente que CaseInsensitiveDict
+        :type columnar: bool
+        :param columnar: Se True, retorna um ColumnarResult, com uma coluna tipada por campo. As linhas são
+                         decodificadas como CompactRow, sem criar um dicionário por linha
+        :type timeout: float or tuple
+        :param timeout: Timeout da requisição, em segundos, ou uma tupla (conexão, leitura). None utiliza o timeout
+                        informado ao instanciar UNIRIOAPIRequest
+        :type deadline: float or Deadline
+        :param deadline: Tempo máximo, em segundos, da chamada inteira, incluindo novas tentativas (RetryPolicy) e
+                         esperas por uma vaga nos limitadores ou por uma requisição idêntica em andamento (cache,
+                         single_flight). Os timeouts de cada requisição são limitados ao tempo restante
         :rtype : APIResultObject
         :raises Exception may raise an exception if not able to instantiate APIResultObject
+        :raises APITimeoutException: Caso um timeout seja excedido ou o deadline expire
         """
-        def _get():
-            url = self._url_with_path(path)
-            payload = self._url_query_data(params, fields)
+        if no_content_cache_time is None:
+            no_content_cache_time = self.no_content_cache_time
+        deadline = Deadline.of(deadline)
+        if columnar:
+            result = self.get(path, params, fields, cache_time, bypass_no_content_exception, no_content_cache_time,
+                              compact=True, timeout=timeout, deadline=deadline)
+            return result.to_columns() if isinstance(result, APIResultObject) else result
+
+        # Threads que fizeram requisições para esta chamada. As demais a atendem pelo cache ou compartilhando
+        # a requisição de outra chamada (single_flight)
+        fetched = set()
+
+        def _get(cached=None):
+            if not self._instruments:
+                return _fetch(cached)
+            fetched.add(threading.current_thread().ident)
+            event = RequestEvent('GET', path)
+            event.cache = 'miss' if self.cache and cache_time else None
+            return self._instrumented(event, lambda: _fetch(cached, event))
 
-            r = requests.get(url, params=payload, verify=self.cert)
+        def _fetch(cached=None, event=None):
+            query = dict(params or {})
+            payload = self._url_query_data(dict(query), fields)
+            headers = cached.validators if cached is not None else None
+
+            r = self._request('GET', path, timeout, deadline, event, params=payload, headers=headers)
             if self.debug:
                 logging.debug(r.url)
-                self.last_request = url
-            try:
-                result_object = APIResultObject(r, self)
-            except NoContentException as e:
-                if bypass_no_content_exception:
-                    return []
-                raise e
+                self.last_request = self._url_with_path(path)
+            result_object = APIResultObject(r, self, cached, compact)
+            result_object.path = path
+            result_object.params = query
+            if event is not None:
+                event.decode_time = result_object.decode_time
             return result_object
 
-        if self.cache and cache_time:
-            unique_hash = self.__cache_hash(path, params)
-            cached_content = self.cache(
-                unique_hash,
-                lambda: _get(),
-                time_expire=cache_time
-            )
-            if self.debug:
-                logging.debug(unique_hash)
-            return cached_content
-        else:
-            return _get()
+        def shared(served):
+            unique_hash = self._cache_hash(path, params, fields, compact)
+
+            def fetch(fn=_get):
+                if self.single_flight is not None:
+                    return self.single_flight.do(unique_hash, fn, deadline.remaining() if deadline else None)
+                return fn()
 
-    def get_single_result(self, path, params=None, fields=None, cache_time=0, bypass_no_content_exception=False):
+            if self.cache and cache_time:
+                def revalidate():
+                    # Um resultado expirado que possua ETag/Last-Modified é revalidado com uma requisição
+                    # condicional. Caso não tenha sido alterado (304), o cache é renovado com o mesmo conteúdo
+                    peek = getattr(self.cache, 'peek', None)
+                    cached = peek(unique_hash) if peek else None
+                    if isinstance(cached, APIResultObject) and cached.validators:
+                        return _get(cached)
+                    return _get()
+
+                def cached_fetch():
+                    try:
+                        return fetch(revalidate)
+                    except NoContentException:
+                        if not no_content_cache_time:
+                            raise
+                        return _NoContent(time.time())
+
+                def outcome():
+                    # Caches que não informam o resultado são tratados como 'hit'. Um valor carregado por esta
+                    # thread enquanto aguardava a requisição de outra chamada (single_flight) foi compartilhado
+                    last = getattr(self.cache, 'last_outcome', None) or 'hit'
+                    if last == 'miss' and threading.current_thread().ident not in fetched:
+                        return 'shared'
+                    return last
+
+                def from_cache():
+                    try:
+                        # Os caches do pacote limitam a espera por outra thread que já está carregando a mesma chave
+                        if deadline is not None and isinstance(self.cache, BaseCache):
+                            return self.cache(unique_hash, cached_fetch, time_expire=cache_time,
+                                              timeout=deadline.remaining())
+                        return self.cache(unique_hash, cached_fetch, time_expire=cache_time)
+                    finally:
+                        served['cache'] = outcome()
+
+                circuit_open = False
+                try:
+                    cached_content = from_cache()
+                except CircuitOpenException:
+                    # Com o circuito aberto, o valor em cache é retornado mesmo que expirado, caso exista
+                    peek = getattr(self.cache, 'peek', None)
+                    if not (peek and self.circuit_breaker.serve_stale):
+                        raise
+                    cached_content = peek(unique_hash)
+                    if cached_content is None:
+                        raise
+                    circuit_open = True
+                    served['cache'] = 'stale'
+                if not circuit_open and isinstance(cached_content, _NoContent) and \
+                        time.time() - cached_content.created >= no_content_cache_time:
+                    self.cache(unique_hash, None)
+                    cached_content = from_cache()
+                if self.debug:
+                    logging.debug(unique_hash)
+                if isinstance(cached_content, _NoContent):
+                    raise NoContentException(None, msg="Resultado vazio obtido do cache")
+                return cached_content
+            served['cache'] = 'shared'
+            return fetch()
+
+        try:
+            if not (self.cache and cache_time) and self.single_flight is None:
+                return _get()
+            if not self._instruments:
+                return shared({})
+
+            event = RequestEvent('GET', path)
+            served = {}
+            error = None
+            try:
+                return shared(served)
+            except Exception as e:
+                error = e
+                raise
+            finally:
+                # As requisições feitas por esta thread já emitiram seus eventos. Caso contrário, a chamada foi
+                # atendida pelo cache ou pela requisição de outra chamada
+                if served.get('cache') == 'stale' or threading.current_thread().ident not in fetched:
+                    event.cache = served.get('cache')
+                    self._emit(event, error)
+        except NoContentException as e:
+            if bypass_no_content_exception:
+                return []
+            raise e
+
+    def get_stream(self, path, params=None, fields=None, compact=False, chunk_size=64 * 1024, timeout=None,
+                   deadline=None):
+        """
+        Variante de `get` para resultados muito grandes: o corpo da resposta é lido e decodificado aos poucos,
+        e as linhas são retornadas uma a uma ao iterar o objeto retornado, sem manter o corpo inteiro nem todas
+        as linhas decodificadas em memória. Resultados em streaming não são armazenados em cache.
+
+        O resultado mantém uma conexão do pool ocupada até ser percorrido por completo ou fechado:
+
+            with api.get_stream("ALUNOS", {"LMIN": 0, "LMAX": 500000}) as rows:
+                for row in rows:
+                    ...
+
+        :type path: str
+        :type params: dict
+        :type fields: list or tuple
+        :type compact: bool
+        :param compact: Se True, as linhas são CompactRow. Ver `get`
+        :type chunk_size: int
+        :param chunk_size: Quantidade de bytes lidos do socket por vez
+        :param timeout: Ver `get`. O timeout de leitura vale para cada leitura do socket durante a iteração
+        :param deadline: Ver `get`. Limita somente o recebimento dos cabeçalhos da resposta
+        :rtype: APIStreamingResultObject
+        :raises NoContentException: Caso o corpo da resposta seja vazio
+        """
+        payload = self._url_query_data(dict(params or {}), fields)
+        r = self._request('GET', path, timeout, Deadline.of(deadline), params=payload, stream=True)
+        if self.debug:
+            logging.debug(r.url)
+            self.last_request = self._url_with_path(path)
+        try:
+            return APIStreamingResultObject(r, self, compact, chunk_size)
+        except Exception:
+            r.close()
+            raise
+
+    def iter_pages(self, path, params=None, fields=None, page_size=1000, cache_time=0, prefetch=0,
+                   prefetch_max_bytes=None, compact=False, timeout=None, deadline=None):
+        """
+        Percorre um endpoint página a página, utilizando janelas LMIN/LMAX de tamanho `page_size`.
+        A primeira janela começa no LMIN de `params`, caso informado, e a iteração termina na
+        primeira página incompleta ou sem conteúdo.
+
+        Com `prefetch`, as próximas páginas são requisitadas numa thread enquanto a página atual é
+        processada. Nesse caso o iterador retornado é um `PagePrefetcher`, que deve ser fechado
+        caso a iteração seja interrompida antes do fim.
+
+        :type path: str
+        :type params: dict
+        :type fields: list or tuple
+        :type page_size: int
+        :param page_size: Quantidade de linhas requisitadas por página
+        :type prefetch: int
+        :param prefetch: Quantidade de páginas buscadas antecipadamente. 0 desabilita a leitura antecipada
+        :type prefetch_max_bytes: int
+        :param prefetch_max_bytes: Limite aproximado, em bytes, das páginas mantidas no buffer de leitura antecipada
+        :type compact: bool
+        :param compact: Se True, as linhas são CompactRow. Ver `get`
+        :param timeout: Timeout de cada página. Ver `get`
+        :param deadline: Tempo máximo, em segundos, para percorrer todas as páginas, contado a partir desta chamada
+        :rtype: collections.Iterator[APIResultObject]
+        """
+        pages = self._iter_pages(path, _first_page_params(params, page_size), fields, cache_time, compact, timeout,
+                                 Deadline.of(deadline))
+        if prefetch:
+            return PagePrefetcher(pages, prefetch, prefetch_max_bytes)
+        return pages
+
+    def _iter_pages(self, path, page_params, fields, cache_time, compact, timeout, deadline):
+        while page_params is not None:
+            try:
+                page = self.get(path, page_params, fields, cache_time, compact=compact, timeout=timeout,
+                                deadline=deadline)
+            except NoContentException:
+                return
+            yield page
+            page_params = page.next_request_for_result()
+
+    def iter_all(self, path, params=None, fields=None, page_size=1000, cache_time=0, prefetch=0,
+                 prefetch_max_bytes=None, compact=False, timeout=None, deadline=None):
+        """
+        Gerador que retorna, uma a uma, todas as linhas de um endpoint. Somente uma página é mantida
+        em memória por vez (além das `prefetch` páginas lidas antecipadamente), o que permite exportar
+        tabelas inteiras com memória constante.
+
+        :type path: str
+        :type params: dict
+        :type fields: list or tuple
+        :type page_size: int
+        :param page_size: Quantidade de linhas requisitadas por página
+        :type prefetch: int
+        :param prefetch: Quantidade de páginas buscadas antecipadamente. 0 desabilita a leitura antecipada
+        :type prefetch_max_bytes: int
+        :param prefetch_max_bytes: Limite aproximado, em bytes, das páginas mantidas no buffer de leitura antecipada
+        :type compact: bool
+        :param compact: Se True, as linhas são CompactRow. Ver `get`
+        :param timeout: Ver `iter_pages`
+        :param deadline: Ver `iter_pages`
+        :rtype: collections.Iterator[requests.structures.CaseInsensitiveDict]
+        """
+        pages = self.iter_pages(path, params, fields, page_size, cache_time, prefetch, prefetch_max_bytes, compact,
+                                timeout, deadline)
+        try:
+            for page in pages:
+                for row in page:
+                    yield row
+        finally:
+            if isinstance(pages, PagePrefetcher):
+                pages.close()
+
+    def _fan_out(self, calls, max_workers=None, fail_fast=False):
+        """
+        Executa chamadas independentes em paralelo num pool de threads.
+
+        :type calls: list
+        :param calls: Lista de callables sem argumentos
+        :type max_workers: int
+        :param max_workers: Quantidade de threads. Por padrão, o tamanho do pool de conexões por host
+        :type fail_fast: bool
+        :param fail_fast: Se True, a primeira exception é levantada e as chamadas ainda não iniciadas são canceladas
+        :rtype: list
+        :return: Lista, na ordem de `calls`, com o retorno de cada chamada ou a exception levantada por ela
+        """
+        results = [None] * len(calls)
+        if not calls:
+            return results
+
+        with ThreadPoolExecutor(max_workers=max_workers or min(len(calls), self.pool_maxsize)) as executor:
+            futures = {executor.submit(call): i for i, call in enumerate(calls)}
+            for future in as_completed(futures):
+                try:
+                    results[futures[future]] = future.result()
+                except Exception as e:
+                    if fail_fast:
+                        for f in futures:
+                            f.cancel()
+                        raise
+                    results[futures[future]] = e
+        return results
+
+    def get_many(self, queries, max_workers=None, fail_fast=False, cache_time=0, bypass_no_content_exception=False,
+                 timeout=None, deadline=None):
+        """
+        Realiza várias requisições GET independentes em paralelo. O tempo total passa a ser o da requisição mais
+        lenta, ao invés da soma de todas.
+
+        :type queries: list
+        :param queries: Lista de tuplas (path, params, fields). params e fields são opcionais
+        :type max_workers: int
+        :param max_workers: Quantidade de requisições simultâneas. Por padrão, o tamanho do pool de conexões
+        :type fail_fast: bool
+        :param fail_fast: Se True, a primeira exception é levantada ao invés de ser retornada na lista
+        :type cache_time: int
+        :param cache_time: int for cached expiration time, applied to every query
+        :type bypass_no_content_exception: bool
+        :param timeout: Timeout de cada requisição. Ver `get`
+        :param deadline: Tempo máximo, em segundos, de todas as requisições. As que ainda não tiverem começado
+                         quando ele expirar falham com APITimeoutException
+        :rtype: list
+        :return: Lista, na ordem de `queries`, com o APIResultObject de cada requisição ou a exception levantada por ela
+        """
+        deadline = Deadline.of(deadline)
+
+        def call(path, params=None, fields=None):
+            # get altera o dicionário de parâmetros recebido, então cada chamada recebe sua própria cópia
+            return lambda: self.get(path, dict(params or {}), fields, cache_time, bypass_no_content_exception,
+                                    timeout=timeout, deadline=deadline)
+
+        return self._fan_out([call(*query) for query in queries], max_workers, fail_fast)
+
+    def get_single_result(self, path, params=None, fields=None, cache_time=0, bypass_no_content_exception=False,
+                          no_content_cache_time=None, compact=False, timeout=None, deadline=None):
         """
         Wrapper para pegar apenas um resultado.
 
@@ -201,6 +871,10 @@ class UNIRIOAPIRequest(object):
         :param fields:
         :param cache_time:
         :param bypass_no_content_exception:
+        :param no_content_cache_time:
+        :param compact:
+        :param timeout: Ver `get`
+        :param deadline: Ver `get`
         :rtype: dict
         """
         try:
@@ -212,7 +886,8 @@ class UNIRIOAPIRequest(object):
                 "LMAX": 1
             })
 
-            res = self.get(path, params, fields, cache_time)
+            res = self.get(path, params, fields, cache_time, no_content_cache_time=no_content_cache_time,
+                           compact=compact, timeout=timeout, deadline=deadline)
             return res.first()
         except NoContentException as e:
             if bypass_no_content_exception:
@@ -220,56 +895,154 @@ class UNIRIOAPIRequest(object):
             raise e
 
     @requires('COD_OPERADOR')
-    def post(self, path, params):
+    def post(self, path, params, timeout=None, deadline=None):
         """
 
+        :param timeout: Ver `get`
+        :param deadline: Ver `get`
         :rtype : APIPOSTResponse
         """
-        url = self._url_with_path(path)
+        return self._post(path, params, timeout, Deadline.of(deadline))
+
+    def _post(self, path, params, timeout=None, deadline=None):
         params.update(self._payload)
 
-        response = requests.post(url, params, verify=self.cert)
+        response = self._request('POST', path, timeout, deadline, data=params)
         return APIPOSTResponse(response, self)
 
     @requires('COD_OPERADOR')
-    def delete(self, path, params):
+    def delete(self, path, params, timeout=None, deadline=None):
         """
         :type path: str
         :param path: string with an API ENDPOINT
+        :param timeout: Ver `get`
+        :param deadline: Ver `get`
 
         :rtype : unirio.api.result.APIDELETEResponse
         """
-        url = self._url_with_path(path)
+        return self._delete(path, params, timeout, Deadline.of(deadline))
+
+    def _delete(self, path, params, timeout=None, deadline=None):
         payload = self._url_query_data(params)
         # contentURI = "%s?%s" % (url, payload)
 
         # gamb_payload = "&".join(["%s=%s" % (campo, payload[campo]) for campo in payload])
         # contentURI = "%s?%s" % (url,gamb_payload)
-        req = requests.delete(url, data=payload, verify=self.cert)
+        req = self._request('DELETE', path, timeout, deadline, data=payload)
         r = APIDELETEResponse(req, self)
 
         return r
 
     @requires('COD_OPERADOR')
-    def put(self, path, params):
+    def put(self, path, params, timeout=None, deadline=None):
         """
         :type path: str
         :param path: string with an API ENDPOINT
         :type params: dict
         :param params: dictionary with URL parameters
+        :param timeout: Ver `get`
+        :param deadline: Ver `get`
         :rtype APIPUTResponse
         """
-        url = self._url_with_path(path)
+        return self._put(path, params, timeout, Deadline.of(deadline))
+
+    def _put(self, path, params, timeout=None, deadline=None):
         params.update(self._payload)
 
         if not isinstance(params, dict):
             params = dict(params)  # todo: Fix para casos de CaseInsensitiveDict que não é serializable
 
-        response = requests.put(url, params, verify=self.cert)
+        response = self._request('PUT', path, timeout, deadline, data=params)
 
         return APIPUTResponse(response, self)
 
-    def call_procedure(self, name, data, fields=None, async=False, ws_group=None):
+    def _bulk(self, method, path, rows, params, max_workers, fail_fast, chunk_size, timeout=None, deadline=None):
+        """
+        Envia uma requisição por linha de `rows`, em paralelo, lendo `chunk_size` linhas por vez. COD_OPERADOR
+        é validado antes do envio de cada bloco: uma única vez caso esteja em `params` ou, caso contrário,
+        em cada linha. Assim, uma linha inválida impede o envio do bloco inteiro.
+
+        :type method: callable
+        :param method: _post, _put ou _delete
+        :rtype: APIBulkResponse
+        """
+        if chunk_size < 1:
+            raise ValueError('chunk_size must be at least 1.')
+        deadline = Deadline.of(deadline)
+        common = dict(params or {})
+        validate_rows = not any(k.lower() == 'cod_operador' for k in common)
+
+        def payload(row):
+            data = dict(common)
+            data.update(row)
+            if validate_rows:
+                _check_required(self, data, 'COD_OPERADOR')
+            return data
+
+        def call(data):
+            return lambda: method(path, data, timeout, deadline)
+
+        report = APIBulkResponse()
+        rows = iter(rows)
+        while True:
+            chunk = [payload(row) for row in islice(rows, chunk_size)]
+            if not chunk:
+                return report
+            report.extend(self._fan_out([call(data) for data in chunk], max_workers, fail_fast))
+
+    def post_many(self, path, rows, params=None, max_workers=None, fail_fast=False, chunk_size=1000, timeout=None,
+                  deadline=None):
+        """
+        Insere várias linhas em paralelo, uma requisição POST por linha. O tempo total passa a depender
+        da quantidade de requisições simultâneas, e não da quantidade de linhas.
+
+            report = api.post_many("ALUNOS", alunos, {"COD_OPERADOR": 1})
+            if not report.ok:
+                for index, error in report.errors:
+                    ...
+
+        :type path: str
+        :type rows: collections.Iterable[dict]
+        :param rows: Linhas a serem inseridas. Pode ser um gerador, lido `chunk_size` linhas por vez
+        :type params: dict
+        :param params: Parâmetros comuns a todas as linhas, como COD_OPERADOR
+        :type max_workers: int
+        :param max_workers: Quantidade de requisições simultâneas. Por padrão, o tamanho do pool de conexões
+        :type fail_fast: bool
+        :param fail_fast: Se True, a primeira exception é levantada e as linhas ainda não enviadas são descartadas
+        :type chunk_size: int
+        :param chunk_size: Quantidade de linhas lidas de `rows` e enviadas por vez
+        :param timeout: Timeout de cada requisição. Ver `get`
+        :param deadline: Tempo máximo, em segundos, de todas as requisições. As linhas que ainda não tiverem sido
+                         enviadas quando ele expirar falham com APITimeoutException
+        :rtype: APIBulkResponse
+        :return: Um APIPOSTResponse ou a exception levantada para cada linha, na ordem de `rows`
+        :raises MissingRequiredParameterException: Caso COD_OPERADOR não tenha sido informado
+        """
+        return self._bulk(self._post, path, rows, params, max_workers, fail_fast, chunk_size, timeout, deadline)
+
+    def put_many(self, path, rows, params=None, max_workers=None, fail_fast=False, chunk_size=1000, timeout=None,
+                 deadline=None):
+        """
+        Atualiza várias linhas em paralelo, uma requisição PUT por linha. Ver `post_many`
+
+        :rtype: APIBulkResponse
+        :return: Um APIPUTResponse ou a exception levantada para cada linha, na ordem de `rows`
+        """
+        return self._bulk(self._put, path, rows, params, max_workers, fail_fast, chunk_size, timeout, deadline)
+
+    def delete_many(self, path, rows, params=None, max_workers=None, fail_fast=False, chunk_size=1000, timeout=None,
+                    deadline=None):
+        """
+        Remove várias linhas em paralelo, uma requisição DELETE por linha. Ver `post_many`
+
+        :rtype: APIBulkResponse
+        :return: Um APIDELETEResponse ou a exception levantada para cada linha, na ordem de `rows`
+        """
+        return self._bulk(self._delete, path, rows, params, max_workers, fail_fast, chunk_size, timeout, deadline)
+
+    def call_procedure(self, name, data, fields=None, async=False, ws_group=None, chunk_size=None, chunk_bytes=None,
+                       max_workers=1, timeout=None, deadline=None):
         """
         :type fields: tuple or list
         :param fields: list with de desired return fields. Empty list or None will return all
@@ -280,15 +1053,116 @@ class UNIRIOAPIRequest(object):
         :type async: bool
         :param ws_group: The Websocket group that the async response should be posted
         :type ws_group: str
+        :type chunk_size: int
+        :param chunk_size: Quantidade máxima de linhas de `data` enviadas por requisição
+        :type chunk_bytes: int
+        :param chunk_bytes: Tamanho máximo aproximado, em bytes, das linhas de `data` serializadas em cada requisição.
+                            Uma linha maior que esse limite é enviada sozinha
+        :type max_workers: int
+        :param max_workers: Quantidade de blocos enviados simultaneamente. 1 envia os blocos em sequência
+        :param timeout: Timeout de cada requisição. Ver `get`. Procedures síncronas demoradas podem precisar de um
+                        timeout de leitura maior que o padrão
+        :param deadline: Tempo máximo, em segundos, de todos os blocos
+        :rtype: APIProcedureSyncResponse or APIProcedureChunkedResponse
+        :return: Sem chunk_size e chunk_bytes, um único APIProcedureSyncResponse. Caso contrário, um
+                 APIProcedureChunkedResponse com o conteúdo de todos os blocos (ou, se async, a lista das
+                 respostas de cada bloco)
+        :raises ProcedureException: Caso algum bloco falhe, com `chunk_index` e `chunk_offset` preenchidos.
+                                    Os blocos ainda não enviados são descartados
         """
-        url = self._url_with_path("procedure/" + name)
+        deadline = Deadline.of(deadline)
+        if not (chunk_size or chunk_bytes):
+            return self._call_procedure(name, data, fields, async, ws_group, timeout, deadline)
+        if isinstance(data, dict):
+            raise TypeError('data must be a list or tuple of rows to be split in chunks.')
+
+        failed = threading.Event()
+
+        def call(index, offset, chunk):
+            def run():
+                # Após uma falha, os blocos que ainda não começaram não são enviados
+                if failed.is_set():
+                    return None
+                try:
+                    return self._call_procedure(name, chunk, fields, async, ws_group, timeout, deadline)
+                except Exception as e:
+                    failed.set()
+                    if isinstance(e, APIException):
+                        e.chunk_index = index
+                        e.chunk_offset = offset
+                    raise
+            return run
+
+        calls = []
+        offset = 0
+        for index, chunk in enumerate(_split_chunks(data, chunk_size, chunk_bytes, self._json_size)):
+            calls.append(call(index, offset, chunk))
+            offset += len(chunk)
+
+        responses = self._fan_out(calls, max_workers, fail_fast=True)
+        if async:
+            return responses
+        return APIProcedureChunkedResponse(responses)
+
+    def _call_procedure(self, name, data, fields, async, ws_group, timeout=None, deadline=None):
         _data = dict(data=data,
                      async=async,
                      fields=fields or [],
                      **self._payload)
-        response = requests.post(url, json=_data, verify=self.cert)
+        response = self._request('POST', "procedure/" + name, timeout, deadline, **self._json_body(_data))
 
         if async:
             return APIProcedureAsyncResponse(response, self, ws_group)
 
         return APIProcedureSyncResponse(response, self)
+
+    def wait_procedures(self, procedures, timeout=None, poll_interval=1.0, return_when=ALL_COMPLETED):
+        """
+        Aguarda várias procedures assíncronas numa única thread, consultando periodicamente (e em paralelo,
+        através do pool de threads) somente as que ainda estão em execução. Mesma interface de
+        `concurrent.futures.wait`.
+
+            submissions = [api.call_procedure(name, data, async=True) for data in datasets]
+            done, not_done = api.wait_procedures(submissions, timeout=600)
+
+        :type procedures: list[APIProcedureAsyncResponse]
+        :type timeout: float
+        :param timeout: Tempo máximo de espera, em segundos. None aguarda indefinidamente
+        :type poll_interval: float
+        :param poll_interval: Intervalo entre consultas, caso o servidor não informe Retry-After
+        :type return_when: str
+        :param return_when: ALL_COMPLETED, FIRST_COMPLETED ou FIRST_EXCEPTION, de `concurrent.futures`. Somente as
+                            respostas de erro da API encerram uma procedure com exception; falhas de conexão e
+                            timeouts de uma consulta a mantêm pendente
+        :rtype: tuple
+        :return: Tupla (done, not_done) de sets de APIProcedureAsyncResponse
+        """
+        deadline = time.time() + timeout if timeout is not None else None
+        procedures = set(procedures)
+        while True:
+            pending = [p for p in procedures if not p.done()]
+            for procedure, error in zip(pending, self._fan_out([p.poll for p in pending])):
+                if isinstance(error, _TRANSIENT_POLL_ERRORS):
+                    # A procedure continua em execução no servidor e é consultada novamente no próximo ciclo. Com
+                    # retry_policy, a consulta já foi repetida antes de chegar aqui
+                    logging.warning('Falha ao consultar a procedure %s: %r', procedure.id, error)
+                elif isinstance(error, Exception):
+                    procedure._set_exception(error)
+
+            done = set(p for p in procedures if p.done())
+            not_done = procedures - done
+            if not not_done:
+                break
+            if return_when == FIRST_COMPLETED and done:
+                break
+            if return_when == FIRST_EXCEPTION and any(p._exception is not None for p in done):
+                break
+
+            interval = min(p.next_poll_interval(poll_interval) for p in not_done)
+            if deadline is not None:
+                remaining = deadline - time.time()
+                if remaining <= 0:
+                    break
+                interval = min(interval, remaining)
+            time.sleep(interval)
+        return done, not_done
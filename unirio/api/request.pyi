@@ -1,6 +1,20 @@
 from enum import Enum
-from .result import APIResultObject, APIPOSTResponse, APIPUTResponse, APIDELETEResponse, APIProcedureResponse
-from typing import Dict, Any, Iterable
+from .result import APIResultObject, APIPOSTResponse, APIPUTResponse, APIDELETEResponse, APIProcedureResponse, \
+    APIBulkResponse, APIProcedureAsyncResponse
+from .streaming import APIStreamingResultObject
+from .rows import CompactRow
+from .columns import ColumnarResult
+from .jsoncodec import JSONCodec
+from .ratelimit import RateLimiter
+from .retry import RetryPolicy
+from .circuitbreaker import CircuitBreaker
+from .deadline import Deadline
+from .instrumentation import Instrumentation
+from typing import Dict, Any, Iterable, Iterator, List, Set, Tuple, Union
+from requests.structures import CaseInsensitiveDict
+
+TimeoutType = Union[float, Tuple[float, float]]
+DeadlineType = Union[float, Deadline]
 
 
 class APIServer(Enum):
@@ -9,20 +23,93 @@ class APIServer(Enum):
 
 
 class UNIRIOAPIRequest(object):
-    def __init__(self, api_key: str, server: APIServer, debug: bool, cache=None):
+    def __init__(self, api_key: str, server: APIServer, debug: bool, cache=None, cert: bool=False,
+                 pool_connections: int=10, pool_maxsize: int=10, pool_block: bool=False,
+                 keep_alive: bool=True, single_flight: bool=False, no_content_cache_time: int=0,
+                 json_codec: Union[str, JSONCodec]=None, rate_limiter: RateLimiter=None,
+                 path_rate_limiters: Dict[str, RateLimiter]=None, retry_policy: RetryPolicy=None,
+                 circuit_breaker: CircuitBreaker=None, timeout: TimeoutType=(10, 120),
+                 instrumentation: Union[Instrumentation, List[Instrumentation]]=None):
+        pass
+
+    def __enter__(self) -> 'UNIRIOAPIRequest':
+        pass
+
+    def __exit__(self, exc_type, exc_val, exc_tb) -> None:
+        pass
+
+    def close(self) -> None:
+        pass
+
+    def get(self, path: str, params: Dict[str:Any]=None, fields: list=None, cache_time: int=0,
+            bypass_no_content_exception: bool=False, no_content_cache_time: int=None, compact: bool=False,
+            columnar: bool=False, timeout: TimeoutType=None,
+            deadline: DeadlineType=None) -> Union[APIResultObject, ColumnarResult]:
+        pass
+
+    def get_single_result(self, path: str, params: Dict[str:Any]=None, fields: list=None, cache_time: int=0,
+                          bypass_no_content_exception: bool=False, no_content_cache_time: int=None,
+                          compact: bool=False, timeout: TimeoutType=None,
+                          deadline: DeadlineType=None) -> Union[CaseInsensitiveDict, CompactRow, None]:
+        pass
+
+    def get_stream(self, path: str, params: Dict[str:Any]=None, fields: list=None, compact: bool=False,
+                   chunk_size: int=65536,
+                   timeout: TimeoutType=None, deadline: DeadlineType=None) -> APIStreamingResultObject:
+        pass
+
+    def iter_pages(self, path: str, params: Dict[str:Any]=None, fields: list=None, page_size: int=1000,
+                   cache_time: int=0, prefetch: int=0,
+                   prefetch_max_bytes: int=None, compact: bool=False,
+                   timeout: TimeoutType=None, deadline: DeadlineType=None) -> Iterator[APIResultObject]:
+        pass
+
+    def iter_all(self, path: str, params: Dict[str:Any]=None, fields: list=None, page_size: int=1000,
+                 cache_time: int=0, prefetch: int=0,
+                 prefetch_max_bytes: int=None, compact: bool=False,
+                 timeout: TimeoutType=None,
+                 deadline: DeadlineType=None) -> Iterator[Union[CaseInsensitiveDict, CompactRow]]:
+        pass
+
+    def get_many(self, queries: Iterable[Tuple], max_workers: int=None, fail_fast: bool=False, cache_time: int=0,
+                 bypass_no_content_exception: bool=False,
+                 timeout: TimeoutType=None, deadline: DeadlineType=None) -> List[Union[APIResultObject, Exception]]:
+        pass
+
+    def post(self, path: str, params: Dict[str:Any],
+             timeout: TimeoutType=None, deadline: DeadlineType=None) -> APIPOSTResponse:
+        pass
+
+    def delete(self, path: str, params: Dict[str:int],
+               timeout: TimeoutType=None, deadline: DeadlineType=None) -> APIDELETEResponse:
+        pass
+
+    def put(self, path: str, params: Dict[str:Any],
+            timeout: TimeoutType=None, deadline: DeadlineType=None) -> APIPUTResponse:
         pass
 
-    def get(self, path: str, params: Dict[str:Any]=None, fields: list=None, cache_time: int=0) -> APIResultObject:
+    def post_many(self, path: str, rows: Iterable[Dict[str:Any]], params: Dict[str:Any]=None, max_workers: int=None,
+                  fail_fast: bool=False, chunk_size: int=1000,
+                  timeout: TimeoutType=None, deadline: DeadlineType=None) -> APIBulkResponse:
         pass
 
-    def post(self, path: str, params: Dict[str:Any]) -> APIPOSTResponse:
+    def put_many(self, path: str, rows: Iterable[Dict[str:Any]], params: Dict[str:Any]=None, max_workers: int=None,
+                 fail_fast: bool=False, chunk_size: int=1000,
+                 timeout: TimeoutType=None, deadline: DeadlineType=None) -> APIBulkResponse:
         pass
 
-    def delete(self, path: str, params: Dict[str:int]) -> APIDELETEResponse:
+    def delete_many(self, path: str, rows: Iterable[Dict[str:Any]], params: Dict[str:Any]=None,
+                    max_workers: int=None, fail_fast: bool=False, chunk_size: int=1000,
+                    timeout: TimeoutType=None, deadline: DeadlineType=None) -> APIBulkResponse:
         pass
 
-    def put(self, path: str, params: Dict[str:Any]) -> APIPUTResponse:
+    def call_procedure(self, name: str, data: Iterable[Dict[str:Any]], fields: list=None, async: bool=False, ws_group: str=None,
+                       chunk_size: int=None, chunk_bytes: int=None, max_workers: int=1,
+                       timeout: TimeoutType=None, deadline: DeadlineType=None) -> APIProcedureResponse:
         pass
 
-    def call_procedure(self, name: str, data: Iterable[Dict[str:Any]], fields: list=None, async: bool=False, ws_group: str=None) -> APIProcedureResponse:
+    def wait_procedures(self, procedures: Iterable[APIProcedureAsyncResponse], timeout: float=None,
+                        poll_interval: float=1.0,
+                        return_when: str='ALL_COMPLETED') -> Tuple[Set[APIProcedureAsyncResponse],
+                                                                    Set[APIProcedureAsyncResponse]]:
         pass
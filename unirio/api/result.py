@@ -5,15 +5,27 @@ except ImportError:
     import http.client as http
 from .exceptions import *
 import json
-from collections import Iterable, Sized
+import logging
+import time
+from collections import Iterable, Sized, Mapping
+from concurrent.futures import TimeoutError
+from requests.exceptions import RequestException
 from requests.structures import CaseInsensitiveDict
+from .rows import compact_rows
+from .columns import ColumnarResult
+from .jsoncodec import case_insensitive as to_case_insensitive
+from .instrumentation import _timer
 
 
 __all__ = ('APIResponse', 'APIResultObject', 'APIDELETEResponse', 'APIPOSTResponse', 'APIPUTResponse',
-           'APIProcedureSyncResponse', 'APIProcedureAsyncResponse')
+           'APIProcedureSyncResponse', 'APIProcedureAsyncResponse', 'APIBulkResponse',
+           'APIProcedureChunkedResponse', 'APIProcedureStatusResponse')
 
 
 class APIResponse(object):
+    # Tempo, em segundos, gasto decodificando o JSON do corpo da resposta
+    decode_time = 0.0
+
     def __init__(self, response, request):
         """
         :type response: requests.models.Response
@@ -22,7 +34,7 @@ class APIResponse(object):
         self.response = response
         self.request = request
         # TODO Como diferir dois casos de bad request ?
-        if http.OK == self.response.status_code:
+        if self.response.status_code in (http.OK, http.NOT_MODIFIED):
             pass
         elif http.BAD_REQUEST == self.response.status_code and self.response.headers.get('InvalidParameters', False):
             raise InvalidParametersException(self.response, json.loads(self.response.headers['InvalidParameters']))
@@ -40,40 +52,139 @@ class APIResponse(object):
             except KeyError:
                 pass
 
+    def _json(self, case_insensitive=True):
+        """
+        Decodifica o corpo da resposta com o codec JSON do cliente (`json_codec`) ou, caso não haja um, com o
+        json da biblioteca padrão através de `requests`.
+
+        :type case_insensitive: bool
+        :param case_insensitive: Se True, os dicionários do documento são CaseInsensitiveDict
+        :raises ValueError: Caso o corpo não seja um JSON válido
+        """
+        start = _timer()
+        try:
+            return self._decode(case_insensitive)
+        finally:
+            self.decode_time += _timer() - start
+
+    def _decode(self, case_insensitive):
+        codec = getattr(self.request, 'json_codec', None)
+        if codec is None:
+            return self.response.json(object_hook=CaseInsensitiveDict) if case_insensitive else self.response.json()
+        if not case_insensitive:
+            return codec.loads(self.response.content)
+        if hasattr(codec, 'loads_case_insensitive'):
+            return codec.loads_case_insensitive(self.response.content)
+        return to_case_insensitive(codec.loads(self.response.content))
+
+
+def _replace_params(params, **values):
+    """
+    Retorna uma cópia de `params` com as chaves de `values` substituídas. Como a API não diferencia
+    maiúsculas de minúsculas, qualquer variação de caixa de uma chave existente é descartada.
+
+    :type params: dict
+    :rtype: dict
+    """
+    replaced = tuple(k.lower() for k in values)
+    new_params = {k: v for k, v in (params or {}).items() if k.lower() not in replaced}
+    new_params.update(values)
+    return new_params
+
 
 class APIResultObject(APIResponse, Iterable, Sized):
     lmin = 0
     lmax = 0
     content = []
+    path = None
+    params = None
+    etag = None
+    last_modified = None
 
-    def __init__(self, response, request):
+    def __init__(self, response, request, cached=None, compact=False):
         """
             :type r: Response
             :type self.content: list
             :type self.lmin: int
             :type self.lmax: int
             :type self.count: int
+            :type cached: APIResultObject
+            :param cached: Resultado armazenado em cache, revalidado através de uma requisição condicional.
+                           Caso o servidor responda 304 (Not Modified), seu conteúdo é reaproveitado
+            :type compact: bool
+            :param compact: Se True, as linhas de content são CompactRow ao invés de CaseInsensitiveDict
             :raises APIException, ValueError:
             """
         super(APIResultObject, self).__init__(response, request)
-        if http.OK == self.response.status_code:
+        self.etag = self.response.headers.get('ETag')
+        self.last_modified = self.response.headers.get('Last-Modified')
+        if http.NOT_MODIFIED == self.response.status_code:
+            if cached is None:
+                raise UnhandledAPIException(self.response, "Resposta 304 sem um resultado em cache")
+            self.content = cached.content
+            self.fields = cached.fields
+            self.lmin = cached.lmin
+            self.lmax = cached.lmax
+            self.etag = self.etag or cached.etag
+            self.last_modified = self.last_modified or cached.last_modified
+        elif http.OK == self.response.status_code:
             try:
-                json = self.response.json(object_hook=CaseInsensitiveDict)
-                self.content = json["content"]
+                json = self._json(case_insensitive=not compact)
+                self.content = compact_rows(json["content"]) if compact else json["content"]
                 self.fields = tuple(k for k in self.content[0].keys())
                 self.lmin = json["subset"][0]
                 self.lmax = json["subset"][1]
             except ValueError:
                 raise NoContentException(self.response)
 
+    @property
+    def validators(self):
+        """
+        Cabeçalhos de uma requisição condicional que revalida este resultado
+
+        :rtype: dict
+        """
+        headers = {}
+        if self.etag:
+            headers['If-None-Match'] = self.etag
+        if self.last_modified:
+            headers['If-Modified-Since'] = self.last_modified
+        return headers
+
     def next_request_for_result(self):
         """
         Um subset de um resultado (lmin->lmax) pode conter somente
         uma parte do total de resultados (count). Este método retornará
-        os parâmetros a serem utilizados pelo próximo UNIRIOAPI.performRequest
+        os parâmetros a serem utilizados pelo próximo UNIRIOAPIRequest.get, com
+        uma janela de mesmo tamanho logo após a atual. Caso o subset atual não
+        tenha sido preenchido, não há próxima página e o retorno é None.
+
+        :rtype: dict or None
+        """
+        page_size = self.lmax - self.lmin
+        if page_size <= 0 or len(self.content) < page_size:
+            return None
+        return _replace_params(self.params, LMIN=self.lmax, LMAX=self.lmax + page_size)
 
+    def __getstate__(self):
         """
-        pass
+        Ao serializar (ex: cache em disco), somente o conteúdo decodificado e os metadados do subset são
+        mantidos. A resposta HTTP e o cliente que a originou não fazem parte do estado serializado.
+        """
+        state = self.__dict__.copy()
+        state['response'] = None
+        state['request'] = None
+        return state
+
+    def to_columns(self, use_numpy=None):
+        """
+        Converte o resultado em colunas tipadas, uma por campo. Ver `unirio.api.columns.to_columns`
+
+        :type use_numpy: bool
+        :param use_numpy: Se True, as colunas são arrays NumPy. None utiliza NumPy somente se estiver instalado
+        :rtype: unirio.api.columns.ColumnarResult
+        """
+        return ColumnarResult.from_result(self, use_numpy)
 
     def first(self):
         """
@@ -108,7 +219,7 @@ class APIPOSTResponse(APIResponse):
             self.request = request
             self.insertId = self.response.headers['id']
             if self.request.debug:
-                print("Inseriu em %s com a ID %s" % (self.response.headers['Location'], self.insertId))
+                logging.debug("Inseriu em %s com a ID %s", self.response.headers['Location'], self.insertId)
         else:
             errors = {
                 http.NOT_FOUND:     ContentNotCreatedException(self.response),  # TODO api retornando status code errado para esse caso
@@ -121,31 +232,224 @@ class APIPOSTResponse(APIResponse):
 
 
 class APIProcedureResponse(APIResponse):
+    expected_status = (http.CREATED,)
+
     def __init__(self, response, request):
         super(APIProcedureResponse, self).__init__(response, request)
         if http.BAD_REQUEST == response.status_code:
             raise MissingRequiredFieldsException(self.response, self.response.text)
-        elif not http.CREATED == response.status_code:
+        elif response.status_code not in self.expected_status:
             raise NotImplementedError("Esse erro era desconhecido. Analise o motivo e a necessidade de novo tipo de exception")
 
 
 class APIProcedureSyncResponse(APIProcedureResponse):
     def __init__(self, response, request):
         super(APIProcedureSyncResponse, self).__init__(response, request)
-        self.content = self.response.json(object_hook=CaseInsensitiveDict)
+        self.content = self._json()
 
     def __eq__(self, other):
         return self.content == other.content
 
 
+class APIProcedureChunkedResponse(APIProcedureSyncResponse):
+    def __init__(self, responses):
+        """
+        Resultado de uma procedure cujo dataset foi enviado em vários blocos. Caso cada bloco retorne uma lista,
+        `content` é a concatenação dessas listas; caso contrário, é a lista dos conteúdos de cada bloco, na ordem
+        em que os blocos foram montados.
+
+        :type responses: list[APIProcedureSyncResponse]
+        """
+        self.responses = responses
+        self.response = responses[-1].response if responses else None
+        self.request = responses[-1].request if responses else None
+        if all(isinstance(r.content, list) for r in responses):
+            self.content = [row for r in responses for row in r.content]
+        else:
+            self.content = [r.content for r in responses]
+
+
+def _retry_after(response):
+    """
+    :rtype: float or None
+    :return: O intervalo, em segundos, do cabeçalho Retry-After
+    """
+    try:
+        return float(response.headers['Retry-After'])
+    except (KeyError, TypeError, ValueError):
+        return None
+
+
+class APIProcedureStatusResponse(APIResponse):
+    def __init__(self, response, request):
+        """
+        Estado de uma procedure assíncrona, obtido através de um GET na URL do cabeçalho Location da submissão.
+        202 (Accepted) indica que a procedure ainda está em execução; 200 ou 201, que terminou e o corpo é o seu
+        resultado; 400, que os datasets aceitos não possuíam os campos necessários.
+
+        :raises APIException:
+        """
+        super(APIProcedureStatusResponse, self).__init__(response, request)
+        self.pending = http.ACCEPTED == response.status_code
+        self.retry_after = _retry_after(response)
+        self.content = None
+        if self.pending:
+            return
+        if http.BAD_REQUEST == response.status_code:
+            raise MissingRequiredFieldsException(self.response, self.response.text)
+        if response.status_code not in (http.OK, http.CREATED):
+            raise UnhandledAPIException(self.response)
+        if self.response.content:
+            self.content = self._json()
+
+
+# Falhas ao consultar o estado de uma procedure que não dizem nada sobre a execução, que continua no servidor:
+# erros de conexão, timeouts (APITimeoutException é um RequestException) e circuito aberto
+_TRANSIENT_POLL_ERRORS = (RequestException, CircuitOpenException)
+
+
 class APIProcedureAsyncResponse(APIProcedureResponse):
+    expected_status = (http.CREATED, http.ACCEPTED)
+    poll_interval = 1.0
+
     def __init__(self, response, request, ws_group):
+        """
+        Submissão de uma procedure assíncrona. O corpo da resposta informa quais datasets foram aceitos e quais
+        foram recusados; os aceitos são executados pelo servidor, que notifica `ws_group` ao terminar.
+
+        O objeto também funciona como um future: caso o servidor informe uma URL de acompanhamento (cabeçalho
+        Location), `poll()` consulta o estado da execução uma vez, `result()` aguarda o término e `await`
+        (com AsyncUNIRIOAPIRequest) aguarda sem bloquear o event loop. Para aguardar várias submissões sem uma
+        thread por procedure, utilize `UNIRIOAPIRequest.wait_procedures`.
+
+        O protocolo de acompanhamento (202 com Location na submissão; GET no Location respondendo 202 enquanto a
+        procedure executa e 200/201 com o resultado ao terminar) é uma suposição sobre a API, verificada somente
+        contra o servidor simulado dos testes (tests/server.py).
+
+        :type ws_group: str
+        :raises MissingRequiredFieldsException:
+        """
         super(APIProcedureAsyncResponse, self).__init__(response, request)
         self.ws_group = ws_group
-        json = self.response.json()
-        self.accepted = []
-        self.refused = []
-        raise NotImplementedError
+        json = self._json() if self.response.content else {}
+        if not isinstance(json, Mapping):
+            json = {'accepted': json}
+        self.accepted = json.get('accepted') or []
+        self.refused = json.get('refused') or []
+        self.id = json.get('id') or self.response.headers.get('id')
+        self.location = self.response.headers.get('Location') or json.get('location')
+        self.retry_after = _retry_after(self.response)
+        self.content = None
+        self._exception = None
+        self._done = False
+        if self.refused and not self.accepted:
+            self._set_exception(MissingRequiredFieldsException(self.response, "Todos os datasets foram recusados",
+                                                               self.refused))
+
+    def _set_result(self, content):
+        self.content = content
+        self._done = True
+
+    def _set_exception(self, exception):
+        self._exception = exception
+        self._done = True
+
+    def _update(self, status):
+        """
+        :type status: APIProcedureStatusResponse or Exception
+        """
+        if isinstance(status, Exception):
+            self._set_exception(status)
+        elif status.pending:
+            self.retry_after = status.retry_after
+        else:
+            self._set_result(status.content)
+
+    def _check_pollable(self):
+        if not self.location:
+            raise ProcedureException(self.response, "A submissão não possui uma URL de acompanhamento (Location). "
+                                                    "O resultado será enviado somente para o ws_group")
+
+    def done(self):
+        """
+        Estado local da execução, sem consultar o servidor. Ver `poll`
+
+        :rtype: bool
+        """
+        return self._done
+
+    def poll(self):
+        """
+        Consulta, uma vez, o estado da execução no servidor
+
+        :rtype: bool
+        :return: True caso a procedure tenha terminado
+        :raises ProcedureException: Caso o servidor não tenha informado uma URL de acompanhamento
+        :raises requests.exceptions.RequestException: Caso a consulta falhe por um erro de conexão ou timeout. A
+                                                      procedure continua pendente e pode ser consultada novamente
+        """
+        if self._done:
+            return True
+        if getattr(self.request, 'is_async', False):
+            raise TypeError("Submissões de AsyncUNIRIOAPIRequest devem ser aguardadas com await")
+        self._check_pollable()
+        try:
+            response = self.request._request('GET', self.location, params=self.request._payload)
+            status = APIProcedureStatusResponse(response, self.request)
+        except _TRANSIENT_POLL_ERRORS:
+            raise
+        except APIException as e:
+            status = e
+        self._update(status)
+        return self._done
+
+    def next_poll_interval(self, poll_interval=None):
+        """
+        :rtype: float
+        :return: O intervalo até a próxima consulta: o Retry-After do servidor, caso informado
+        """
+        if self.retry_after is not None:
+            return self.retry_after
+        return poll_interval if poll_interval is not None else self.poll_interval
+
+    def result(self, timeout=None, poll_interval=None):
+        """
+        Aguarda o término da procedure, consultando o servidor periodicamente
+
+        :type timeout: float
+        :param timeout: Tempo máximo de espera, em segundos. None aguarda indefinidamente
+        :type poll_interval: float
+        :param poll_interval: Intervalo entre consultas, caso o servidor não informe Retry-After
+        :return: O resultado da procedure
+        :raises concurrent.futures.TimeoutError: Caso a procedure não termine dentro de `timeout`
+        :raises APIException: A exception da execução da procedure
+        """
+        deadline = time.time() + timeout if timeout is not None else None
+        while not self.poll():
+            interval = self.next_poll_interval(poll_interval)
+            if deadline is not None:
+                remaining = deadline - time.time()
+                if remaining <= 0:
+                    raise TimeoutError()
+                interval = min(interval, remaining)
+            time.sleep(interval)
+        if self._exception is not None:
+            raise self._exception
+        return self.content
+
+    def exception(self, timeout=None, poll_interval=None):
+        """
+        :return: A exception da execução da procedure, ou None caso tenha terminado com sucesso
+        """
+        try:
+            self.result(timeout, poll_interval)
+        except APIException as e:
+            return e
+        return None
+
+    def __await__(self):
+        from .aio import wait_procedure
+        return wait_procedure(self).__await__()
 
 
 class APIPUTResponse(APIResponse):
@@ -187,3 +491,53 @@ class APIDELETEResponse(APIResponse):
                 http.BAD_REQUEST:   MissingPrimaryKeyException(self.response)
             }
             raise errors[self.response.status_code]
+
+
+class APIBulkResponse(Iterable, Sized):
+    def __init__(self, responses=None):
+        """
+        Resultado agregado de post_many, put_many e delete_many: uma resposta (ou a exception levantada)
+        por linha, na ordem em que as linhas foram enviadas
+
+        :type responses: list
+        """
+        self.responses = list(responses or [])
+
+    def extend(self, responses):
+        self.responses.extend(responses)
+
+    @property
+    def succeeded(self):
+        """
+        :rtype: list
+        :return: As respostas das linhas enviadas com sucesso
+        """
+        return [r for r in self.responses if not isinstance(r, Exception)]
+
+    @property
+    def errors(self):
+        """
+        :rtype: list
+        :return: Lista de tuplas (índice da linha, exception) das linhas que falharam
+        """
+        return [(i, r) for i, r in enumerate(self.responses) if isinstance(r, Exception)]
+
+    @property
+    def ok(self):
+        """
+        :rtype: bool
+        :return: True caso todas as linhas tenham sido enviadas com sucesso
+        """
+        return not any(isinstance(r, Exception) for r in self.responses)
+
+    def __iter__(self):
+        return iter(self.responses)
+
+    def __getitem__(self, item):
+        return self.responses[item]
+
+    def __len__(self):
+        return len(self.responses)
+
+    def __repr__(self):
+        return '<%s: %d ok, %d errors>' % (self.__class__.__name__, len(self.succeeded), len(self.errors))
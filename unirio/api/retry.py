@@ -0,0 +1,157 @@
+# -*- coding: utf-8 -*-
+import random
+import threading
+import time
+
+from requests.exceptions import ConnectionError, Timeout
+from .exceptions import APITimeoutException
+from .ratelimit import _clock
+
+
+__all__ = ('RetryPolicy',)
+
+
+class RetryPolicy(object):
+    def __init__(self, max_attempts=3, backoff=0.1, multiplier=2.0, max_backoff=5.0, jitter=True,
+                 status_codes=(500, 502, 503, 504), exceptions=(ConnectionError, Timeout), methods=('GET',),
+                 deadline=None, max_retry_after=30.0):
+        """
+        Política de novas tentativas com backoff exponencial para falhas transitórias: erros de conexão, timeouts
+        e respostas com `status_codes`. Por padrão, somente GETs são repetidos; PUT e DELETE, também idempotentes,
+        precisam ser incluídos explicitamente em `methods`.
+
+        Uma mesma instância pode ser compartilhada por várias threads e clientes; os contadores de `stats`
+        somam todas as chamadas.
+
+        :type max_attempts: int
+        :param max_attempts: Quantidade máxima de tentativas, incluindo a primeira
+        :type backoff: float
+        :param backoff: Espera, em segundos, antes da segunda tentativa. Multiplicada por `multiplier` a cada nova
+                        tentativa, até `max_backoff`
+        :type jitter: bool
+        :param jitter: Se True, a espera é um valor aleatório entre 0 e o backoff calculado ("full jitter"), para
+                       que clientes que falharam juntos não tentem novamente ao mesmo tempo
+        :type status_codes: tuple
+        :param status_codes: Códigos HTTP repetidos
+        :type exceptions: tuple
+        :param exceptions: Exceptions repetidas
+        :type methods: tuple
+        :param methods: Verbos HTTP repetidos. Ex: ('GET', 'PUT', 'DELETE')
+        :type deadline: float
+        :param deadline: Tempo máximo, em segundos, somando todas as tentativas e esperas. Uma nova tentativa não é
+                         feita caso a espera ultrapasse esse tempo. None não impõe limite
+        :type max_retry_after: float
+        :param max_retry_after: Espera máxima, em segundos, respeitada para um cabeçalho Retry-After, para que um
+                                valor como 3600 não bloqueie quem chamou por uma hora
+        """
+        if max_attempts < 1:
+            raise ValueError('max_attempts must be at least 1.')
+        self.max_attempts = max_attempts
+        self.backoff = backoff
+        self.multiplier = multiplier
+        self.max_backoff = max_backoff
+        self.jitter = jitter
+        self.status_codes = frozenset(status_codes)
+        self.exceptions = tuple(exceptions)
+        self.methods = frozenset(m.upper() for m in methods)
+        self.deadline = deadline
+        self.max_retry_after = max_retry_after
+        self.calls = 0
+        self.retries = 0
+        self.recovered = 0
+        self.exhausted = 0
+        self._stats_lock = threading.Lock()
+
+    def allows(self, method):
+        """
+        :type method: str
+        :rtype: bool
+        """
+        return method.upper() in self.methods
+
+    def delay(self, attempt, response=None):
+        """
+        :type attempt: int
+        :param attempt: Número da tentativa que falhou, a partir de 1
+        :type response: requests.models.Response
+        :param response: Resposta da tentativa que falhou. Um cabeçalho Retry-After, limitado a `max_retry_after`, tem
+                         precedência sobre o backoff
+        :rtype: float
+        :return: Espera, em segundos, até a próxima tentativa
+        """
+        if response is not None:
+            try:
+                return min(self.max_retry_after, max(0.0, float(response.headers['Retry-After'])))
+            except (KeyError, TypeError, ValueError):
+                pass
+        delay = min(self.max_backoff, self.backoff * self.multiplier ** (attempt - 1))
+        return random.uniform(0, delay) if self.jitter else delay
+
+    def _count(self, **amounts):
+        with self._stats_lock:
+            for counter, amount in amounts.items():
+                setattr(self, counter, getattr(self, counter) + amount)
+
+    def call(self, fn, deadline=None):
+        """
+        Executa `fn` até que ela retorne uma resposta que não deva ser repetida, levante uma exception que não deva
+        ser repetida, ou as tentativas se esgotem. Nesse último caso, a última resposta é retornada (ou a última
+        exception é levantada), para que seja tratada normalmente. Caso o deadline impeça uma nova tentativa,
+        APITimeoutException é levantada, com a última resposta em `response` e a última exception em `__cause__`.
+
+        :type fn: callable
+        :param fn: Callable sem argumentos que retorna um requests.models.Response
+        :type deadline: float
+        :param deadline: Instante (time.monotonic) limite para novas tentativas, além de `self.deadline`
+        :rtype: requests.models.Response
+        :raises APITimeoutException: Caso o deadline expire antes que uma nova tentativa possa ser feita
+        """
+        start = _clock()
+        if self.deadline is not None:
+            deadline = min(deadline, start + self.deadline) if deadline is not None else start + self.deadline
+        self._count(calls=1)
+        attempt = 0
+        while True:
+            attempt += 1
+            response = None
+            try:
+                response = fn()
+            except self.exceptions as e:
+                error = e
+            else:
+                if response.status_code not in self.status_codes:
+                    if attempt > 1:
+                        self._count(recovered=1)
+                    return response
+                error = None
+
+            delay = self.delay(attempt, response)
+            if attempt >= self.max_attempts:
+                self._count(exhausted=1)
+                if error is not None:
+                    raise error
+                return response
+            if deadline is not None and _clock() + delay >= deadline:
+                self._count(exhausted=1)
+                timeout = APITimeoutException(response if response is not None else getattr(error, 'response', None),
+                                              'Deadline exceeded after %d attempts' % attempt)
+                # Equivalente a "raise timeout from error", que não existe no Python 2
+                timeout.__cause__ = error
+                raise timeout
+
+            if response is not None:
+                # Libera a conexão para o pool antes de aguardar
+                response.close()
+            self._count(retries=1)
+            time.sleep(delay)
+
+    @property
+    def stats(self):
+        """
+        :rtype: dict
+        :return: `calls` é a quantidade de chamadas, `retries` a de novas tentativas, `recovered` a de chamadas que
+                 tiveram sucesso após alguma nova tentativa e `exhausted` a das que falharam mesmo após todas elas
+        """
+        with self._stats_lock:
+            return {'calls': self.calls, 'retries': self.retries, 'recovered': self.recovered,
+                    'exhausted': self.exhausted}
@@ -0,0 +1,105 @@
+# -*- coding: utf-8 -*-
+from collections import Mapping
+
+
+__all__ = ('FieldIndex', 'CompactRow', 'compact_rows')
+
+
+class FieldIndex(object):
+    __slots__ = ('fields', '_positions')
+
+    def __init__(self, fields):
+        """
+        Índice, compartilhado por todas as linhas de um resultado, que associa o nome de cada campo
+        (sem diferenciar maiúsculas de minúsculas) à sua posição na linha
+
+        :type fields: tuple
+        """
+        self.fields = tuple(fields)
+        self._positions = {field.lower(): i for i, field in enumerate(self.fields)}
+
+    def position(self, field):
+        """
+        :type field: str
+        :rtype: int
+        :raises KeyError
+        """
+        return self._positions[field.lower()]
+
+    def __contains__(self, field):
+        return field.lower() in self._positions
+
+    def __len__(self):
+        return len(self.fields)
+
+    def __getstate__(self):
+        return self.fields
+
+    def __setstate__(self, state):
+        self.__init__(state)
+
+
+class CompactRow(Mapping):
+    __slots__ = ('_index', '_values')
+
+    def __init__(self, index, values):
+        """
+        Linha somente leitura de um resultado, armazenada como uma tupla de valores. A busca por campo não
+        diferencia maiúsculas de minúsculas, como em CaseInsensitiveDict, mas o mapeamento de nomes para
+        posições é único para todo o resultado.
+
+        :type index: FieldIndex
+        :type values: tuple
+        """
+        self._index = index
+        self._values = values
+
+    def __getitem__(self, field):
+        try:
+            return self._values[self._index.position(field)]
+        except KeyError:
+            raise KeyError(field)
+
+    def __contains__(self, field):
+        return field in self._index
+
+    def __iter__(self):
+        return iter(self._index.fields)
+
+    def __len__(self):
+        return len(self._values)
+
+    def __eq__(self, other):
+        if isinstance(other, Mapping):
+            return dict((k.lower(), v) for k, v in self.items()) == dict((k.lower(), v) for k, v in other.items())
+        return NotImplemented
+
+    def __ne__(self, other):
+        equal = self.__eq__(other)
+        return equal if equal is NotImplemented else not equal
+
+    __hash__ = None
+
+    def __repr__(self):
+        return '%s(%r)' % (self.__class__.__name__, dict(self.items()))
+
+    def __getstate__(self):
+        return self._index, self._values
+
+    def __setstate__(self, state):
+        self._index, self._values = state
+
+
+def compact_rows(rows):
+    """
+    Converte uma lista de dicionários, com os mesmos campos, numa lista de CompactRow que compartilham o mesmo
+    FieldIndex. Os campos são os da primeira linha; campos ausentes nas demais linhas ficam com valor None.
+
+    :type rows: list
+    :rtype: list
+    """
+    if not rows:
+        return []
+    index = FieldIndex(rows[0].keys())
+    fields = index.fields
+    return [CompactRow(index, tuple(row.get(field) for field in fields)) for row in rows]
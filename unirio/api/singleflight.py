@@ -0,0 +1,109 @@
+# -*- coding: utf-8 -*-
+import threading
+
+from .exceptions import APITimeoutException
+
+
+__all__ = ('SingleFlight',)
+
+
+class _Call(object):
+    def __init__(self):
+        self.event = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight(object):
+    def __init__(self):
+        """
+        Agrupa chamadas simultâneas com a mesma chave: enquanto uma chamada está em andamento, as demais
+        aguardam e recebem o mesmo retorno (ou a mesma exception), ao invés de repetir o trabalho.
+        """
+        self.executed = 0
+        self.shared = 0
+        self._calls = {}
+        self._lock = threading.Lock()
+
+    def do(self, key, fn, timeout=None):
+        """
+        :type key: str
+        :type fn: callable
+        :param fn: Callable sem argumentos, executado somente se não houver outra chamada em andamento para `key`
+        :type timeout: float
+        :param timeout: Tempo máximo, em segundos, de espera por uma chamada já em andamento. None aguarda
+                        indefinidamente
+        :return: O retorno de `fn`, da chamada atual ou da que já estava em andamento
+        :raises APITimeoutException: Caso a chamada em andamento não termine dentro de `timeout`
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+            else:
+                self.shared += 1
+
+        if not leader:
+            if not call.event.wait(timeout):
+                raise APITimeoutException(None, 'Timed out after %ss waiting for a concurrent call' % timeout)
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = fn()
+        except Exception as e:
+            call.error = e
+            raise
+        finally:
+            self._finish(key, call)
+        return call.result
+
+    def try_begin(self, key):
+        """
+        Inicia uma chamada para `key`, caso não haja outra em andamento, sem executá-la. A chamada deve ser
+        concluída com `end`; até lá, as chamadas de `do` para `key` aguardam o seu retorno.
+
+        :type key: str
+        :rtype: bool
+        :return: False caso já exista uma chamada em andamento para `key`
+        """
+        with self._lock:
+            if key in self._calls:
+                return False
+            self._calls[key] = _Call()
+            return True
+
+    def end(self, key, result=None, error=None):
+        """
+        Conclui uma chamada iniciada com `try_begin`, entregando `result` (ou levantando `error`) às chamadas
+        que a aguardam
+        """
+        with self._lock:
+            call = self._calls[key]
+        call.result = result
+        call.error = error
+        self._finish(key, call)
+
+    def _finish(self, key, call):
+        with self._lock:
+            del self._calls[key]
+            self.executed += 1
+        call.event.set()
+
+    def in_flight(self, key):
+        """
+        :rtype: bool
+        """
+        with self._lock:
+            return key in self._calls
+
+    @property
+    def stats(self):
+        """
+        :rtype: dict
+        :return: `executed` é a quantidade de chamadas de fato realizadas e `shared` a de chamadas evitadas
+        """
+        with self._lock:
+            return {'executed': self.executed, 'shared': self.shared}
@@ -0,0 +1,182 @@
+# -*- coding: utf-8 -*-
+import codecs
+import json
+from collections import Iterable
+from requests.structures import CaseInsensitiveDict
+from .exceptions import *
+from .result import APIResponse
+from .rows import FieldIndex, CompactRow
+
+
+__all__ = ('APIStreamingResultObject',)
+
+_WHITESPACE = ' \t\n\r'
+
+
+class _StreamParser(object):
+    # Quantidade de caracteres já consumidos a partir da qual o buffer é compactado
+    COMPACT_THRESHOLD = 64 * 1024
+
+    def __init__(self, chunks, object_hook=None, encoding='utf-8'):
+        """
+        Parser incremental de um corpo JSON no formato {"content": [...], "subset": [...]}. As linhas de
+        `content` são decodificadas uma a uma, à medida que os chunks chegam, e as demais chaves do objeto
+        ficam disponíveis em `values` assim que são lidas.
+
+        :type chunks: collections.Iterable[bytes]
+        """
+        self._chunks = iter(chunks)
+        self._text = codecs.getincrementaldecoder(encoding)('strict')
+        self._decoder = json.JSONDecoder(object_hook=object_hook)
+        self._buffer = u''
+        self._pos = 0
+        self._eof = False
+        self.values = {}
+
+    def _fill(self):
+        """
+        :rtype: bool
+        :return: False caso não haja mais dados
+        """
+        if self._eof:
+            return False
+        if self._pos > self.COMPACT_THRESHOLD:
+            self._buffer = self._buffer[self._pos:]
+            self._pos = 0
+        for chunk in self._chunks:
+            if chunk:
+                self._buffer += self._text.decode(chunk)
+                return True
+        self._buffer += self._text.decode(b'', final=True)
+        self._eof = True
+        return False
+
+    def peek(self):
+        """
+        :return: O próximo caractere que não seja espaço em branco, ou None ao final do corpo
+        """
+        while True:
+            while self._pos < len(self._buffer) and self._buffer[self._pos] in _WHITESPACE:
+                self._pos += 1
+            if self._pos < len(self._buffer):
+                return self._buffer[self._pos]
+            if not self._fill():
+                return None
+
+    def expect(self, *chars):
+        char = self.peek()
+        if char not in chars:
+            raise ValueError('Expected %s at position %d, got %r' % (' or '.join(chars), self._pos, char))
+        self._pos += 1
+        return char
+
+    def value(self):
+        self.peek()
+        while True:
+            try:
+                value, end = self._decoder.raw_decode(self._buffer, self._pos)
+            except ValueError:
+                if not self._fill():
+                    raise
+                continue
+            # Um número no final do buffer pode estar incompleto
+            if end == len(self._buffer) and self._fill():
+                continue
+            self._pos = end
+            return value
+
+    def rows(self):
+        """
+        Gerador das linhas de `content`
+
+        :raises ValueError: Caso o corpo não seja um JSON válido
+        """
+        self.expect('{')
+        if self.peek() == '}':
+            return
+        while True:
+            key = self.value()
+            self.expect(':')
+            if key == 'content':
+                self.expect('[')
+                if self.peek() == ']':
+                    self._pos += 1
+                else:
+                    while True:
+                        yield self.value()
+                        if self.expect(',', ']') == ']':
+                            break
+            else:
+                self.values[key] = self.value()
+            if self.expect(',', '}') == '}':
+                return
+
+
+class APIStreamingResultObject(APIResponse, Iterable):
+    lmin = None
+    lmax = None
+    fields = None
+
+    def __init__(self, response, request, compact=False, chunk_size=64 * 1024):
+        """
+        Resultado de um GET cujo corpo é lido e decodificado incrementalmente. As linhas de content são
+        retornadas uma a uma ao iterar o objeto, e somente uma pequena parte do corpo é mantida em memória.
+
+        `lmin` e `lmax` são preenchidos assim que o subset é lido, o que pode acontecer somente após
+        todas as linhas, dependendo da ordem das chaves enviada pelo servidor.
+
+        :type response: requests.models.Response
+        :param response: Resposta obtida com stream=True
+        :type compact: bool
+        :param compact: Se True, as linhas são CompactRow ao invés de CaseInsensitiveDict
+        :type chunk_size: int
+        :param chunk_size: Quantidade de bytes lidos do socket por vez
+        :raises APIException, NoContentException:
+        """
+        super(APIStreamingResultObject, self).__init__(response, request)
+        self.compact = compact
+        self._parser = _StreamParser(self.response.iter_content(chunk_size),
+                                     object_hook=None if compact else CaseInsensitiveDict,
+                                     encoding=self.response.encoding or 'utf-8')
+        if self._parser.peek() is None:
+            self.close()
+            raise NoContentException(self.response)
+        self._consumed = False
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def close(self):
+        """
+        Libera a conexão. Necessário somente caso a iteração seja interrompida antes do fim
+        """
+        self.response.close()
+
+    def _update_subset(self):
+        subset = self._parser.values.get('subset')
+        if subset is not None:
+            self.lmin, self.lmax = subset[0], subset[1]
+
+    def __iter__(self):
+        if self._consumed:
+            raise RuntimeError('O conteúdo de um resultado em streaming só pode ser percorrido uma vez.')
+        self._consumed = True
+
+        index = None
+        try:
+            for row in self._parser.rows():
+                if self.fields is None:
+                    self.fields = tuple(row.keys())
+                    index = FieldIndex(self.fields)
+                    self._update_subset()
+                if self.compact:
+                    row = CompactRow(index, tuple(row.get(field) for field in index.fields))
+                yield row
+            self._update_subset()
+        except ValueError:
+            raise NoContentException(self.response, "Corpo da resposta não é um JSON válido")
+        finally:
+            self.close()